@@ -3,7 +3,7 @@ import os
 import logging
 
 from datetime import datetime, timedelta
-from django.db.models import Q
+from django.db.models import Q, F, Case, When, CharField
 from django.db import transaction
 from django.core.files.base import ContentFile
 from django.core.exceptions import ValidationError
@@ -26,7 +26,8 @@ from wildlifecompliance.components.main.utils import (
     checkout,
     set_session_application,
     set_session_activity,
-    delete_session_application
+    delete_session_application,
+    get_full_name_expression,
 )
 from wildlifecompliance.helpers import is_customer, is_internal, is_wildlife_compliance_officer
 from wildlifecompliance.components.applications.email import (
@@ -97,6 +98,7 @@ from wildlifecompliance.management.permissions_manager import PermissionUser
 logger = logging.getLogger(__name__)
 # logger = logging
 from wildlifecompliance.components.licences.utils import LicencePurposeUtil
+from wildlifecompliance.components.licences.models import LicenceCategory
 
 def application_refund_callback(invoice_ref, bpoint_tid):
     '''
@@ -319,11 +321,9 @@ class ApplicationFilterBackend(DatatablesFilterBackend):
 
             customer_status = customer_status.lower() if customer_status else 'all'
             if customer_status != 'all':
-                customer_status_app_ids = []
-                for application in queryset:
-                    if customer_status in application.customer_status.lower():
-                        customer_status_app_ids.append(application.id)
-                queryset = queryset.filter(id__in=customer_status_app_ids)
+                queryset = queryset.filter(
+                    customer_status__icontains=customer_status
+                )
 
             if date_from:
                 queryset = queryset.filter(lodgement_date__gte=date_from)
@@ -341,33 +341,21 @@ class ApplicationFilterBackend(DatatablesFilterBackend):
             if search_text:
                 search_text = search_text.lower()
                 # join queries for the search_text search
-                search_text_ass_ids = []
-                for assessment in queryset:
-                    if (search_text in assessment.application.licence_category.lower()
-                        or search_text in assessment.licence_activity.short_name.lower()
-                        or search_text in assessment.application.applicant.lower()
-                        or search_text in assessment.get_status_display().lower()
-                    ):
-                        search_text_ass_ids.append(assessment.id)
-                    # if applicant is not an organisation, also search against the user's email address
-                    if (assessment.application.applicant_type == Application.APPLICANT_TYPE_PROXY and
-                        search_text in assessment.application.proxy_applicant.email.lower()):
-                            search_text_ass_ids.append(assessment.id)
-                    if (assessment.application.applicant_type == Application.APPLICANT_TYPE_SUBMITTER and
-                        search_text in assessment.application.submitter.email.lower()):
-                            search_text_ass_ids.append(assessment.id)
                 # use pipe to join both custom and built-in DRF datatables querysets (returned by super call above)
                 # (otherwise they will filter on top of each other)
-                queryset = queryset.filter(id__in=search_text_ass_ids).distinct() | super_queryset
+                queryset = queryset.filter(
+                    self.get_assessment_search_filter(search_text)
+                ).distinct() | super_queryset
 
             # apply user selected filters
             category_name = category_name.lower() if category_name else 'all'
             if category_name != 'all':
-                category_name_app_ids = []
-                for assessment in queryset:
-                    if category_name in assessment.application.licence_category_name.lower():
-                        category_name_app_ids.append(assessment.id)
-                queryset = queryset.filter(id__in=category_name_app_ids)
+                category_ids = LicenceCategory.objects.filter(
+                    short_name__icontains=category_name
+                ).values('id')
+                queryset = queryset.filter(
+                    application__computed_licence_category_id__in=category_ids
+                )
             status_filter = status_filter.lower() if status_filter else 'all'
             if status_filter != 'all':
                 queryset = queryset.filter(status=status_filter)
@@ -393,6 +381,65 @@ class ApplicationFilterBackend(DatatablesFilterBackend):
         setattr(view, '_datatables_total_count', total_count)
         return queryset
 
+    def get_applicant_name(self):
+        """
+        Database expression for Application.applicant being the organisation
+        name or the full name of the proxy applicant or submitter.
+        """
+        return Case(
+            When(
+                org_applicant__isnull=False,
+                then=F('org_applicant__organisation__name'),
+            ),
+            When(
+                proxy_applicant__isnull=False,
+                then=get_full_name_expression('proxy_applicant'),
+            ),
+            default=get_full_name_expression('submitter'),
+            output_field=CharField(),
+        )
+
+    def get_assessment_search_filter(self, search_text):
+        """
+        Filter matching Assessment search text against the licence category,
+        activity, applicant, status and applicant email in the database.
+        """
+        category_ids = [
+            c.id for c in LicenceCategory.objects.select_related(
+                'replaced_by'
+            ) if search_text in c.display_name.lower()
+        ]
+        statuses = [
+            s for s, name in Assessment.STATUS_CHOICES
+            if search_text in name.lower()
+        ]
+        applicant_app_ids = Application.objects.annotate(
+            applicant_name=self.get_applicant_name()
+        ).filter(
+            applicant_name__icontains=search_text
+        ).values('id')
+
+        return Q(
+            application__computed_licence_category_id__in=category_ids
+        ) | Q(
+            licence_activity__short_name__icontains=search_text
+        ) | Q(
+            application_id__in=applicant_app_ids
+        ) | Q(
+            status__in=statuses
+        ) | Q(
+            # if applicant is not an organisation, also search against the
+            # user's email address
+            application__org_applicant__isnull=True,
+            application__proxy_applicant__isnull=False,
+            application__proxy_applicant__email__icontains=search_text,
+        ) | Q(
+            application__org_applicant__isnull=True,
+            application__proxy_applicant__isnull=True,
+            application__submitter__email__icontains=search_text,
+        )
+
+
 class ApplicationPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (ApplicationFilterBackend,)
     pagination_class = DatatablesPageNumberPagination
@@ -468,8 +515,8 @@ class ApplicationPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
             Q(submitter=request.user) |
             Q(proxy_applicant=request.user) |
             Q(org_applicant_id__in=user_orgs)
-        ).computed_exclude(
-            processing_status=Application.PROCESSING_STATUS_DISCARDED
+        ).exclude(
+            computed_processing_status=Application.PROCESSING_STATUS_DISCARDED
         ).distinct()
         queryset = self.filter_queryset(queryset)
         result_page = self.paginator.paginate_queryset(queryset, request)
@@ -817,8 +864,8 @@ class ApplicationViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
             Q(submitter=request.user) |
             Q(proxy_applicant=request.user) |
             Q(org_applicant_id__in=user_orgs)
-        ).computed_exclude(
-            processing_status=Application.PROCESSING_STATUS_DISCARDED
+        ).exclude(
+            computed_processing_status=Application.PROCESSING_STATUS_DISCARDED
         ).distinct()
 
         serializer = DTExternalApplicationSerializer(
@@ -2216,6 +2263,10 @@ class ApplicationViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
         ).update(
             processing_status=ApplicationSelectedActivity.PROCESSING_STATUS_DISCARDED
         )
+        Application.recompute_computed_dependants(
+            ApplicationSelectedActivity, [instance.id])
+        Application.invalidate_property_cache_dependants(
+            ApplicationSelectedActivity, [instance.id])
 
         return Response({'processing_status': ApplicationSelectedActivity.PROCESSING_STATUS_DISCARDED
                          }, status=http_status)
@@ -2501,7 +2552,14 @@ class AssessmentPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
                 assessor_group=group) | Assessment.objects.filter(
                 actioned_by=self.request.user)
 
-        queryset = self.filter_queryset(queryset)
+        queryset = self.filter_queryset(queryset).select_related(
+            'application',
+            'application__submitter',
+            'application__proxy_applicant',
+            'application__org_applicant__organisation',
+            'assessor_group',
+            'licence_activity',
+        )
         result_page = self.paginator.paginate_queryset(queryset, request)
         serializer = DTAssessmentSerializer(
             result_page, context={'request': request}, many=True)
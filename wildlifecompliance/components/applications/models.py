@@ -9,11 +9,18 @@ import re
 from decimal import Decimal
 from django.conf import settings
 from django.db import models, transaction
-from django.db.models import Q
+from django.db.models import Q, F, Func, Value, TextField
 from django.db.models.signals import pre_delete
 from django.db.models.query import QuerySet
 from django.dispatch import receiver
 from django.contrib.postgres.fields.jsonb import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQueryField,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
@@ -26,6 +33,11 @@ from ckeditor.fields import RichTextField
 
 from ledger.accounts.models import EmailUser, RevisionedMixin
 from ledger.payments.invoice.models import Invoice
+from ledger.payments.models import (
+    CashTransaction,
+    BpointTransaction,
+    BpayTransaction,
+)
 from wildlifecompliance.components.main.utils import (
     checkout, set_session_application,
     delete_session_application,
@@ -44,7 +56,12 @@ from wildlifecompliance.components.organisations.emails import (
 from wildlifecompliance.components.main.models import (
     CommunicationsLogEntry,
     UserAction,
-    Document
+    Document,
+    ComputedField,
+    ComputedFieldDependency,
+    ComputedFieldsMixin,
+    PropertyCacheKeys,
+    PropertyCacheMixin,
 )
 from wildlifecompliance.components.main.process_document import (
     save_issuance_document_obj,
@@ -207,7 +224,31 @@ class ApplicationDocument(Document):
         app_label = 'wildlifecompliance'
 
 
-class Application(RevisionedMixin):
+def get_invoice_application_ids(invoice_reference):
+    '''
+    Get the identifiers of applications invoiced with the invoice reference.
+    '''
+    if not invoice_reference:
+        return []
+
+    return list(ApplicationInvoice.objects.filter(
+        invoice_reference=invoice_reference,
+    ).values_list('application_id', flat=True).distinct())
+
+
+def get_activity_application_ids(activity_id):
+    '''
+    Get the identifier of the application for a selected activity.
+    '''
+    if not activity_id:
+        return []
+
+    return list(ApplicationSelectedActivity.objects.filter(
+        id=activity_id,
+    ).values_list('application_id', flat=True))
+
+
+class Application(PropertyCacheMixin, ComputedFieldsMixin, RevisionedMixin):
 
     ACTIVITIES = None
     LICENCE_OFFICERS = None
@@ -349,7 +390,8 @@ class Application(RevisionedMixin):
         'Customer Status',
         max_length=40,
         choices=CUSTOMER_STATUS_CHOICES,
-        default=CUSTOMER_STATUS_DRAFT)
+        default=CUSTOMER_STATUS_DRAFT,
+        db_index=True)
     lodgement_number = models.CharField(max_length=9, blank=True, default='')
     lodgement_date = models.DateTimeField(blank=True, null=True)
     org_applicant = models.ForeignKey(
@@ -408,6 +450,109 @@ class Application(RevisionedMixin):
     property_cache = JSONField(null=True, blank=True, default={})
     # is_resubmitted is not used and can be removed.
     # is_resubmitted = models.BooleanField(default=False)
+    # computed properties stored for filtering and ordering in the database.
+    computed_processing_status = models.CharField(
+        'Processing Status',
+        max_length=30,
+        choices=PROCESSING_STATUS_CHOICES,
+        default=PROCESSING_STATUS_DRAFT,
+        db_index=True)
+    computed_licence_category_id = models.IntegerField(
+        null=True,
+        blank=True,
+        db_index=True)
+
+    COMPUTED_FIELDS = [
+        ComputedField(
+            'computed_processing_status',
+            'processing_status',
+            depends_on=[
+                ComputedFieldDependency(
+                    'wildlifecompliance.ApplicationSelectedActivity',
+                    'application_id',
+                ),
+                ComputedFieldDependency(
+                    'wildlifecompliance.AmendmentRequest',
+                    'application_id',
+                ),
+            ]
+        ),
+        ComputedField(
+            'computed_licence_category_id',
+            'get_licence_category_id',
+            depends_on=[
+                ComputedFieldDependency('licence_purposes', m2m=True),
+            ]
+        ),
+    ]
+
+    # property cache keys resolved only when their inputs change.
+    PROPERTY_CACHE_KEYS = [
+        PropertyCacheKeys(
+            [
+                'licence_activity_names',
+                'licence_type_name',
+                'licence_purpose_names',
+                'licence_category_id',
+                'licence_category_name',
+            ],
+            'set_property_cache_licence_names',
+            depends_on=[
+                ComputedFieldDependency('licence_purposes', m2m=True),
+            ]
+        ),
+        PropertyCacheKeys(
+            [
+                'payment_status',
+                'total_paid_amount',
+                'latest_invoice_ref',
+            ],
+            'set_property_cache_payment',
+            fields=['application_fee', 'submit_type', 'customer_status'],
+            depends_on=[
+                ComputedFieldDependency(
+                    'wildlifecompliance.ApplicationInvoice',
+                    'application_id',
+                ),
+                ComputedFieldDependency(
+                    'wildlifecompliance.ApplicationSelectedActivity',
+                    'application_id',
+                ),
+                ComputedFieldDependency(
+                    'wildlifecompliance.ApplicationSelectedActivityPurpose',
+                    owner_ids=lambda purpose: get_activity_application_ids(
+                        purpose.selected_activity_id),
+                ),
+                ComputedFieldDependency(
+                    'wildlifecompliance.ActivityInvoice',
+                    owner_ids=lambda invoice: get_activity_application_ids(
+                        invoice.activity_id),
+                ),
+                ComputedFieldDependency(
+                    Invoice,
+                    owner_ids=lambda invoice: get_invoice_application_ids(
+                        invoice.reference),
+                ),
+                ComputedFieldDependency(
+                    CashTransaction,
+                    owner_ids=lambda cash: get_invoice_application_ids(
+                        cash.invoice.reference if cash.invoice_id else None),
+                ),
+                ComputedFieldDependency(
+                    BpointTransaction,
+                    owner_ids=lambda bpoint: get_invoice_application_ids(
+                        bpoint.crn1),
+                ),
+                ComputedFieldDependency(
+                    BpayTransaction,
+                    owner_ids=lambda bpay: get_invoice_application_ids(
+                        bpay.crn),
+                ),
+            ],
+            # payments can be recorded by other systems sharing the ledger.
+            refresh='is_property_cache_payment_pending',
+        ),
+    ]
 
     class Meta:
         app_label = 'wildlifecompliance'
@@ -419,7 +564,6 @@ class Application(RevisionedMixin):
     # number and lodgement sequence are used to generate Reference.
     def save(self, *args, **kwargs):
         logger.debug('Application.save()')
-        self.update_property_cache(False)
         super(Application, self).save(*args, **kwargs)
         if self.lodgement_number == '':
             new_lodgement_id = 'A{0:06d}'.format(self.pk)
@@ -430,11 +574,8 @@ class Application(RevisionedMixin):
         '''
         Get properties which were previously resolved.
         '''
-        if len(self.property_cache) == 0:
-            self.update_property_cache()
-
-        if self.processing_status == self.PROCESSING_STATUS_AWAITING_PAYMENT:
-            self.update_property_cache()
+        if self.get_stale_property_cache_keys():
+            self.save()
 
         return self.property_cache
 
@@ -442,12 +583,11 @@ class Application(RevisionedMixin):
         '''
         Get properties which were previously resolved with key.
         '''
-        try:
-
-            self.property_cache[key]
-
-        except KeyError:
-            self.update_property_cache()
+        stale = [
+            p for p in self.get_stale_property_cache_keys() if key in p.keys
+        ]
+        if stale:
+            self.save()
 
         return self.property_cache
 
@@ -456,7 +596,19 @@ class Application(RevisionedMixin):
         Refresh cached properties with updated properties.
         '''
         logger.debug('Application.update_property_cache()')
+        self.resolve_property_cache()
+        self.set_property_cache_loaded()
 
+        if save is True:
+            self.save()
+
+        return self.property_cache
+
+    def set_property_cache_licence_names(self):
+        '''
+        Setter for licence names of the selected purposes on the property
+        cache.
+        '''
         if self.id:
             self.property_cache[
                 'licence_activity_names'] = self.licence_activity_names
@@ -469,6 +621,17 @@ class Application(RevisionedMixin):
             self.property_cache[
                 'licence_category_name'] = self.licence_category_name
 
+    def is_property_cache_payment_pending(self):
+        '''
+        Check whether a payment is awaited for this application.
+        '''
+        return self.computed_processing_status == \
+            self.PROCESSING_STATUS_AWAITING_PAYMENT
+
+    def set_property_cache_payment(self):
+        '''
+        Setter for payment status and invoiced amounts on the property cache.
+        '''
         self.property_cache['payment_status'] = self.payment_status
         self.set_property_cache_total_paid_amount(self.get_total_paid_amount())
 
@@ -478,11 +641,6 @@ class Application(RevisionedMixin):
         else:
             self.property_cache['latest_invoice_ref'] = ''
 
-        if save is True:
-            self.save()
-
-        return self.property_cache
-
     @property
     def applicant(self):
         logger.debug('Application.applicant()')
@@ -978,6 +1136,15 @@ class Application(RevisionedMixin):
         except AttributeError:
             return ''
 
+    def get_licence_category_id(self):
+        '''
+        Get the licence category identifier or None when no purposes are
+        selected.
+        '''
+        category_id = self.licence_category_id
+
+        return category_id if category_id != '' else None
+
     @property
     def licence_category(self):
         logger.debug('Application.licence_category()')
@@ -2119,6 +2286,10 @@ class Application(RevisionedMixin):
                     reason=details.get('reason'),
                     cc_email=details.get('cc_email', None),
                 )
+                self.recompute_computed_dependants(
+                    ApplicationSelectedActivity, [self.id])
+                self.invalidate_property_cache_dependants(
+                    ApplicationSelectedActivity, [self.id])
 
                 # Log application action
                 self.log_user_action(
@@ -2520,14 +2691,12 @@ class Application(RevisionedMixin):
     @property
     def schema_fields(self):
         logger.debug('Application.schema_fields()')
-        return self.get_schema_fields(self.schema)
+        return self.get_compiled_schema()['fields']
 
     @property
     def schema(self):
         logger.debug('Application.schema()')
-        return self.get_schema_for_purposes(
-            self.licence_purposes.values_list('id', flat=True)
-        )
+        return self.get_compiled_schema()['schema']
 
     @property
     def data(self):
@@ -2732,11 +2901,19 @@ class Application(RevisionedMixin):
         return latest_activity
 
     def get_schema_fields_for_purposes(self, purpose_id_list):
-        return self.get_schema_fields(
-            self.get_schema_for_purposes(purpose_id_list)
-        )
+        return self.get_compiled_schema()['fields']
 
     def get_schema_for_purposes(self, purpose_id_list):
+        return self.get_compiled_schema()['schema']
+
+    def get_compiled_schema(self):
+        '''
+        Get the schema and flattened schema fields for the purposes on this
+        application, compiled once for the purposes and their versions.
+
+        NOTE: purposes are taken from the selected activities, or the latest
+        versions of the applied purposes when none are selected.
+        '''
         from wildlifecompliance.components.applications.utils \
             import ActivitySchemaUtil
 
@@ -2752,7 +2929,7 @@ class Application(RevisionedMixin):
             ]
 
         util = ActivitySchemaUtil(self)
-        return util.get_activity_schema(purpose_id_list)
+        return util.get_compiled_schema(purpose_id_list)
 
     def get_schema_fields(self, schema_json):
         fields = {}
@@ -2940,6 +3117,10 @@ class Application(RevisionedMixin):
                     reason=details.get('reason'),
                     cc_email=details.get('cc_email', None),
                 )
+                self.recompute_computed_dependants(
+                    ApplicationSelectedActivity, [self.id])
+                self.invalidate_property_cache_dependants(
+                    ApplicationSelectedActivity, [self.id])
                 # update Additional fees for selected proposed activities.
                 proposed_activities = request.data.get('activities')
                 for p_activity in proposed_activities:
@@ -6236,6 +6417,8 @@ class ApplicationSelectedActivityPurpose(models.Model):
     # Additional species header and text taken from licence purpose which can
     # be customised for this selected purpose.
     purpose_species_json = JSONField(null=True, blank=True, default={})
+    # Species names parsed from the purpose species html when saved.
+    species_list = JSONField(null=True, blank=True)
     property_cache = JSONField(null=True, blank=True, default={})
 
     def __str__(self):
@@ -6249,8 +6432,51 @@ class ApplicationSelectedActivityPurpose(models.Model):
     def save(self, *args, **kwargs):
         logger.debug('ApplicationSelectedActivityPurpose.save()')
         self.update_property_cache(False)
+        self.set_species_list()
         super(ApplicationSelectedActivityPurpose, self).save(*args, **kwargs)
 
+    def get_species_details(self):
+        '''
+        Get the species html from the purpose species.
+
+        NOTE: Expectation that only ONE species 'Details' is created.
+        '''
+        details = [
+            d['details'] for d in self.purpose_species_json
+            if isinstance(d, dict) and d.get('species')
+        ] if isinstance(self.purpose_species_json, list) else []
+
+        return details[0] if details else None
+
+    def set_species_list(self):
+        '''
+        Set the species list parsed from the purpose species html.
+        '''
+        from wildlifecompliance.components.licences.pdf import (
+            SpeciesHtmlParser
+        )
+        details = self.get_species_details()
+        try:
+            self.species_list = SpeciesHtmlParser.parse(details)
+
+        except Exception as e:
+            logger.warning('{0} ID {1}: {2}'.format(
+                'ApplicationSelectedActivityPurpose.set_species_list()',
+                self.id,
+                e,
+            ))
+            self.species_list = []
+
+    def get_species_list(self):
+        '''
+        Get the species list for the purpose, parsing the purpose species
+        html when the list has not been set.
+        '''
+        if self.species_list is None:
+            self.set_species_list()
+
+        return self.species_list
+
     def get_property_cache(self):
         '''
         Get properties which were previously resolved.
@@ -6928,10 +7154,57 @@ class ActivityInvoiceLine(models.Model):
             self.invoice, self.licence_activity, self.amount)
 
 
+class FormDataText(Func):
+    '''
+    The text of a JSON form data value, unquoted for string values.
+    '''
+    template = "%(expressions)s #>> '{}'"
+    _output_field = TextField()
+
+
+class FormDataSearchQuery(Func):
+    '''
+    A tsquery matching any search word where each word matches on the prefix
+    of all its terms.
+    '''
+    function = 'to_tsquery'
+    _output_field = SearchQueryField()
+
+    def __init__(self, search_words, config, **extra):
+        terms = []
+        for word in search_words:
+            lexemes = re.findall(r'\w+', '{}'.format(word), re.UNICODE)
+            if lexemes:
+                terms.append('({})'.format(
+                    ' & '.join(['{}:*'.format(l.lower()) for l in lexemes])
+                ))
+        super(FormDataSearchQuery, self).__init__(
+            Value(config), Value(' | '.join(terms)), **extra)
+        self.is_empty = not terms
+
+
+class FormDataHeadline(Func):
+    '''
+    A snippet of the form data value text with matching terms highlighted.
+    '''
+    function = 'ts_headline'
+    _output_field = TextField()
+
+    def __init__(self, text, query, config, **extra):
+        super(FormDataHeadline, self).__init__(
+            Value(config),
+            text,
+            query,
+            Value('MaxWords=20, MinWords=5, MaxFragments=1'),
+            **extra
+        )
+
+
 @python_2_unicode_compatible
 class ApplicationFormDataRecord(models.Model):
 
     INSTANCE_ID_SEPARATOR = "__instance-"
+    SEARCH_CONFIG = 'simple'
 
     ACTION_TYPE_ASSIGN_VALUE = 'value'
     ACTION_TYPE_ASSIGN_COMMENT = 'comment'
@@ -6994,6 +7267,7 @@ class ApplicationFormDataRecord(models.Model):
         LicenceActivity, related_name='form_data_records')
     licence_purpose = models.ForeignKey(
         LicencePurpose, related_name='form_data_records')
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         logger.debug('ApplicationFormDataRecord.__str__()')
@@ -7005,6 +7279,65 @@ class ApplicationFormDataRecord(models.Model):
     class Meta:
         app_label = 'wildlifecompliance'
         unique_together = ('application', 'field_name',)
+        indexes = [
+            GinIndex(fields=['search_vector']),
+        ]
+
+    @classmethod
+    def update_search_index(cls, **filters):
+        '''
+        Rebuild the search vector for the records matching filters in a
+        single update statement.
+
+        :return: number of records indexed.
+        '''
+        return cls.objects.filter(**filters).update(
+            search_vector=SearchVector(
+                FormDataText(F('value')),
+                config=cls.SEARCH_CONFIG,
+            )
+        )
+
+    @classmethod
+    def search(cls, search_words):
+        '''
+        Search the indexed form data for any of the search words.
+
+        Returns the best ranked matching record for each application ordered
+        by rank, with a highlighted snippet of the matching value.
+
+        :param search_words: list of words or phrases to search for.
+        :return: list of dicts with application_id, field_name, rank and
+        snippet.
+        '''
+        query = FormDataSearchQuery(search_words, cls.SEARCH_CONFIG)
+        if query.is_empty:
+            return []
+
+        hits = cls.objects.filter(
+            search_vector=query,
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+        ).order_by(
+            'application_id', '-rank', 'id',
+        ).distinct(
+            'application_id',
+        ).values_list('id', 'rank')
+        ranks = dict(hits)
+
+        records = cls.objects.filter(
+            id__in=ranks.keys(),
+        ).annotate(
+            snippet=FormDataHeadline(
+                FormDataText(F('value')), query, cls.SEARCH_CONFIG),
+        ).values('id', 'application_id', 'field_name', 'snippet')
+
+        results = []
+        for record in records:
+            record['rank'] = ranks[record.pop('id')]
+            results.append(record)
+
+        return sorted(results, key=lambda r: r['rank'], reverse=True)
 
 
 @python_2_unicode_compatible
@@ -3,6 +3,8 @@ import abc
 import requests
 import logging
 
+from datetime import timedelta
+
 from django.db import transaction
 from django.utils import timezone
 
@@ -11,6 +13,7 @@ from wildlifecompliance import settings
 from wildlifecompliance.components.licences.models import (
     LicencePurpose,
     LicenceSpecies,
+    TSCSpecieCacheEntry,
 )
 
 from wildlifecompliance.components.applications.payments import (
@@ -164,6 +167,8 @@ class ApplicationService(object):
     def verify_licence_species():
         """
         Verifies species name identifier is current with the TSC database.
+
+        :return: a count of species verified.
         """
         purposes = LicencePurpose.objects.all()
         species_list = []
@@ -186,6 +191,68 @@ class ApplicationService(object):
             'ApplicationService: Completed. Verified {0} species.'.format(
                 len(species_list)))
 
+        return len(species_list)
+
+    @staticmethod
+    def evict_species_cache():
+        """
+        Evicts expired and least recently accessed taxonomy cache entries.
+
+        :return: a count of entries evicted.
+        """
+        evicted = TSCSpecieCache.evict()
+
+        logger.info(
+            'ApplicationService: Evicted {0} species cache entries.'.format(
+                evicted))
+
+        return evicted
+
+    @staticmethod
+    def warm_species_cache(clear=False):
+        """
+        Populates the taxonomy cache for all species used on licence purposes
+        and evicts expired entries.
+
+        :return: a count of species warmed.
+        """
+        if clear:
+            TSCSpecieCache.clear()
+
+        evicted = TSCSpecieCache.evict()
+
+        purposes = LicencePurpose.objects.all()
+        species_list = []
+        for purpose in purposes:
+            species_list += purpose.get_group_species_list
+            species_list += purpose.get_section_species_list
+        species_list += list(
+            LicenceSpecies.objects.values_list('specie_id', flat=True)
+        )
+        species_list = list(set([str(s) for s in species_list]))
+
+        logger.info(
+            'ApplicationService: Warming species cache. Evicted {0}.'.format(
+                evicted))
+
+        strategies = [TSCSpecieCall(), TSCSpecieXReferenceCall()]
+        for specie in species_list:
+            for strategy in strategies:
+                try:
+                    strategy.request_species(specie)
+
+                except BaseException as e:
+                    logger.error('ERR warm_species_cache for {0} : {1}'.format(
+                        specie,
+                        e,
+                    ))
+
+        logger.info(
+            'ApplicationService: Completed. Warmed {0} species.'.format(
+                len(species_list)))
+
+        return len(species_list)
+
     @staticmethod
     def verify_licence_specie_id(specie_id):
         """
@@ -1045,7 +1112,14 @@ class SpeciesOptionsFieldElement(SpecialFieldElement):
                  value=species_ids
             )
 
-            if not records:
+            if records:
+                ApplicationFormDataRecord.update_search_index(
+                    application_id=self._application.id,
+                    licence_activity_id=activity.licence_activity_id,
+                    licence_purpose_id=purpose_id,
+                    component_type=self._SPECIES
+                )
+            else:
                 ApplicationFormDataRecord.objects.create(
                     field_name='{0}-SpeciesOptions'.format(schema_name),
                     schema_name='{0}-SpeciesOptions'.format(schema_name),
@@ -1068,6 +1142,13 @@ class SpeciesOptionsFieldElement(SpecialFieldElement):
             ).update(
                  value=''
             )
+            if records:
+                ApplicationFormDataRecord.update_search_index(
+                    application_id=self._application.id,
+                    licence_activity_id=activity.licence_activity_id,
+                    licence_purpose_id=purpose_id,
+                    component_type=self._SPECIES
+                )
 
     def __str__(self):
         return 'Field Element: {0}'.format(self._NAME)
@@ -1846,6 +1927,8 @@ def do_process_form(
         all_form_fields.append(form_data_record)
 
     bulk_mgr.done()
+    ApplicationFormDataRecord.update_search_index(
+        application_id=application.id)
     application.set_property_cache_data(all_form_fields)
     if action == ApplicationFormDataRecord.ACTION_TYPE_ASSIGN_VALUE:
 
@@ -1989,6 +2072,252 @@ class TSCSpecieService():
         return 'TSCSpecieService: {}'.format(self._strategy)
 
 
+class TSCSpecieCache(object):
+    """
+    A persistent cache of taxonomy lookup responses with TTL and LRU eviction.
+
+    Responses are stored as TSCSpecieCacheEntry records keyed by the lookup
+    identifier (name_id, xref_id or search term). Misses are cached with a
+    shorter TTL so unknown species are not requested on every lookup.
+    """
+    _session = None                     # shared keep-alive HTTP session.
+    _limiter = None                     # shared per-host rate limiter.
+
+    @staticmethod
+    def get_session():
+        """
+        Get a requests Session shared by all calls in this process.
+
+        The connection pool is sized for the concurrent request workers and
+        failed requests are retried with an exponential backoff.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        if TSCSpecieCache._session is None:
+            workers = int(settings.TSC_MAX_WORKERS)
+            retry = Retry(
+                total=int(settings.TSC_MAX_RETRIES),
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(
+                pool_connections=workers,
+                pool_maxsize=workers,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            TSCSpecieCache._session = session
+
+        return TSCSpecieCache._session
+
+    @staticmethod
+    def get_limiter():
+        """
+        Get the per-host rate limiter shared by all calls in this process.
+        """
+        if TSCSpecieCache._limiter is None:
+            TSCSpecieCache._limiter = TSCRateLimiter(
+                float(settings.TSC_RATE_LIMIT)
+            )
+
+        return TSCSpecieCache._limiter
+
+    @staticmethod
+    def get_key(code, **identifiers):
+        """
+        Get a cache key for a lookup from the call code and identifiers.
+        """
+        return '{0}:{1}'.format(code, '&'.join([
+            '{0}={1}'.format(k, identifiers[k]) for k in sorted(identifiers)
+        ]))
+
+    @staticmethod
+    def get(key):
+        """
+        Get a cached entry for the key or None when not cached or expired.
+        Access is recorded at most once per touch interval for an entry.
+        """
+        now = timezone.now()
+        entry = TSCSpecieCacheEntry.objects.filter(
+            cache_key=key, expires__gt=now
+        ).first()
+        touch_before = now - timedelta(
+            seconds=int(settings.TSC_CACHE_TOUCH_INTERVAL))
+        if entry and entry.last_accessed < touch_before:
+            TSCSpecieCacheEntry.objects.filter(
+                id=entry.id
+            ).update(last_accessed=now)
+
+        return entry
+
+    @staticmethod
+    def is_miss(data):
+        """
+        Check a response found no species, either empty or a response with
+        no count, features or results.
+        """
+        if not data:
+            return True
+
+        if isinstance(data, dict):
+            if 'count' in data and not data['count']:
+                return True
+            for name in ['features', 'results']:
+                if name in data and not data[name]:
+                    return True
+
+        return False
+
+    @staticmethod
+    def set(key, data):
+        """
+        Cache the response data for the key. Misses are cached for a shorter
+        time than found species.
+        """
+        now = timezone.now()
+        ttl = settings.TSC_CACHE_MISS_TTL if TSCSpecieCache.is_miss(data) \
+            else settings.TSC_CACHE_TTL
+        expires = now + timedelta(seconds=int(ttl))
+        TSCSpecieCacheEntry.objects.update_or_create(
+            cache_key=key,
+            defaults={
+                'data': data,
+                'expires': expires,
+                'last_accessed': now,
+            }
+        )
+
+    @staticmethod
+    def evict():
+        """
+        Remove expired entries and the least recently accessed entries above
+        the maximum number of entries.
+
+        :return: number of entries removed.
+        """
+        removed, _ = TSCSpecieCacheEntry.objects.filter(
+            expires__lte=timezone.now()
+        ).delete()
+
+        max_entries = int(settings.TSC_CACHE_MAX_ENTRIES)
+        lru_ids = TSCSpecieCacheEntry.objects.order_by(
+            '-last_accessed'
+        ).values_list('id', flat=True)[max_entries:]
+        lru_ids = list(lru_ids)
+        if lru_ids:
+            lru_removed, _ = TSCSpecieCacheEntry.objects.filter(
+                id__in=lru_ids
+            ).delete()
+            removed += lru_removed
+
+        return removed
+
+    @staticmethod
+    def clear():
+        """
+        Remove all cached entries.
+        """
+        TSCSpecieCacheEntry.objects.all().delete()
+
+    @staticmethod
+    def request_json(key, url, **kwargs):
+        """
+        Get the json response for the url, using the cached response when
+        available.
+        """
+        entry = TSCSpecieCache.get(key)
+        if entry:
+            return entry.data
+
+        data = TSCSpecieCache.fetch_json(url, **kwargs)
+        TSCSpecieCache.set(key, data)
+
+        return data
+
+    @staticmethod
+    def fetch_json(url, **kwargs):
+        """
+        Get the json response for the url from the server, rate limited for
+        the url host.
+        """
+        from urllib.parse import urlparse
+
+        TSCSpecieCache.get_limiter().wait(urlparse(url).netloc)
+        response = TSCSpecieCache.get_session().get(url, **kwargs)
+        response.raise_for_status()
+
+        return response.json()
+
+    @staticmethod
+    def request_json_many(key_urls, **kwargs):
+        """
+        Get the json responses for a list of (key, url) tuples. Cached
+        responses are read in one query and the remaining urls are requested
+        concurrently on a bounded pool of workers.
+
+        :return: a list of json responses in the order of key_urls.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        keys = [key for key, url in key_urls]
+        now = timezone.now()
+        cached = TSCSpecieCacheEntry.objects.filter(
+            cache_key__in=keys, expires__gt=now
+        )
+        responses = dict([(e.cache_key, e.data) for e in cached])
+        if responses:
+            TSCSpecieCacheEntry.objects.filter(
+                cache_key__in=list(responses.keys())
+            ).update(last_accessed=now)
+
+        requested = dict([
+            (key, url) for key, url in key_urls if key not in responses
+        ])
+        if requested:
+            workers = min(int(settings.TSC_MAX_WORKERS), len(requested))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fetched = pool.map(
+                    lambda url: TSCSpecieCache.fetch_json(url, **kwargs),
+                    list(requested.values())
+                )
+                fetched = dict(zip(list(requested.keys()), fetched))
+
+            for key, data in fetched.items():
+                TSCSpecieCache.set(key, data)
+                responses[key] = data
+
+        return [responses.get(key) for key in keys]
+
+
+class TSCRateLimiter(object):
+    """
+    A thread safe limiter spacing requests to each host at a fixed rate.
+    """
+    def __init__(self, rate):
+        import threading
+
+        self._interval = 1.0 / rate if rate > 0 else 0
+        self._next_request = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """
+        Block until a request to the host is allowed.
+        """
+        import time
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request.get(host, now))
+            self._next_request[host] = start + self._interval
+
+        if start > now:
+            time.sleep(start - now)
+
+
 class TSCSpecieCallStrategy(object):
     """
     A Strategy Interface declaring a common operation for the TSCSpecie Call.
@@ -1999,6 +2328,29 @@ class TSCSpecieCallStrategy(object):
 
     __metaclass__ = abc.ABCMeta
 
+    def request_json(self, url, **identifiers):
+        """
+        Request json from the url cached against the identifiers.
+        """
+        key = TSCSpecieCache.get_key(self._CODE, **identifiers)
+
+        return TSCSpecieCache.request_json(
+            key, url, headers=self._AUTHORISE
+        )
+
+    def request_json_many(self, url_identifiers):
+        """
+        Request json from a list of (url, identifiers) tuples concurrently.
+        """
+        key_urls = [
+            (TSCSpecieCache.get_key(self._CODE, **identifiers), url)
+            for url, identifiers in url_identifiers
+        ]
+
+        return TSCSpecieCache.request_json_many(
+            key_urls, headers=self._AUTHORISE
+        )
+
     @abc.abstractmethod
     def request_species(self, species):
         """
@@ -2019,7 +2371,7 @@ class HerbieSpecieKMICall(TSCSpecieCallStrategy):
     Public Herbie from KMI.
     '''
     _CODE = 'HERBIE'
-    _URL = 'https://kmi.dpaw.wa.gov.au/geoserver/ows?service=wfs&version=1.1.0'
+    _URL = settings.HERBIE_URL
     FLORA = 'flora'
     FAUNA = 'fauna'
 
@@ -2083,12 +2435,26 @@ class HerbieSpecieKMICall(TSCSpecieCallStrategy):
                 add_filter(f_, params)
 
             url = '{0}{1}{2}'.format(self._URL, A, B)
-            _request_results = requests.get(url, params=params, verify=False)
-            return _request_results
+            key = TSCSpecieCache.get_key(
+                self._CODE, category=category.lower(), search=search
+            )
+            entry = TSCSpecieCache.get(key)
+            if entry:
+                return entry.data
+
+            _request_results = TSCSpecieCache.get_session().get(
+                url, params=params, verify=False
+            )
+            if not _request_results:
+                return None
+
+            request_json = _request_results.json()
+            TSCSpecieCache.set(key, request_json)
+            return request_json
 
         request_result = send_request(search_data)
         if request_result:
-            features = request_result.json()['features']
+            features = request_result['features']
             for f in features:
                 specie = {}
                 name = f['properties']['species_name']
@@ -2122,7 +2488,7 @@ class HerbieSpecieKMICall(TSCSpecieCallStrategy):
         '''
         def send_request(specie_id):
             url = '{0}'.format(self._URL)
-            specie_json = requests.get(url, headers=self._AUTHORISE).json()
+            specie_json = self.request_json(url, name_id=specie_id)
             return specie_json
 
         details = send_request(specie_id)
@@ -2135,7 +2501,7 @@ class TSCSpecieCall(TSCSpecieCallStrategy):
     A TSCSpecie Call.
     """
     _CODE = 'TAXON'
-    _URL = "https://tsc.dbca.wa.gov.au/api/1/taxon/?format=json"
+    _URL = "{0}/api/1/taxon/?format=json".format(settings.TSC_URL)
 
     def __init__(self):
         super(TSCSpecieCallStrategy, self).__init__()
@@ -2151,7 +2517,7 @@ class TSCSpecieCall(TSCSpecieCallStrategy):
 
         def send_request(specie_id):
             url = '{0}&name_id={1}'.format(self._URL, specie_id)
-            specie_json = requests.get(url, headers=self._AUTHORISE).json()
+            specie_json = self.request_json(url, name_id=specie_id)
             return specie_json
 
         details = send_request(specie_id)
@@ -2201,8 +2567,8 @@ class TSCSpecieXReferenceCall(TSCSpecieCallStrategy):
     Reason 8: Informal Synonym
     """
     _CODE = "XREF"
-    _XREF = "https://tsc.dbca.wa.gov.au/api/1/crossreference/?format=json"
-    _TAXN = "https://tsc.dbca.wa.gov.au/api/1/taxon-fast/?format=json"
+    _XREF = "{0}/api/1/crossreference/?format=json".format(settings.TSC_URL)
+    _TAXN = "{0}/api/1/taxon-fast/?format=json".format(settings.TSC_URL)
 
     def __init__(self):
         super(TSCSpecieCallStrategy, self).__init__()
@@ -2221,90 +2587,88 @@ class TSCSpecieXReferenceCall(TSCSpecieCallStrategy):
         return self.get_level_species(LEVEL, level_list)
 
     def get_level_species(self, level_no, level_species):
-        requested_species = []
+        """
+        Walk the cross-reference tree breadth first from the level species.
 
-        def send_request_successor(level_species):
-            # sends a request to TSC for each specie in level using specie_id
-            # to retrieve successors.
-            level_list = []
-            for specie in level_species:
+        Successors for all species on a level are requested concurrently
+        before descending to the next level.
 
-                # check if verified and recursively decend from that token.
-                try:
-                    xref_id = LicenceSpecies.objects.values(
-                        'verify_token').get(specie_id=specie['name_id'])
+        :return: a list of successors ordered by level.
+        """
+        requested_species = []
+        root_level_no = level_no + 1
 
-                    return send_request_token(xref_id['verify_token'])
+        def get_successor(xref):
+            # successor from the first cross-reference result.
+            if not (xref and xref['count'] and xref['count'] > 0):
+                return None
+            xref['results'][0]['successor'][
+                'authorised_on'] = xref['results'][0]['authorised_on']
+            xref['results'][0]['successor'][
+                'xref_id'] = xref['results'][0]['xref_id']
 
-                except LicenceSpecies.DoesNotExist:
-                    pass
-                except KeyError:
-                    pass
+            return xref['results'][0]['successor']
 
-                url = '{0}&predecessor__name_id={1}'.format(
-                    self._XREF, specie['name_id'])
-                xref = requests.get(url, headers=self._AUTHORISE).json()
+        def send_request_successor(level_species):
+            # sends a request to TSC for each specie in level using specie_id
+            # or a previously verified xref token to retrieve successors.
+            name_ids = [specie['name_id'] for specie in level_species]
+            tokens = dict([
+                (str(specie_id), token)
+                for specie_id, token in LicenceSpecies.objects.filter(
+                    specie_id__in=name_ids,
+                    verify_token__isnull=False,
+                ).exclude(
+                    verify_token='',
+                ).values_list('specie_id', 'verify_token')
+            ])
+
+            url_identifiers = []
+            for name_id in name_ids:
+                token = tokens.get(str(name_id))
+                if token:
+                    url = '{0}&xref_id={1}'.format(self._XREF, token)
+                    url_identifiers.append((url, {'xref_id': token}))
+                else:
+                    url = '{0}&predecessor__name_id={1}'.format(
+                        self._XREF, name_id)
+                    url_identifiers.append(
+                        (url, {'predecessor__name_id': name_id})
+                    )
 
-                if (xref['count'] and xref['count'] > 0):
-                    xref['results'][0]['successor'][
-                        'authorised_on'] = xref['results'][0]['authorised_on']
-                    xref['results'][0]['successor'][
-                        'xref_id'] = xref['results'][0]['xref_id']
-                    level_list.append(xref['results'][0]['successor'])
+            xrefs = self.request_json_many(url_identifiers)
+            level_list = [get_successor(xref) for xref in xrefs]
 
-            return level_list
+            return [successor for successor in level_list if successor]
 
         def send_request_node(level_species):
             # Sends a request to TSC for each specie in level using specie id
             # to retrieve specie details.
+            url_identifiers = [
+                ('{0}&name_id={1}'.format(self._TAXN, specie['name_id']),
+                 {'name_id': specie['name_id']})
+                for specie in level_species
+            ]
             level_list = []
-            for specie in level_species:
-
-                url = '{0}&name_id={1}'.format(
-                    self._TAXN, specie['name_id'])
-                taxon = requests.get(url, headers=self._AUTHORISE).json()
-
-                if (taxon['count'] and taxon['count'] > 0):
+            for taxon in self.request_json_many(url_identifiers):
+                if (taxon and taxon['count'] and taxon['count'] > 0):
                     taxon['features'][0]['authorised_on'] = None
                     taxon['features'][0]['xref_id'] = 0
                     level_list.append(taxon['features'][0])
 
             return level_list
 
-        def send_request_token(xref_id):
-            # Send a request to TSC using xref identifier to retrieve
-            # successors.
-            level_list = []
-            for specie in level_species:
-
-                url = '{0}&xref_id={1}'.format(
-                    self._XREF, xref_id)
-                xref = requests.get(url, headers=self._AUTHORISE).json()
-
-                if (xref['count'] and xref['count'] > 0):
-                    xref['results'][0]['successor'][
-                        'authorised_on'] = xref['results'][0]['authorised_on']
-                    xref['results'][0]['successor'][
-                        'xref_id'] = xref['results'][0]['xref_id']
-                    level_list.append(xref['results'][0]['successor'])
+        # breadth first descent.
+        next_level_species = level_species
+        while next_level_species:
+            level_no = level_no + 1
+            if not level_no < self._depth:  # stopping rule.
+                raise Exception('{0} - Recursion limit exceeded.'.format(self))
 
-            return level_list
-
-        # recursive descent.
-        level_no = level_no + 1
-        if level_no < self._depth:  # stopping rule.
-            successor = send_request_successor(level_species)
-            requested_species = successor
-            if successor:
-                next_level_species = self.get_level_species(
-                    level_no, successor)
-
-                for specie in next_level_species:
-                    requested_species.append(specie)
-        else:
-            raise Exception('{0} - Recursion limit exceeded.'.format(self))
+            next_level_species = send_request_successor(next_level_species)
+            requested_species += next_level_species
 
-        if not requested_species and level_no < 2:
+        if not requested_species and root_level_no < 2:
             # When no successor from root retrieve root node.
             requested_species = send_request_node(level_species)
 
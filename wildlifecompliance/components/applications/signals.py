@@ -1 +1,25 @@
 # Signals here
+from django.dispatch import receiver
+from django.db.models.signals import post_save
+
+from wildlifecompliance.components.applications.models import (
+    Application,
+    ApplicationFormDataRecord,
+)
+
+# recompute stored computed fields when their dependencies change.
+Application.connect_computed_fields()
+# invalidate property cache keys when their dependencies change.
+Application.connect_property_cache()
+
+
+class ApplicationFormDataRecordListener(object):
+    """
+    Event listener for ApplicationFormDataRecord
+    """
+
+    @staticmethod
+    @receiver(post_save, sender=ApplicationFormDataRecord)
+    def _post_save(sender, instance, **kwargs):
+        # keep the keyword search index current for the saved record.
+        ApplicationFormDataRecord.update_search_index(id=instance.id)
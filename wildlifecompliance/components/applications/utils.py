@@ -1,5 +1,8 @@
 import traceback
 import re
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from wildlifecompliance.components.applications.models import (
@@ -11,8 +14,10 @@ from wildlifecompliance.components.applications.serializers import (
     SaveApplicationSerializer
 )
 from wildlifecompliance.components.licences.models import (
-    LicencePurpose
+    LicencePurpose,
+    LicenceSpeciesOptionIndex,
 )
+from wildlifecompliance.components.main.utils import get_cache_version
 
 
 class MissingFieldsException(ValidationError):
@@ -515,6 +520,42 @@ class ActivitySchemaUtil(object):
 
         return _info
 
+    def get_compiled_schema_key(self, activity_ids):
+        """
+        Gets the cache key for the compiled schema of the Licence Purposes
+        from their identifiers and versions.
+        """
+        purposes = sorted(LicencePurpose.objects.filter(
+            id__in=activity_ids
+        ).values_list('id', 'version'))
+        versions = ','.join(['{0}:{1}'.format(i, v) for i, v in purposes])
+
+        return 'wildlifecompliance.application_schema.{0}.{1}.{2}'.format(
+            get_cache_version(LicencePurpose.SCHEMA_VERSION_CACHE_KEY),
+            get_cache_version(LicenceSpeciesOptionIndex.VERSION_CACHE_KEY),
+            hashlib.md5(versions.encode('utf-8')).hexdigest(),
+        )
+
+    def get_compiled_schema(self, activity_ids):
+        """
+        Gets the Activity Schema with its flattened schema fields. Compiled
+        schemas are shared in the cache until a Licence Purpose schema or a
+        Licence Species is changed.
+
+        :return: dict with schema and fields.
+        """
+        key = self.get_compiled_schema_key(activity_ids)
+        compiled = cache.get(key)
+        if compiled is None:
+            schema = self.get_activity_schema(activity_ids)
+            compiled = {
+                'schema': schema,
+                'fields': self._application.get_schema_fields(schema),
+            }
+            cache.set(key, compiled, int(settings.APPLICATION_SCHEMA_CACHE_TTL))
+
+        return compiled
+
     def get_activity_schema(self, activity_ids):
         """
         Gets a rebuilt Activity Schema with updated attributes.
@@ -4,9 +4,13 @@ import operator
 import traceback
 import os
 import base64
+import hashlib
 from functools import reduce
 import geojson
-from django.db.models import Q, Min, Max
+from django.db.models import Q, Min, Max, F, Func, Value, CharField, Count
+from django.contrib.gis.db.models import Collect
+from django.contrib.gis.db.models.functions import Centroid, SnapToGrid
+from django.contrib.gis.geos import Polygon
 from django.db import transaction
 from django.http import HttpResponse
 from django.core.files.base import ContentFile
@@ -95,7 +99,7 @@ from wildlifecompliance.components.call_email.serializers import (
 # from utils import SchemaParser
 
 from wildlifecompliance.components.main.utils import (
-    get_full_name
+    get_full_name_expression,
 )
 
 from rest_framework_datatables.pagination import DatatablesPageNumberPagination
@@ -121,46 +125,34 @@ class CallEmailFilterBackend(DatatablesFilterBackend):
         search_text = request.GET.get('search[value]')
 
         if search_text:
-            search_text = search_text.lower()
-            search_text_callemail_ids = []
-            for call_email in queryset:
-                #lodged_on_str = time.strftime('%d/%m/%Y', call_email.lodged_on)
-                lodged_on_str = call_email.lodged_on.strftime('%d/%m/%Y')
-                if (search_text in (call_email.number.lower() if call_email.number else '')
-                    or search_text in (call_email.status.lower() if call_email.status else '')
-                    or search_text in (call_email.classification.name.lower() if call_email.classification else '')
-                    or search_text in (lodged_on_str.lower() if lodged_on_str else '')
-                    or search_text in (call_email.caller.lower() if call_email.caller else '')
-                    or search_text in (
-                        get_full_name(call_email.assigned_to).lower()
-                        if call_email.assigned_to else ''
-                        )
-                    or search_text in (call_email.wildcare_species_sub_type.species_sub_name 
-                        if call_email.wildcare_species_sub_type else ''
-                        )
-                    ):
-                    search_text_callemail_ids.append(call_email.id)
-
-            # use pipe to join both custom and built-in DRF datatables querysets (returned by super call above)
-            # (otherwise they will filter on top of each other)
-            #_queryset = queryset.filter(id__in=search_text_callemail_ids).distinct() | super_queryset
-            # BB 20190704 - is super_queryset necessary?
-            queryset = queryset.filter(id__in=search_text_callemail_ids)
+            queryset = queryset.annotate(
+                lodged_on_str=Func(
+                    F('lodged_on'),
+                    Value('DD/MM/YYYY'),
+                    function='to_char',
+                    output_field=CharField(),
+                ),
+                assigned_to_name=get_full_name_expression('assigned_to'),
+            ).filter(
+                Q(number__icontains=search_text) |
+                Q(status__icontains=search_text) |
+                Q(classification__name__icontains=search_text) |
+                Q(lodged_on_str__icontains=search_text) |
+                Q(caller__icontains=search_text) |
+                Q(assigned_to_name__icontains=search_text) |
+                Q(wildcare_species_sub_type__species_sub_name__icontains=search_text)
+            )
 
         status_filter = status_filter.lower() if status_filter else 'all'
         if status_filter != 'all':
-            status_filter_callemail_ids = []
-            for call_email in queryset:
-                if status_filter == call_email.get_status_display().lower():
-                    status_filter_callemail_ids.append(call_email.id)
-            queryset = queryset.filter(id__in=status_filter_callemail_ids)
+            queryset = queryset.filter(status__in=[
+                key for key, display in CallEmail.STATUS_CHOICES
+                if display.lower() == status_filter
+            ])
         classification_filter = classification_filter.lower() if classification_filter else 'all'
         if classification_filter != 'all':
-            classification_filter_callemail_ids = []
-            for call_email in queryset:
-                if classification_filter in call_email.classification.name.lower() if call_email.classification else '':
-                    classification_filter_callemail_ids.append(call_email.id)
-            queryset = queryset.filter(id__in=classification_filter_callemail_ids)
+            queryset = queryset.filter(
+                classification__name__icontains=classification_filter)
 
         if date_from:
             queryset = queryset.filter(lodged_on__gte=date_from)
@@ -217,7 +209,12 @@ class CallEmailPaginatedViewSet(viewsets.ReadOnlyModelViewSet):
     @list_route(methods=['GET', ])
     def get_paginated_datatable(self, request, *args, **kwargs):
         queryset = self.get_queryset()
-        queryset = self.filter_queryset(queryset)
+        queryset = self.filter_queryset(queryset).select_related(
+            'classification',
+            'assigned_to',
+            'wildcare_species_sub_type',
+            'allocated_group',
+        )
         result_page = self.paginator.paginate_queryset(queryset, request)
         serializer = CallEmailDatatableSerializer(
             result_page, many=True, context={'request': request})
@@ -1046,11 +1043,95 @@ class LocationViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.R
             return Location.objects.all()
         return Location.objects.none()
 
+    # size of a map cluster cell in screen pixels and of a map tile.
+    CLUSTER_PIXELS = 64
+    TILE_PIXELS = 256
+    MAX_ZOOM = 22
+
     @list_route(methods=['GET', ])
     def optimised(self, request, *args, **kwargs):
+        '''
+        Locations with a call email as GeoJSON. When a bbox (minx,miny,maxx,
+        maxy) and zoom are given only the viewport is returned with the
+        points clustered on a grid sized for the zoom level.
+        '''
         queryset = self.get_queryset().exclude(call_location__isnull=True)
-        serializer = LocationSerializerOptimized(queryset, many=True)
-        return Response(serializer.data)
+        bbox = request.GET.get('bbox')
+        zoom = request.GET.get('zoom')
+        if bbox is None and zoom is None:
+            serializer = LocationSerializerOptimized(queryset, many=True)
+            return Response(serializer.data)
+
+        bbox, zoom = self.get_viewport(bbox, zoom)
+        etag = '"{}"'.format(hashlib.md5('{}|{}|{}'.format(
+            Location.get_map_version(),
+            ','.join(str(coord) for coord in bbox),
+            zoom,
+        ).encode('utf-8')).hexdigest())
+
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={'ETag': etag},
+            )
+
+        response = Response(self.get_clusters(queryset, bbox, zoom))
+        response['ETag'] = etag
+
+        return response
+
+    def get_viewport(self, bbox, zoom):
+        '''
+        Validate the bbox and zoom parameters for a map viewport.
+        '''
+        try:
+            bbox = tuple(float(coord) for coord in bbox.split(','))
+            zoom = int(zoom)
+        except (AttributeError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                'bbox (minx,miny,maxx,maxy) and zoom are required.')
+
+        if len(bbox) != 4 or bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+            raise serializers.ValidationError(
+                'bbox must be minx,miny,maxx,maxy.')
+
+        if not 0 <= zoom <= self.MAX_ZOOM:
+            raise serializers.ValidationError(
+                'zoom must be between 0 and {}.'.format(self.MAX_ZOOM))
+
+        return bbox, zoom
+
+    def get_clusters(self, queryset, bbox, zoom):
+        '''
+        Group the locations within the bbox into grid cells on the database
+        and return a GeoJSON point for each cell.
+        '''
+        viewport = Polygon.from_bbox(bbox)
+        viewport.srid = 4326
+        cell_size = 360.0 / 2 ** zoom / self.TILE_PIXELS * self.CLUSTER_PIXELS
+
+        cells = queryset.filter(
+            wkb_geometry__within=viewport,
+        ).annotate(
+            cell=SnapToGrid('wkb_geometry', cell_size),
+        ).values('cell').annotate(
+            count=Count('id', distinct=True),
+            call_email_id=Min('call_location__id'),
+            point=Centroid(Collect('wkb_geometry')),
+        ).order_by()
+
+        features = []
+        for cell in cells:
+            properties = {'count': cell['count']}
+            if cell['count'] == 1:
+                properties['call_email_id'] = cell['call_email_id']
+
+            features.append(geojson.Feature(
+                geometry=geojson.Point((cell['point'].x, cell['point'].y)),
+                properties=properties,
+            ))
+
+        return geojson.FeatureCollection(features)
 
     def create(self, request, *args, **kwargs):
 
@@ -5,6 +5,9 @@ from django.conf import settings
 from django.contrib.gis.db import models
 from django.contrib.postgres.fields.jsonb import JSONField
 from django.db.models import Max
+from django.db.models.signals import post_save, post_delete
+from django.core.cache import cache
+from django.utils import timezone
 from django.contrib.auth.models import Permission, ContentType
 from multiselectfield import MultiSelectField
 from django.utils.encoding import python_2_unicode_compatible
@@ -194,6 +197,21 @@ class Location(models.Model):
     objects = models.GeoManager()
     details = models.TextField(blank=True)
     ben_number = models.CharField(max_length=100, blank=True, null=True)
+    # resolved from wkb_geometry on save.
+    region = models.ForeignKey(
+        Region,
+        related_name='location_region',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    district = models.ForeignKey(
+        District,
+        related_name='location_district',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
 
     @property
     def call_email_id(self):
@@ -211,6 +229,60 @@ class Location(models.Model):
         else:
             return self.details
 
+    # cache key holding the version of the location map data, changed
+    # whenever a location or call email is saved so map viewports can be
+    # served conditionally.
+    MAP_VERSION_CACHE_KEY = 'wildlifecompliance.location.map_version'
+
+    def save(self, *args, **kwargs):
+        self.set_region_district()
+        super(Location, self).save(*args, **kwargs)
+
+    @classmethod
+    def get_map_version(cls):
+        '''
+        Get the current version of the location map data.
+        '''
+        version = cache.get(cls.MAP_VERSION_CACHE_KEY)
+        if version is None:
+            version = cls.set_map_version()
+
+        return version
+
+    @classmethod
+    def set_map_version(cls):
+        '''
+        Set a new version for the location map data.
+        '''
+        version = timezone.now().isoformat()
+        cache.set(cls.MAP_VERSION_CACHE_KEY, version, None)
+
+        return version
+
+    def set_region_district(self):
+        '''
+        Resolve the Region and District containing the location point from
+        the GIS areas.
+        '''
+        from wildlifecompliance.components.main.utils import (
+            get_region_gis,
+            get_district_gis,
+        )
+        self.region = None
+        self.district = None
+        if not self.wkb_geometry:
+            return
+
+        region_name = get_region_gis(self.wkb_geometry).strip()
+        if region_name:
+            self.region = Region.objects.filter(
+                cddp_name__iexact=region_name).first()
+
+        district_name = get_district_gis(self.wkb_geometry).strip()
+        if district_name:
+            self.district = District.objects.filter(
+                cddp_name__iexact=district_name).first()
+
 
 class MapLayer(models.Model):
     display_name = models.CharField(max_length=100, blank=True, null=True)
@@ -287,7 +359,8 @@ class CallEmail(RevisionedMixin):
     status = models.CharField(
         max_length=40,
         choices=STATUS_CHOICES,
-        default='draft')
+        default='draft',
+        db_index=True)
     location = models.ForeignKey(
         Location,
         null=True,
@@ -326,7 +399,7 @@ class CallEmail(RevisionedMixin):
     gender = MultiSelectField(max_length=30, choices=GENDER_CHOICES, blank=True, null=True)
     baby_kangaroo = MultiSelectField(max_length=30, choices=BABY_KANGAROO_CHOICES, blank=True, null=True)
     age = MultiSelectField(max_length=30, choices=AGE_CHOICES, blank=True, null=True)
-    lodged_on = models.DateField(auto_now_add=True)
+    lodged_on = models.DateField(auto_now_add=True, db_index=True)
     number = models.CharField(max_length=50, blank=True, null=True)
     caller = models.CharField(max_length=100, blank=True, null=True)
     caller_phone_number = models.CharField(max_length=50, blank=True, null=True)
@@ -732,6 +805,15 @@ class CallEmailUserAction(models.Model):
     call_email = models.ForeignKey(CallEmail, related_name='action_logs')
 
 
+def update_location_map_version(sender, instance, **kwargs):
+    Location.set_map_version()
+
+post_save.connect(update_location_map_version, sender=Location)
+post_delete.connect(update_location_map_version, sender=Location)
+post_save.connect(update_location_map_version, sender=CallEmail)
+post_delete.connect(update_location_map_version, sender=CallEmail)
+
+
 import reversion
 reversion.register(Classification, follow=['call_classification'])
 reversion.register(CallType, follow=['wildcare_species_types', 'call_type'])
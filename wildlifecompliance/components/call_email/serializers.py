@@ -22,8 +22,7 @@ from wildlifecompliance.components.call_email.models import (
     #ComplianceWorkflowLogEntry,
     )
 from wildlifecompliance.components.main.related_item import get_related_items
-from wildlifecompliance.components.main.models import Region, District, ComplianceManagementSystemGroup
-from wildlifecompliance.components.main.utils import get_region_gis, get_district_gis
+from wildlifecompliance.components.main.models import ComplianceManagementSystemGroup
 from wildlifecompliance.components.main.serializers import CommunicationLogEntrySerializer
 from wildlifecompliance.components.users.serializers import (
     ComplianceUserDetailsOptimisedSerializer,
@@ -559,23 +558,13 @@ class CallEmailSerializer(serializers.ModelSerializer):
             )
 
     def get_region_gis(self, obj):
-        try:
-            res = get_region_gis(obj.location.wkb_geometry)
-            region_list = Region.objects.filter(cddp_name__iexact=res.strip())
-            if region_list:
-                return region_list[0].name
-        except Exception as e:
-            return ''
+        if obj.location and obj.location.region:
+            return obj.location.region.name
         return ''
 
     def get_district_gis(self, obj):
-        try:
-            res = get_district_gis(obj.location.wkb_geometry)
-            district_list = District.objects.filter(cddp_name__iexact=res.strip())
-            if district_list:
-                return district_list[0].name
-        except Exception as e:
-            return ''
+        if obj.location and obj.location.district:
+            return obj.location.district.name
         return ''
 
     def get_current_user_id(self, obj):
@@ -210,6 +210,21 @@ class LicenceSpeciesAdmin(admin.ModelAdmin):
         self.message_user(request, 'Selected species have been verified.')
 
 
+@admin.register(models.TSCSpecieCacheEntry)
+class TSCSpecieCacheEntryAdmin(admin.ModelAdmin):
+    list_display = [
+        'cache_key',
+        'expires',
+        'last_accessed']
+    readonly_fields = [
+        'cache_key',
+        'created',
+        'expires',
+        'last_accessed',
+        'data']
+    search_fields = ['cache_key']
+
+
 @admin.register(models.WildlifeLicenceReceptionEmail)
 class WildlifeLicenceReceptionEmailAdmin(admin.ModelAdmin):
     pass
@@ -3,12 +3,14 @@ from __future__ import unicode_literals
 import json
 import reversion
 import logging
+import threading
 
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.contrib.postgres.fields.jsonb import JSONField
 from django.db.models import Max, Q
 from django.db.models.query import QuerySet
+from django.db.models.signals import post_save, post_delete
 from django.forms.models import model_to_dict
 
 from multiselectfield import MultiSelectField
@@ -21,7 +23,11 @@ from ledger.licence.models import LicenceType
 
 from wildlifecompliance.components.inspection.models import Inspection
 
-from wildlifecompliance.components.main.utils import ListEncoder
+from wildlifecompliance.components.main.utils import (
+    ListEncoder,
+    get_cache_version,
+    increment_cache_version,
+)
 from wildlifecompliance.components.main.models import (
     CommunicationsLogEntry,
     UserAction,
@@ -43,12 +49,17 @@ def update_licence_doc_filename(instance, filename):
 
 class LicenceDocument(Document):
     _file = models.FileField(upload_to=update_licence_doc_filename, storage=private_storage)
+    # hash of the licence content rendered to the document.
+    content_hash = models.CharField(max_length=64, blank=True)
 
     class Meta:
         app_label = 'wildlifecompliance'
 
 
 class LicencePurpose(models.Model):
+    # version of compiled application schemas, incremented on schema edits.
+    SCHEMA_VERSION_CACHE_KEY = 'wildlifecompliance.licence_purpose_schema.version'
+
     name = models.CharField(max_length=100)
     short_name = models.CharField(max_length=30, default='')
     code = models.CharField(max_length=4, default='')
@@ -201,28 +212,16 @@ class LicencePurpose(models.Model):
 
     def get_species_options(self, species_list):
         """
-        Builds a list of drop-down options for Licence Species.
+        Builds a list of drop-down options for Licence Species. An empty
+        species list is extended with all Licence Species identifiers.
         """
-        options = []
-        for specie in species_list:
-            details = LicenceSpecies.objects.values('data').get(
-                specie_id=specie)
-            option = {
-                'value': details['data'][0][LicenceSpecies.SPECIE_NAME_ID],
-                'label': details['data'][0][LicenceSpecies.SPECIE_NAME]}
-
-            options.append(option)
-
         if not species_list:
-            for details in LicenceSpecies.objects.values('data').all():
-                option = {
-                    'value': details['data'][0][LicenceSpecies.SPECIE_NAME_ID],
-                    'label': details['data'][0][LicenceSpecies.SPECIE_NAME]}
+            options = LicenceSpeciesOptionIndex.get_all_options()
+            species_list.extend([option['value'] for option in options])
 
-                options.append(option)
-                species_list.append(option['value'])
+            return options
 
-        return options
+        return LicenceSpeciesOptionIndex.get_options(species_list)
 
     def get_latest_version(self):
         '''
@@ -364,6 +363,135 @@ class LicenceSpecies(models.Model):
         return '{0} SPECIE_ID: {1}'.format(self.verify_date, self.specie_id)
 
 
+class LicenceSpeciesOptionIndex(object):
+    """
+    An in-process index of drop-down options for Licence Species keyed by
+    specie identifier.
+
+    Options are resolved in bulk and kept until a Licence Species is saved or
+    deleted, which increments the index version in the shared cache so each
+    process reloads the index on next use.
+    """
+    VERSION_CACHE_KEY = 'wildlifecompliance.licence_species_options.version'
+
+    _version = None
+    _options = {}
+    _all_options = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_option(data):
+        """
+        Get the drop-down option from Licence Species data.
+        """
+        if not data:
+            return None
+
+        return {
+            'value': data[0][LicenceSpecies.SPECIE_NAME_ID],
+            'label': data[0][LicenceSpecies.SPECIE_NAME]}
+
+    @classmethod
+    def check_version(cls):
+        """
+        Discard loaded options when Licence Species have changed.
+        """
+        version = get_cache_version(cls.VERSION_CACHE_KEY)
+        if version != cls._version:
+            with cls._lock:
+                cls._options = {}
+                cls._all_options = None
+                cls._version = version
+
+    @classmethod
+    def get_options(cls, species_list):
+        """
+        Get the options for the species in order. Species without a Licence
+        Species record are left out.
+        """
+        cls.check_version()
+        species_ids = [int(specie) for specie in species_list]
+        missing = set(species_ids) - set(cls._options)
+        if missing:
+            options = dict([(specie_id, None) for specie_id in missing])
+            for specie_id, data in LicenceSpecies.objects.filter(
+                    specie_id__in=missing).values_list('specie_id', 'data'):
+                options[specie_id] = cls.get_option(data)
+            with cls._lock:
+                cls._options.update(options)
+
+        return [
+            dict(cls._options[specie_id]) for specie_id in species_ids
+            if cls._options.get(specie_id)
+        ]
+
+    @classmethod
+    def get_all_options(cls):
+        """
+        Get the options for all Licence Species.
+        """
+        cls.check_version()
+        all_options = cls._all_options
+        if all_options is None:
+            options = {}
+            all_options = []
+            for specie_id, data in LicenceSpecies.objects.values_list(
+                    'specie_id', 'data'):
+                options[specie_id] = cls.get_option(data)
+                if options[specie_id]:
+                    all_options.append(options[specie_id])
+            with cls._lock:
+                cls._options.update(options)
+                cls._all_options = all_options
+
+        return [dict(option) for option in all_options]
+
+    @classmethod
+    def invalidate(cls):
+        increment_cache_version(cls.VERSION_CACHE_KEY)
+
+
+def invalidate_licence_species_options(sender, **kwargs):
+    LicenceSpeciesOptionIndex.invalidate()
+
+
+post_save.connect(invalidate_licence_species_options, sender=LicenceSpecies)
+post_delete.connect(invalidate_licence_species_options, sender=LicenceSpecies)
+
+
+def invalidate_licence_purpose_schemas(sender, **kwargs):
+    increment_cache_version(LicencePurpose.SCHEMA_VERSION_CACHE_KEY)
+
+
+post_save.connect(invalidate_licence_purpose_schemas, sender=LicencePurpose)
+post_delete.connect(invalidate_licence_purpose_schemas, sender=LicencePurpose)
+post_save.connect(invalidate_licence_purpose_schemas, sender=LicenceActivity)
+post_delete.connect(invalidate_licence_purpose_schemas, sender=LicenceActivity)
+
+
+class TSCSpecieCacheEntry(models.Model):
+    """
+    Model representation of a cached taxonomy (TSC/Herbie) lookup response.
+
+    Responses finding no species are cached misses with a shorter expiry.
+    Entries are evicted when expired or when least recently accessed beyond
+    the maximum number of entries.
+    """
+    cache_key = models.CharField(max_length=512, unique=True)
+    data = JSONField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField(db_index=True)
+    last_accessed = models.DateTimeField(db_index=True)
+
+    class Meta:
+        app_label = 'wildlifecompliance'
+        verbose_name = 'TSC species cache entry'
+        verbose_name_plural = 'TSC species cache entries'
+
+    def __str__(self):
+        return '{0} EXPIRES: {1}'.format(self.cache_key, self.expires)
+
+
 class DefaultActivity(models.Model):
     activity = models.ForeignKey(LicenceActivity)
     licence_category = models.ForeignKey(LicenceCategory)
@@ -952,8 +1080,8 @@ class WildlifeLicence(models.Model):
                 submitter=self.current_application.submitter,
                 proxy_applicant=None,
                 org_applicant=None)
-        ).computed_filter(
-            licence_category_id=self.licence_category.id
+        ).filter(
+            computed_licence_category_id=self.licence_category.id
         ).exclude(
             selected_activities__processing_status__in=[
                 ApplicationSelectedActivity.PROCESSING_STATUS_ACCEPTED,
@@ -992,8 +1120,8 @@ class WildlifeLicence(models.Model):
                 submitter=self.current_application.submitter,
                 proxy_applicant=None,
                 org_applicant=None)
-        ).computed_filter(
-            licence_category_id=self.licence_category.id
+        ).filter(
+            computed_licence_category_id=self.licence_category.id
         ).exclude(
             selected_activities__processing_status__in=[
                 ApplicationSelectedActivity.PROCESSING_STATUS_ACCEPTED,
@@ -1035,8 +1163,8 @@ class WildlifeLicence(models.Model):
                 submitter=self.current_application.submitter,
                 proxy_applicant=None,
                 org_applicant=None)
-        ).computed_filter(
-            licence_category_id=self.licence_category.id
+        ).filter(
+            computed_licence_category_id=self.licence_category.id
         ).exclude(
             selected_activities__processing_status__in=[
                 ApplicationSelectedActivity.PROCESSING_STATUS_ACCEPTED,
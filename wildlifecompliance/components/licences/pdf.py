@@ -1,4 +1,11 @@
 import os
+import copy
+import json
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from io import BytesIO
 from bs4 import BeautifulSoup
 
@@ -20,13 +27,14 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.utils import ImageReader
 
 from django.utils import timezone
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.conf import settings
 
 from wildlifecompliance.components.applications.utils import ActivitySchemaUtil
 
 from wildlifecompliance.components.licences.models import LicenceDocument
 from wildlifecompliance.components.licences.models import LicenceSpecies
+from wildlifecompliance.components.licences.pdf_worker import setup_worker
 from wildlifecompliance.components.applications.models import (
     ApplicationSelectedActivityPurpose,
 )
@@ -248,7 +256,7 @@ def _create_licence_header(canvas, doc, draw_page_number=True):
         canvas.drawString(current_x, current_y -
                           (LARGE_FONTSIZE + HEADER_SMALL_BUFFER), 'PAGE')
 
-    if hasattr(doc, 'licence'):
+    if hasattr(doc, 'licence_number'):
         canvas.drawString(current_x, current_y -
                           (LARGE_FONTSIZE + HEADER_SMALL_BUFFER) * 2, 'NO.')
 
@@ -261,258 +269,345 @@ def _create_licence_header(canvas, doc, draw_page_number=True):
                           current_y - (LARGE_FONTSIZE + HEADER_SMALL_BUFFER),
                           str(canvas.getPageNumber()))
 
-    if hasattr(doc, 'licence'):
+    if hasattr(doc, 'licence_number'):
         canvas.drawString(current_x,
                           current_y - (LARGE_FONTSIZE + HEADER_SMALL_BUFFER)*2,
-                          '{}'.format(doc.licence.licence_number))
+                          '{}'.format(doc.licence_number))
 
 
-def _create_licence(licence_buffer, licence, application):
+def _get_licence_purpose_data(licence, application, issued_purpose):
     '''
-    Creates licence summary and purpose details for licence.
+    Gets the content of a licence purpose page as plain data so it can be
+    hashed and rendered without database access.
     '''
+    selected_activity = issued_purpose.selected_activity
+    licence_display = '{0}-{1}-{2}'.format(
+        licence.licence_number,
+        issued_purpose.purpose_sequence,
+        issued_purpose.purpose.code)
+
+    if application.applicant_type \
+            == application.APPLICANT_TYPE_ORGANISATION:
+        address = application.org_applicant.address
+    elif application.applicant_type == application.APPLICANT_TYPE_PROXY:
+        address = application.proxy_applicant.residential_address
+    else:
+        # applic.applicant_type == application.APPLICANT_TYPE_SUBMITTER
+        address = application.submitter.residential_address
+
+    ltz = timezone.get_current_timezone()
+    issue_date = ltz.normalize(issued_purpose.issue_date.astimezone(ltz))
+
+    species = None
+    species_ids = issued_purpose.purpose.get_species_list
+    if species_ids:
+        species = [
+            s[0][0]['vernacular_names']
+            for s in LicenceSpecies.objects.values_list('data').filter(
+                specie_id__in=species_ids
+            )
+        ]
 
-    def _create_licence_purpose(
-            elements, selected_activity, issued_purpose):
-        '''
-        Creates the licence purpose details per page available on the activity.
-        '''
+    terms = []
+    try:
+        # copy-to-licence sections with terms and additional information.
+        activity_util = ActivitySchemaUtil(selected_activity.application)
+        for term in selected_activity.additional_licence_info['terms']:
+            if not term['header']:
+                continue
+            terms.append(
+                [term['header'], activity_util.get_ctl_text(term)])
+
+    except BaseException:
+        pass
+
+    species_details = []
+    additional_info = []
+    for s in issued_purpose.purpose_species_json:
+        if not s['details']:
+            continue
+        if 'is_additional_info' in s and s['is_additional_info']:
+            additional_info.append(s['details'])
+        else:
+            species_details.append(s['details'])
 
+    conditions = [
+        c.condition_text
+        for c in selected_activity.application.conditions.filter(
+            licence_activity_id=selected_activity.licence_activity_id,
+            licence_purpose_id=issued_purpose.purpose.id
+        ).order_by('order')
+    ]
 
-        # delegation holds the dates, licencee and issuer details.
-        delegation = []
-        sequence = purpose.purpose_sequence
-        licence_display = '{0}-{1}-{2}'.format(
-            licence.licence_number, sequence, issued_purpose.purpose.code)
-        licence_purpose = issued_purpose.purpose.name
-        elements.append(Paragraph(
-            licence_purpose.upper(),
-            styles['InfoTitleVeryLargeCenter']))
-        elements.append(Paragraph(
-            'Regulation {}, Biodiversity Conservation Regulations 2018'.format(issued_purpose.purpose.regulation),
-            styles['Center']))
-
-        # applicant details
-        delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-        if application.applicant_type \
-                == application.APPLICANT_TYPE_ORGANISATION:
-            address = application.org_applicant.address
-            pass
-        elif application.applicant_type == application.APPLICANT_TYPE_PROXY:
-            address = application.proxy_applicant.residential_address
-            pass
-        else:
-            # applic.applicant_type == application.APPLICANT_TYPE_SUBMITTER
-            address = application.submitter.residential_address
-
-        address_paragraphs = [
-            Paragraph(address.line1, styles['Left']),
-            Paragraph(address.line2, styles['Left']),
-            Paragraph(address.line3, styles['Left']),
-            Paragraph('%s %s %s' % (
-                address.locality, address.state,
-                address.postcode), styles['Left']),
-            Paragraph(address.country.name, styles['Left'])
-            ]
+    return {
+        'licence_display': licence_display,
+        'name': issued_purpose.purpose.name,
+        'regulation': issued_purpose.purpose.regulation,
+        'applicant': licence.current_application.applicant,
+        'address': [
+            address.line1,
+            address.line2,
+            address.line3,
+            '%s %s %s' % (address.locality, address.state, address.postcode),
+            address.country.name,
+        ],
+        'issue_date': issue_date.strftime(DATE_FORMAT),
+        'start_date': issued_purpose.start_date.strftime(DATE_FORMAT),
+        'expiry_date': issued_purpose.expiry_date.strftime(DATE_FORMAT),
+        'original_issue_date':
+            issued_purpose.original_issue_date.strftime(DATE_FORMAT)
+            if issued_purpose.is_reissued else None,
+        'species': species,
+        'terms': terms,
+        'species_details': species_details,
+        'conditions': conditions,
+        'extracted_fields': licence.extracted_fields,
+        'issue_officer': get_full_name(selected_activity.updated_by),
+        'additional_info': additional_info,
+    }
+
+
+def get_licence_data(licence, application):
+    '''
+    Gets the content of the licence document (summary and purpose pages) as
+    plain data. The data is all that is needed to render the licence.
+    '''
+    include = [
+        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_SUSPENDED,
+        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_CURRENT,
+        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_DEFAULT,
+    ]
 
-        delegation.append(
-            Table([[[Paragraph('Licence Number', styles['BoldLeft']),
-                    Paragraph('Licence Holder', styles['BoldLeft']),
-                    Paragraph('Address', styles['BoldLeft'])],
-                    [Paragraph(
-                        licence_display,
-                        styles['Left']
-                        )] + [Paragraph(
-                            licence.current_application.applicant,
-                            styles['Left']
-                        )] + address_paragraphs]], colWidths=(
-                            120, PAGE_WIDTH - (
-                                2 * PAGE_MARGIN) - 120
-                            ), style=licence_table_style))
-
-        # dates
-        dates_licensing_officer_table_style = TableStyle([(
-            'VALIGN', (0, 0), (-2, -1), 'TOP'),
-            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM')])
-
-        delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-        date_headings = [
-            Paragraph(
-                'Date of Issue', styles['BoldLeft']), Paragraph(
-                'Date Valid From', styles['BoldLeft']), Paragraph(
-                'Date of Expiry', styles['BoldLeft'])]
-
-        ltz = timezone.get_current_timezone()
-        issue_date = ltz.normalize(issued_purpose.issue_date.astimezone(ltz))
-        date_values = [
-            Paragraph(issue_date.strftime('%d/%m/%Y'),
-                      styles['Left']),
-            Paragraph(issued_purpose.start_date.strftime('%d/%m/%Y'),
-                      styles['Left']),
-            Paragraph(issued_purpose.expiry_date.strftime('%d/%m/%Y'),
-                      styles['Left'])
-        ]
+    licence_purposes = [
+        p for p in licence.get_purposes_in_sequence()
+        if p.purpose_status in include and p.is_issued and p.expiry_date
+    ]
 
-        if issued_purpose.is_reissued:
-            date_headings.insert(
-                0,
-                Paragraph(
-                    'Original Date of Issue',
-                    styles['BoldLeft']))
-            date_values.insert(
-                0,
-                Paragraph(
-                    issued_purpose.original_issue_date.strftime('%d/%m/%Y'),
-                    styles['Left']))
-
-        delegation.append(
-            Table(
-                [[date_headings, date_values]],
-                colWidths=(120, PAGE_WIDTH - (2 * PAGE_MARGIN) - 120),
-                style=dates_licensing_officer_table_style))
-
-        delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-
-        elements.append(KeepTogether(delegation))
-
-        # species
-        species_ids = issued_purpose.purpose.get_species_list
-        if species_ids:
-            elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-            elements.append(Paragraph('SPECIES', styles['BoldLeft']))
-            elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-            species = LicenceSpecies.objects.values_list('data').filter(
-                specie_id__in=species_ids
-            )
-            speciesList = ListFlowable(
-                [Paragraph(
-                    s[0][0][
-                        'vernacular_names'], styles['Left']) for s in species],
-                bulletFontName=BOLD_FONTNAME,
-                bulletFontSize=MEDIUM_FONTSIZE)
-            elements.append(speciesList)
-            elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+    return {
+        'licence_number': licence.licence_number,
+        'site_url': settings.SITE_URL,
+        'summary': [{
+            'name': p.purpose.name,
+            'status': p.purpose_status,
+            'start': p.start_date.strftime(DATE_FORMAT),
+            'end': p.expiry_date.strftime(DATE_FORMAT),
+        } for p in licence_purposes],
+        'purposes': [
+            _get_licence_purpose_data(licence, application, p)
+            for p in licence_purposes
+        ],
+    }
 
-        try:
-            # copy-to-licence sections with terms and additional information.
-            activity_util = ActivitySchemaUtil(selected_activity.application)
-            terms = selected_activity.additional_licence_info['terms']
-            for term in terms:
-                header = term['header']
-                if not header:
-                    continue
-                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-                elements.append(Paragraph(header.upper(), styles['BoldLeft']))
-                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-                text = activity_util.get_ctl_text(term)
-                elements.append(Paragraph(text, styles['Left']))
-                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
 
-        except BaseException:
-            pass
-
-        # PurposeSpecies Section
-#        for s in purpose.purpose_species_json:
-#            if s.has_key('is_additional_info') and s['is_additional_info']:
-#                continue
-#
-#            if s['details']:
-#                parser = HtmlParser(s['details'])
-#
-#                # Get and Display Purpose Species Header
-#                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-#                elements.append(
-#                    Paragraph(
-#                        s['header'],
-#                        styles['BoldLeft']
-#                    )
-#                )
-#                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-#
-#                purposeSpeciesList = add_parsed_details(parser, list_flowable=False)
-#                for info_item in purposeSpeciesList:
-#                    elements.append(KeepTogether(info_item))
-
-        for s in purpose.purpose_species_json:
-            if 'is_additional_info' in s and s['is_additional_info']:
-                continue
+def get_content_hash(data):
+    '''
+    Gets a hash of licence or licence purpose data.
+    '''
+    content = json.dumps(data, sort_keys=True, default=str)
 
-            if s['details']:
-                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-                purposeSpeciesList, listcounter = html_to_rl(s['details'], styles)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-                for info_item in purposeSpeciesList:
-                    elements.append(KeepTogether(info_item))
 
+class LicencePurposeFlowableCache(object):
+    '''
+    A bounded cache of the flowables rendered for licence purpose pages keyed
+    by the content hash of the purpose data. Copies are returned as flowables
+    are changed when a document is built.
 
-        # End PurposeSpecies Section
+    NOTE: the cache is per process so pages rendered by batch workers are
+    only reused within that batch.
+    '''
+    MAX_ENTRIES = 200
 
-        # application conditions
-        activity_conditions = selected_activity.application.conditions.filter(
-            licence_activity_id=selected_activity.licence_activity_id,
-            licence_purpose_id=issued_purpose.purpose.id)
-
-        if activity_conditions.exists():
-            elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-            elements.append(Paragraph('CONDITIONS', styles['BoldLeft']))
-            #elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-
-            # Conditions Section
-#            conditionList = []
-#            for s in activity_conditions.order_by('order'):
-#                parser = HtmlParser(s.condition)
-#                conditionList += add_parsed_details(parser, list_flowable=False)
-#                #elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-
-#            conditionList = ListFlowable(
-#                conditionList,
-#                bulletFontName=BOLD_FONTNAME, bulletFontSize=MEDIUM_FONTSIZE
-#            )
-#            elements.append(conditionList)
-
-            listcounter = 0
-            conditionList = []
-            for s in activity_conditions.order_by('order'):
-                #_conditionList, listcounter += html_to_rl(s.condition, styles)
-                _conditionList, listcounter = html_to_rl(s.condition_text, styles, listcounter)
-                conditionList += _conditionList
-
-            for info_item in conditionList:
-                elements.append(KeepTogether(info_item))
-
-            # End Conditions Section
-
-        elements += _layout_extracted_fields(licence.extracted_fields)
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key):
+        with cls._lock:
+            elements = cls._entries.get(key)
+            if elements is None:
+                return None
+            cls._entries.move_to_end(key)
+
+        return copy.deepcopy(elements)
+
+    @classmethod
+    def set(cls, key, elements):
+        elements = copy.deepcopy(elements)
+        with cls._lock:
+            cls._entries[key] = elements
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+
+def _create_licence_purpose(purpose):
+    '''
+    Creates the licence purpose details per page available on the activity.
+    '''
+    key = get_content_hash(purpose)
+    cached = LicencePurposeFlowableCache.get(key)
+    if cached is not None:
+        return cached
+
+    elements = []
+    licence_table_style = TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')])
+
+    # delegation holds the dates, licencee and issuer details.
+    delegation = []
+    elements.append(Paragraph(
+        purpose['name'].upper(),
+        styles['InfoTitleVeryLargeCenter']))
+    elements.append(Paragraph(
+        'Regulation {}, Biodiversity Conservation Regulations 2018'.format(purpose['regulation']),
+        styles['Center']))
+
+    # applicant details
+    delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+    address_paragraphs = [
+        Paragraph(line, styles['Left']) for line in purpose['address']
+    ]
+
+    delegation.append(
+        Table([[[Paragraph('Licence Number', styles['BoldLeft']),
+                Paragraph('Licence Holder', styles['BoldLeft']),
+                Paragraph('Address', styles['BoldLeft'])],
+                [Paragraph(
+                    purpose['licence_display'],
+                    styles['Left']
+                    )] + [Paragraph(
+                        purpose['applicant'],
+                        styles['Left']
+                    )] + address_paragraphs]], colWidths=(
+                        120, PAGE_WIDTH - (
+                            2 * PAGE_MARGIN) - 120
+                        ), style=licence_table_style))
+
+    # dates
+    dates_licensing_officer_table_style = TableStyle([(
+        'VALIGN', (0, 0), (-2, -1), 'TOP'),
+        ('VALIGN', (0, 0), (-1, -1), 'BOTTOM')])
+
+    delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+    date_headings = [
+        Paragraph(
+            'Date of Issue', styles['BoldLeft']), Paragraph(
+            'Date Valid From', styles['BoldLeft']), Paragraph(
+            'Date of Expiry', styles['BoldLeft'])]
+
+    date_values = [
+        Paragraph(purpose['issue_date'], styles['Left']),
+        Paragraph(purpose['start_date'], styles['Left']),
+        Paragraph(purpose['expiry_date'], styles['Left'])
+    ]
+
+    if purpose['original_issue_date']:
+        date_headings.insert(
+            0,
+            Paragraph(
+                'Original Date of Issue',
+                styles['BoldLeft']))
+        date_values.insert(
+            0,
+            Paragraph(purpose['original_issue_date'], styles['Left']))
+
+    delegation.append(
+        Table(
+            [[date_headings, date_values]],
+            colWidths=(120, PAGE_WIDTH - (2 * PAGE_MARGIN) - 120),
+            style=dates_licensing_officer_table_style))
+
+    delegation.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+
+    elements.append(KeepTogether(delegation))
+
+    # species
+    if purpose['species'] is not None:
+        elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        elements.append(Paragraph('SPECIES', styles['BoldLeft']))
+        elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        speciesList = ListFlowable(
+            [Paragraph(s, styles['Left']) for s in purpose['species']],
+            bulletFontName=BOLD_FONTNAME,
+            bulletFontSize=MEDIUM_FONTSIZE)
+        elements.append(speciesList)
         elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
 
-        # signature block
+    for header, text in purpose['terms']:
+        elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        elements.append(Paragraph(header.upper(), styles['BoldLeft']))
+        elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        elements.append(Paragraph(text, styles['Left']))
         elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
 
-        issue_officer = get_full_name(selected_activity.updated_by)
-        elements.append(Paragraph('____________________', styles['Left']))
-        elements.append(Paragraph(issue_officer, styles['Left']))
-        elements.append(Paragraph('LICENSING OFFICER', styles['Left']))
-        elements.append(
-            Paragraph('WILDLIFE PROTECTION BRANCH', styles['Left']))
+    # PurposeSpecies Section
+    for details in purpose['species_details']:
         elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-        elements.append(Paragraph('Delegate of CEO', styles['ItalicLeft']))
+        purposeSpeciesList, listcounter = html_to_rl(details, styles)
+
+        for info_item in purposeSpeciesList:
+            elements.append(KeepTogether(info_item))
+
+    # End PurposeSpecies Section
+
+    # application conditions
+    if purpose['conditions']:
         elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        elements.append(Paragraph('CONDITIONS', styles['BoldLeft']))
 
-        # additional information
-        for s in purpose.purpose_species_json:
-            if 'is_additional_info' in s and s['is_additional_info'] and s['details']:
-                # Get and Display Purpose Species Header
-                elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-                purposeSpeciesInfoList, listcounter = html_to_rl(s['details'], styles)
+        # Conditions Section
+        listcounter = 0
+        conditionList = []
+        for condition in purpose['conditions']:
+            _conditionList, listcounter = html_to_rl(condition, styles, listcounter)
+            conditionList += _conditionList
+
+        for info_item in conditionList:
+            elements.append(KeepTogether(info_item))
+
+        # End Conditions Section
+
+    elements += _layout_extracted_fields(purpose['extracted_fields'])
+    elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+
+    # signature block
+    elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+
+    elements.append(Paragraph('____________________', styles['Left']))
+    elements.append(Paragraph(purpose['issue_officer'], styles['Left']))
+    elements.append(Paragraph('LICENSING OFFICER', styles['Left']))
+    elements.append(
+        Paragraph('WILDLIFE PROTECTION BRANCH', styles['Left']))
+    elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+    elements.append(Paragraph('Delegate of CEO', styles['ItalicLeft']))
+    elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+
+    # additional information
+    for details in purpose['additional_info']:
+        elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
+        purposeSpeciesInfoList, listcounter = html_to_rl(details, styles)
 
-                for info_item in purposeSpeciesInfoList:
-                    elements.append(KeepTogether(info_item))
-        # End PurposeSpecies Section
+        for info_item in purposeSpeciesInfoList:
+            elements.append(KeepTogether(info_item))
+    # End PurposeSpecies Section
 
-        elements.append(PageBreak())
+    elements.append(PageBreak())
+
+    LicencePurposeFlowableCache.set(key, elements)
 
-    # create the summary for this licence.
-    site_url = settings.SITE_URL
+    return elements
+
+
+def _create_licence(licence_buffer, data):
+    '''
+    Creates licence summary and purpose details for licence data.
+    '''
     every_page_frame = Frame(
         PAGE_MARGIN,
         PAGE_MARGIN,
@@ -530,69 +625,52 @@ def _create_licence(licence_buffer, licence, application):
         pagesize=A4)
 
     # this is the only way to get data into the onPage callback function
-    doc.licence = licence
-    doc.site_url = site_url
-
-    licence_table_style = TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')])
+    doc.licence_number = data['licence_number']
+    doc.site_url = data['site_url']
 
     elements = []
 
     elements.append(Paragraph(
         'Licence Summary', styles['InfoTitleVeryLargeCenter']))
-    # elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-    # elements.append(Paragraph('Activities', styles['BoldLeft']))
-    # elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
-
-    # activityList = ListFlowable(
-    #     [Paragraph("{name}".format(
-    #         name=selected_activity.licence_activity.name
-    #     ),
-    #         styles['Left'],
-    #     ) for selected_activity in licence.current_activities],
-    #     bulletFontName=BOLD_FONTNAME, bulletFontSize=MEDIUM_FONTSIZE)
-    # elements.append(activityList)
 
     elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
     elements.append(Paragraph('Purposes', styles['BoldLeft']))
     elements.append(Spacer(1, SECTION_BUFFER_HEIGHT))
 
-    include = [
-        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_SUSPENDED,
-        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_CURRENT,
-        ApplicationSelectedActivityPurpose.PURPOSE_STATUS_DEFAULT,
-    ]
-
-    licence_purposes = [
-        p for p in licence.get_purposes_in_sequence()
-        if p.purpose_status in include and p.is_issued and p.expiry_date
-    ]
-
     purposeList = ListFlowable(
-        [Paragraph("{name} {start} - {end} ({status})".format(
-            name=p.purpose.name,
-            status=p.purpose_status,
-            start=p.start_date.strftime('%d/%m/%Y'),
-            end=p.expiry_date.strftime('%d/%m/%Y'),
-        ),
+        [Paragraph("{name} {start} - {end} ({status})".format(**p),
             styles['Left'],
-        ) for p in licence_purposes
+        ) for p in data['summary']
         ],
         bulletFontName=BOLD_FONTNAME, bulletFontSize=MEDIUM_FONTSIZE)
     elements.append(purposeList)
 
     elements.append(PageBreak())
 
-    for purpose in licence_purposes:
-        # if not purpose.is_issued or purpose.purpose_status not in include:
-        #     # Exclude purposes that are not issued.
-        #     continue
-        _create_licence_purpose(elements, purpose.selected_activity, purpose)
+    for purpose in data['purposes']:
+        elements += _create_licence_purpose(purpose)
 
     doc.build(elements)
 
     return licence_buffer
 
 
+def render_licence_pdf_bytes(data):
+    '''
+    Renders licence data to pdf bytes. Only the data is used so licences can
+    be rendered in worker processes.
+    '''
+    licence_buffer = BytesIO()
+
+    _create_licence(licence_buffer, data)
+
+    # Get the value of the BytesIO buffer
+    value = licence_buffer.getvalue()
+    licence_buffer.close()
+
+    return value
+
+
 def _layout_extracted_fields(extracted_fields):
     elements = []
 
@@ -721,29 +799,115 @@ def _layout_extracted_fields(extracted_fields):
     return elements
 
 
-def create_licence_doc(licence, application):
-    licence_buffer = BytesIO()
-
-    _create_licence(licence_buffer, licence, application)
+def _save_licence_doc(licence, content, content_hash):
     filename = 'licence-{}.pdf'.format(licence.licence_number)
-    document = LicenceDocument.objects.create(name=filename)
-    document._file.save(filename, File(licence_buffer), save=True)
-
-    licence_buffer.close()
+    document = LicenceDocument.objects.create(
+        name=filename, content_hash=content_hash)
+    document._file.save(filename, ContentFile(content), save=True)
 
     return document
 
 
-def create_licence_pdf_bytes(licence, application):
-    licence_buffer = BytesIO()
+def _is_licence_doc_current(licence, content_hash):
+    '''
+    Checks the licence document was rendered from content with the hash.
+    '''
+    document = licence.licence_document
 
-    _create_licence(licence_buffer, licence, application)
+    return document is not None \
+        and document.content_hash == content_hash \
+        and document.name == 'licence-{}.pdf'.format(licence.licence_number)
 
-    # Get the value of the BytesIO buffer
-    value = licence_buffer.getvalue()
-    licence_buffer.close()
 
-    return value
+def create_licence_doc(licence, application):
+    '''
+    Creates the licence document. The current licence document is returned
+    when the licence content is unchanged.
+    '''
+    data = get_licence_data(licence, application)
+    content_hash = get_content_hash(data)
+    if _is_licence_doc_current(licence, content_hash):
+        logger.debug('Licence {} document unchanged.'.format(
+            licence.licence_number))
+        return licence.licence_document
+
+    content = render_licence_pdf_bytes(data)
+
+    return _save_licence_doc(licence, content, content_hash)
+
+
+def create_licence_docs(licences, max_workers=None, callback=None):
+    '''
+    Creates documents for a batch of licences with changed content. Licences
+    are rendered concurrently on a pool of spawned worker processes, started
+    for the batch, so purpose pages are only reused within the batch.
+
+    :param licences: list of WildlifeLicence records.
+    :param max_workers: number of worker processes.
+    :param callback: called with each licence and its document, or with the
+    exception raised creating it.
+    :return: dictionary of licence id to LicenceDocument.
+    '''
+    documents = {}
+    to_render = {}
+    for licence in licences:
+        try:
+            data = get_licence_data(licence, licence.current_application)
+            content_hash = get_content_hash(data)
+            if _is_licence_doc_current(licence, content_hash):
+                documents[licence.id] = licence.licence_document
+                if callback:
+                    callback(licence, licence.licence_document)
+            else:
+                to_render[licence.id] = (licence, data, content_hash)
+
+        except Exception as e:
+            logger.error('ERR create_licence_docs licence {0}: {1}'.format(
+                licence.id, e))
+            if callback:
+                callback(licence, e)
+
+    if not to_render:
+        return documents
+
+    # workers are spawned rather than forked as the caller may have other
+    # threads holding connections and locks which must not be inherited.
+    workers = min(
+        max_workers if max_workers else int(settings.LICENCE_DOC_MAX_WORKERS),
+        len(to_render))
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_worker,
+            initargs=(os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'wildlifecompliance.settings'),),
+    ) as pool:
+        futures = dict(
+            (pool.submit(render_licence_pdf_bytes, data), licence_id)
+            for licence_id, (licence, data, content_hash)
+            in to_render.items()
+        )
+        for future in as_completed(futures):
+            licence, data, content_hash = to_render[futures[future]]
+            try:
+                document = _save_licence_doc(
+                    licence, future.result(), content_hash)
+                documents[licence.id] = document
+                result = document
+
+            except Exception as e:
+                logger.error('ERR create_licence_docs licence {0}: {1}'.format(
+                    licence.id, e))
+                result = e
+
+            if callback:
+                callback(licence, result)
+
+    return documents
+
+
+def create_licence_pdf_bytes(licence, application):
+    return render_licence_pdf_bytes(get_licence_data(licence, application))
 
 
 class HtmlParser(object):
@@ -843,6 +1007,76 @@ class HtmlParser(object):
         except KeyError as e:
             logger.warn('Species attribute <species_col> not found in HTML table definition. \n{}'.format(e))
 
+class SpeciesHtmlParser(object):
+    '''
+    A fast lxml parser for the species list in purpose species html. The
+    species are the values in the 'Common Name' column of the html tables.
+
+    Usage:
+        SpeciesHtmlParser.parse(html)
+            ['Jill', 'Eve']
+
+        SpeciesHtmlParser.parse_many([html_1, html_2, html_1])
+            {html_1: ['Jill', 'Eve'], html_2: ['Jack']}
+    '''
+    SPECIES_COLUMN = 'Common Name'
+
+    @staticmethod
+    def parse(raw_html):
+        '''
+        Parse a normalized list of species names from the html.
+        '''
+        from lxml import html as lxml_html
+
+        species = []
+        if not raw_html or not raw_html.strip():
+            return species
+
+        root = lxml_html.fromstring(raw_html)
+        for table in root.iter('table'):
+            headers = [
+                th.text_content().strip() for th in table.iter('th')
+            ]
+            if not headers:
+                continue
+            try:
+                idx = headers.index(SpeciesHtmlParser.SPECIES_COLUMN)
+            except ValueError:
+                raise Exception('Species name  (** Table column "{}") {}'.format(
+                    SpeciesHtmlParser.SPECIES_COLUMN, 'not found in HTML.'))
+
+            for tr in table.iter('tr'):
+                cells = tr.findall('td')
+                if len(cells) <= idx:
+                    continue
+                name = ' '.join(cells[idx].text_content().split())
+                if name and name not in species:
+                    species.append(name)
+
+        return species
+
+    @staticmethod
+    def parse_many(raw_htmls):
+        '''
+        Parse a batch of html with each distinct html parsed once. Html which
+        fails to parse is logged and given an empty list.
+
+        :return: dictionary of html to list of species names.
+        '''
+        parsed = {}
+        for raw_html in raw_htmls:
+            if raw_html in parsed:
+                continue
+            try:
+                parsed[raw_html] = SpeciesHtmlParser.parse(raw_html)
+
+            except Exception as e:
+                logger.warning('SpeciesHtmlParser: {}'.format(e))
+                parsed[raw_html] = []
+
+        return parsed
+
+
 import xml.sax as sax
 def html_to_rl(html, styleSheet, start_counter=0):
     html = html.encode('ascii', 'ignore').decode('ascii')
@@ -0,0 +1,14 @@
+import os
+
+
+def setup_worker(settings_module):
+    '''
+    Sets up Django in a spawned licence document worker process.
+
+    NOTE: no Django imports at module level as this is run before Django is
+    set up in the worker.
+    '''
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
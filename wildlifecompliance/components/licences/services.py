@@ -5,6 +5,7 @@ from datetime import date
 from wildlifecompliance.components.licences.utils import LicenceSchemaUtility
 
 from django.core.exceptions import ValidationError
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
@@ -255,21 +256,15 @@ class LicenceService(object):
             app_ids = apps.values('selected_activity__application_id')
 
             # get unique licences for applications.
-            licence_ids = Application.objects.values(
-                'licence_id',
+            licence_ids = Application.objects.values_list(
+                'licence_id', flat=True,
                 ).filter(
                     id__in=app_ids,
+                    licence_id__isnull=False,
                 ).distinct()
 
-            for licence_id in licence_ids:
-                # for each licence id verify if renewal required.
-                if not licence_id['licence_id']:
-                    continue
-                this_licence = LicenceService.verify_licence_renewal_for(
-                    licence_id['licence_id']
-                )
-                if this_licence:
-                    verified.append(this_licence)
+            renewal = LicenceRenewalBatch(list(licence_ids), request)
+            verified = renewal.run()
 
         except Exception as e:
             logger.error('ERR verify_licence_renewals: {0}'.format(e))
@@ -285,28 +280,10 @@ class LicenceService(object):
         '''
         try:
             verified = None
-            period_days = GlobalSettings.objects.values('value').filter(
-                key=GlobalSettings.LICENCE_RENEW_DAYS
-            ).first()
-            period_days = int(period_days['value'])
-
-            licence = WildlifeLicence.objects.get(
-                id=licence_id
-            )
-            purposes_to_renew = licence.get_purposes_to_renew(period_days)
-
-            # Set selected licence purpose to renew.
-            with transaction.atomic():
-
-                for purpose in purposes_to_renew:
-                    purpose.sent_renewal = True
-                    purpose.save()
-
-            if purposes_to_renew:
-                # Send out renewal notice. (only with request)
-                send_licence_renewal_notification(
-                    licence, purposes_to_renew, request)
-                verified = licence
+            renewal = LicenceRenewalBatch([licence_id], request)
+            renewed = renewal.run()
+            if renewed:
+                verified = renewed[0]
 
         except Exception as e:
             logger.error('ERR verify_licence_renewal_for {0}: {1}'.format(
@@ -327,8 +304,6 @@ class LicenceService(object):
         '''
         verified = []
         try:
-            # raise Exception('LicenceService not implemented')
-
             today = date.today()
 
             current_status = [
@@ -352,21 +327,15 @@ class LicenceService(object):
             app_ids = apps.values('selected_activity__application_id')
 
             # get unique licences for applications.
-            licence_ids = Application.objects.values(
-                'licence_id',
+            licence_ids = Application.objects.values_list(
+                'licence_id', flat=True,
                 ).filter(
                     id__in=app_ids,
+                    licence_id__isnull=False,
                 ).distinct()
 
-            for licence_id in licence_ids:
-                # for each licence id verify if renewal required.
-                if not licence_id['licence_id']:
-                    continue
-                this_licence = LicenceService.verify_expired_licence_for(
-                    licence_id['licence_id']
-                )
-                if this_licence:
-                    verified.append(this_licence)
+            expiry = LicenceExpiryBatch(list(licence_ids))
+            verified = expiry.run()
 
         except Exception as e:
             logger.error('ERR verify_licence_renewal: {0}'.format(e))
@@ -380,44 +349,12 @@ class LicenceService(object):
         Verifies licences requiring renewing by expiring licence purposes after
         their expiry date and sending out a renewal notification.
         '''
-        EXPIRED = ApplicationSelectedActivityPurpose.PURPOSE_STATUS_EXPIRED
         try:
             verified = None
-            # raise Exception('LicenceService not implemented')
-            licence = WildlifeLicence.objects.get(
-                id=licence_id
-            )
-            purposes_to_expire = licence.get_purposes_to_expire()
-
-            # Set selected licence purpose to expired.
-            with transaction.atomic():
-                for purpose in purposes_to_expire:
-                    purpose.purpose_status = EXPIRED
-                    purpose.save()
-
-            if not licence.has_purposes_in_current():
-                # Update licence status if all purposes expired.
-                new_status = licence.LICENCE_STATUS_EXPIRE
-                licence.set_property_cache_status(new_status)
-                licence.save()
-                # Prevent future proposals on recently opened applications.
-                activities = licence.get_activities_in_open_applications()
-                for activity in activities:
-                    application = activity.application
-                    application.set_property_nonactive_licence(True)
-                    application.save()
-
-            if purposes_to_expire:
-                # Re-generate licence.
-                licence.generate_doc()
-                application = licence.current_application
-                application.licence_document = licence.licence_document
-                application.save()
-                logger.info(
-                    'Licence {0} re-generated with expired purpose.'.format(
-                        licence.licence_number,
-                    ))
-                verified = licence
+            expiry = LicenceExpiryBatch([licence_id])
+            expired = expiry.run()
+            if expired:
+                verified = expired[0]
 
         except Exception as e:
             logger.error('ERR verify_licence_renewal: {0}'.format(e))
@@ -538,6 +475,214 @@ class LicenceService(object):
         return new_version
 
 
+class LicenceDocumentQueue(object):
+    '''
+    A queue regenerating licence documents on a pool of worker processes.
+    Licences with unchanged content keep their document. The document is also
+    set on the current application for each licence.
+    '''
+    PROGRESS_INTERVAL = 50              # log progress after each number done.
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers if max_workers else int(
+            settings.LICENCE_DOC_MAX_WORKERS)
+        self.licence_ids = []
+        self.done = []
+        self.failed = []
+
+    def put(self, licence_id):
+        self.licence_ids.append(licence_id)
+
+    def get_progress(self):
+        '''
+        Get a tuple of the number done, failed and total queued.
+        '''
+        return len(self.done), len(self.failed), len(self.licence_ids)
+
+    def generated(self, licence, document):
+        '''
+        Record the document (or exception) created for a licence.
+        '''
+        if isinstance(document, Exception):
+            self.failed.append(licence.id)
+        else:
+            if licence.licence_document_id != document.id:
+                WildlifeLicence.objects.filter(
+                    id=licence.id,
+                ).update(licence_document=document)
+            Application.objects.filter(
+                id=licence.current_application_id,
+            ).update(licence_document=document)
+            logger.info(
+                'Licence {0} re-generated with expired purpose.'.format(
+                    licence.licence_number,
+                ))
+            self.done.append(licence.id)
+
+        done, failed, total = self.get_progress()
+        if (done + failed) % self.PROGRESS_INTERVAL == 0:
+            logger.info('LicenceDocumentQueue: {0} of {1} done {2} failed.'.format(
+                done, total, failed))
+
+    def join(self):
+        '''
+        Process the queued licences and wait for all to complete.
+
+        :return: list of licence ids with documents regenerated.
+        '''
+        from wildlifecompliance.components.licences.pdf import (
+            create_licence_docs
+        )
+        if self.licence_ids:
+            licences = WildlifeLicence.objects.filter(
+                id__in=self.licence_ids,
+            ).select_related('current_application', 'licence_document')
+            create_licence_docs(
+                list(licences), self.max_workers, self.generated)
+
+            done, failed, total = self.get_progress()
+            logger.info('LicenceDocumentQueue: {0} of {1} done {2} failed.'.format(
+                done, total, failed))
+
+        return self.done
+
+
+class LicenceExpiryBatch(object):
+    '''
+    Expires the licence purposes past their expiry date for a batch of
+    licences. Purpose statuses, licence statuses and the nonactive flag on
+    open applications are each updated with a single query and licence
+    documents are regenerated on a LicenceDocumentQueue.
+    '''
+    def __init__(self, licence_ids, max_workers=None):
+        self.licence_ids = licence_ids
+        self.queue = LicenceDocumentQueue(max_workers)
+
+    def run(self):
+        '''
+        :return: list of licences with purposes expired.
+        '''
+        from wildlifecompliance.components.main.utils import (
+            set_json_key_expression
+        )
+        EXPIRED = ApplicationSelectedActivityPurpose.PURPOSE_STATUS_EXPIRED
+        current_status = [
+            ApplicationSelectedActivityPurpose.PURPOSE_STATUS_DEFAULT,
+            ApplicationSelectedActivityPurpose.PURPOSE_STATUS_CURRENT,
+        ]
+        today = date.today()
+
+        licences = WildlifeLicence.objects.filter(
+            id__in=self.licence_ids,
+        ).select_related('current_application', 'licence_category')
+
+        purpose_ids = []
+        expired_licences = []
+        nonactive_licences = []
+        for licence in licences:
+            purposes = [
+                p for p in licence.get_proposed_purposes_in_applications(
+                    ).filter(purpose_status__in=current_status)
+            ]
+            to_expire = [
+                p.id for p in purposes
+                if p.expiry_date and p.expiry_date < today
+            ]
+            if not to_expire:
+                continue
+
+            purpose_ids += to_expire
+            expired_licences.append(licence)
+            if len(to_expire) == len(purposes):
+                nonactive_licences.append(licence)
+
+        application_ids = []
+        for licence in nonactive_licences:
+            application_ids += [
+                a.application_id
+                for a in licence.get_activities_in_open_applications()
+            ]
+
+        with transaction.atomic():
+            ApplicationSelectedActivityPurpose.objects.filter(
+                id__in=purpose_ids,
+            ).update(purpose_status=EXPIRED)
+
+            # Update licence status if all purposes expired.
+            WildlifeLicence.objects.filter(
+                id__in=[l.id for l in nonactive_licences],
+            ).update(property_cache=set_json_key_expression(
+                'property_cache',
+                'status',
+                WildlifeLicence.LICENCE_STATUS_EXPIRE,
+            ))
+
+            # Prevent future proposals on recently opened applications.
+            Application.objects.filter(
+                id__in=set(application_ids),
+            ).update(property_cache=set_json_key_expression(
+                'property_cache', 'nonactive_licence', 'True'
+            ))
+
+        logger.info('LicenceExpiryBatch: {0} purposes on {1} licences expired.'.format(
+            len(purpose_ids), len(expired_licences)))
+
+        # Re-generate licences.
+        for licence in expired_licences:
+            self.queue.put(licence.id)
+        regenerated = set(self.queue.join())
+
+        return [l for l in expired_licences if l.id in regenerated]
+
+
+class LicenceRenewalBatch(object):
+    '''
+    Flags the licence purposes about to expire for renewal on a batch of
+    licences with a single update, then notifies the applicants.
+    '''
+    def __init__(self, licence_ids, request=None):
+        self.licence_ids = licence_ids
+        self.request = request
+
+    def run(self):
+        '''
+        :return: list of licences notified for renewal.
+        '''
+        verified = []
+        period_days = GlobalSettings.objects.values('value').filter(
+            key=GlobalSettings.LICENCE_RENEW_DAYS
+        ).first()
+        period_days = int(period_days['value'])
+
+        licences = WildlifeLicence.objects.filter(
+            id__in=self.licence_ids,
+        ).select_related('current_application', 'licence_category')
+
+        renewals = []
+        for licence in licences:
+            purposes_to_renew = licence.get_purposes_to_renew(period_days)
+            if purposes_to_renew:
+                renewals.append((licence, purposes_to_renew))
+
+        # Set selected licence purpose to renew.
+        ApplicationSelectedActivityPurpose.objects.filter(
+            id__in=[p.id for l, purposes in renewals for p in purposes],
+        ).update(sent_renewal=True)
+
+        for licence, purposes_to_renew in renewals:
+            try:
+                # Send out renewal notice. (only with request)
+                send_licence_renewal_notification(
+                    licence, purposes_to_renew, self.request)
+                verified.append(licence)
+
+            except Exception as e:
+                logger.error('ERR LicenceRenewalBatch licence {0}: {1}'.format(
+                    licence.id, e))
+
+        return verified
+
+
 class GenerateAdminLicenceSchema(AdministrationAction):
     '''
     An AdministrationAction for a Licence Purpose Schema.
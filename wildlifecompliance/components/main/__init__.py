@@ -1,3 +1,5 @@
+default_app_config = 'wildlifecompliance.components.main.apps.MainConfig'
+
 from django.db import connections, router, transaction
 
 
@@ -143,6 +143,19 @@ class GlobalSettingsAdmin(admin.ModelAdmin):
     ordering = ('key',)
 
 
+@admin.register(models.CronJobRun)
+class CronJobRunAdmin(admin.ModelAdmin):
+    list_display = [
+        'run_id', 'job', 'status', 'started', 'duration', 'row_count',
+        'error_count',
+    ]
+    list_filter = ['job', 'status']
+    readonly_fields = [
+        'run_id', 'job', 'status', 'started', 'duration', 'row_count',
+        'error_count', 'error',
+    ]
+
+
 @admin.register(models.SystemMaintenance)
 class SystemMaintenanceAdmin(admin.ModelAdmin):
     list_display = [
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.translation import ugettext_lazy as _
+
+
+class MainConfig(AppConfig):
+    name = 'wildlifecompliance.components.main'
+    verbose_name = _('main')
+
+    def ready(self):
+        import wildlifecompliance.components.main.signals
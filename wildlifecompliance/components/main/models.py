@@ -1,11 +1,12 @@
 from __future__ import unicode_literals
 import logging
+import time
 from datetime import datetime
 
 from django.db import models
 from django.conf import settings
 from django.contrib.gis.db.models import MultiPolygonField
-from django.db.models.query import QuerySet
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.utils.encoding import python_2_unicode_compatible
 from ledger.accounts.models import EmailUser
@@ -182,39 +183,713 @@ class Document(models.Model):
         return self.name or self.filename
 
 
-# Extensions for Django's QuerySet
+class ComputedField(object):
+    '''
+    Declaration of a model field storing the value of a computed property so
+    the value can be filtered and ordered on in the database.
 
-def computed_filter(self, **kwargs):
-    kwargs['__filter'] = True
-    return self.computed_filter_or_exclude(**kwargs)
+    :param field_name: name of the model field storing the value.
+    :param compute: name of the property (or method) computing the value.
+    :param depends_on: list of ComputedFieldDependency changing the value.
+    '''
+    def __init__(self, field_name, compute, depends_on=None):
+        self.field_name = field_name
+        self.compute = compute
+        self.depends_on = depends_on if depends_on else []
+
+    def __str__(self):
+        return 'ComputedField {0} from {1}'.format(
+            self.field_name, self.compute)
+
+    def get_value(self, instance):
+        value = getattr(instance, self.compute)
+
+        return value() if callable(value) else value
 
 
-def computed_exclude(self, **kwargs):
-    kwargs['__filter'] = False
-    return self.computed_filter_or_exclude(**kwargs)
+class ComputedFieldDependency(object):
+    '''
+    A related model whose changes require a computed field to be recomputed.
+
+    :param model: label of the related model ('app_label.ModelName'), the
+        related model class or the name of a many-to-many field on the owner
+        model.
+    :param owner_id: attribute on the related model identifying the owner.
+    :param m2m: flag to indicate the dependency is a many-to-many field.
+    :param owner_ids: function returning the owner identifiers for a related
+        record, used when the owner is not referenced by an attribute.
+    '''
+    def __init__(self, model, owner_id=None, m2m=False, owner_ids=None):
+        self.model = model
+        self.owner_id = owner_id
+        self.m2m = m2m
+        self.owner_ids = owner_ids
+
+    @property
+    def label(self):
+        if isinstance(self.model, str):
+            return self.model
+
+        return self.model._meta.label
+
+    def get_sender(self):
+        from django.apps import apps
+
+        if isinstance(self.model, str):
+            return apps.get_model(self.model)
+
+        return self.model
+
+    def get_m2m_owner_ids(self, owner_model, instance, action, pk_set):
+        '''
+        Get the identifiers of the owners changed by a many-to-many signal
+        sent from either side of the relation.
+        '''
+        if isinstance(instance, owner_model):
+            return [instance.pk]
+
+        # owners cleared from the related side are only known before clear.
+        cleared = '_{0}_cleared_owner_ids'.format(self.model)
+        if action == 'pre_clear':
+            field = owner_model._meta.get_field(self.model)
+            setattr(instance, cleared, list(
+                field.remote_field.through.objects.filter(**{
+                    field.m2m_reverse_field_name(): instance.pk,
+                }).values_list(field.m2m_field_name(), flat=True)
+            ))
+            return []
+
+        if action == 'post_clear':
+            return getattr(instance, cleared, [])
+
+        return list(pk_set) if pk_set else []
+
+    def get_owner_ids(self, instance):
+        '''
+        Get the identifiers of the owners affected by a related record.
+        '''
+        if self.owner_ids:
+            return [i for i in self.owner_ids(instance) if i]
+
+        owner_id = getattr(instance, self.owner_id, None)
+
+        return [owner_id] if owner_id else []
+
+
+class ComputedFieldsMixin(object):
+    '''
+    Mixin for models storing computed properties as ComputedField declared
+    on COMPUTED_FIELDS.
+
+    Computed fields are recomputed incrementally when a dependency is saved,
+    deleted or changed and are never written from a stale instance on save.
+    '''
+    COMPUTED_FIELDS = []
+    COMPUTED_CHUNK_SIZE = 500
+
+    def save(self, *args, **kwargs):
+        computed = [f.field_name for f in self.COMPUTED_FIELDS]
+        if computed and not self._state.adding \
+                and not kwargs.get('update_fields') \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in computed
+            ]
+
+        super(ComputedFieldsMixin, self).save(*args, **kwargs)
+
+    def get_computed_values(self, fields=None):
+        '''
+        Get the current value of computed fields for this instance.
+
+        :return: dictionary of field name to computed value.
+        '''
+        fields = fields if fields else self.COMPUTED_FIELDS
+
+        return dict([(f.field_name, f.get_value(self)) for f in fields])
+
+    def refresh_computed_fields(self, fields=None):
+        '''
+        Recompute and store computed fields for this instance.
+        '''
+        values = self.get_computed_values(fields)
+        type(self).objects.filter(pk=self.pk).update(**values)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def recompute_computed_fields(cls, ids=None, fields=None, verify=False):
+        '''
+        Recompute computed fields for instances with the identifiers (or all
+        instances) and store values which have changed.
+
+        :param verify: flag to report differences without storing values.
+        :return: list of (pk, field name, stored value, computed value) for
+            each value found out of date.
+        '''
+        fields = fields if fields else cls.COMPUTED_FIELDS
+        queryset = cls.objects.all()
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+        changed = []
+        size = cls.COMPUTED_CHUNK_SIZE
+        for chunk in [pks[i:i + size] for i in range(0, len(pks), size)]:
+            for instance in cls.objects.filter(pk__in=chunk):
+                values = instance.get_computed_values(fields)
+                updates = {}
+                for name, value in values.items():
+                    if getattr(instance, name) != value:
+                        updates[name] = value
+                        changed.append(
+                            (instance.pk, name, getattr(instance, name), value)
+                        )
+
+                if updates and not verify:
+                    cls.objects.filter(pk=instance.pk).update(**updates)
+
+        return changed
+
+    @classmethod
+    def recompute_computed_dependants(cls, model, ids):
+        '''
+        Recompute computed fields depending on a related model for instances
+        with the identifiers, after related records are changed without
+        signals (ie. by a queryset update).
+        '''
+        fields = [
+            f for f in cls.COMPUTED_FIELDS
+            if [d for d in f.depends_on if d.label == model._meta.label]
+        ]
+        if fields:
+            cls.recompute_computed_fields(ids=ids, fields=fields)
+
+    @classmethod
+    def connect_computed_fields(cls):
+        '''
+        Connect signals from the declared dependencies to recompute the
+        computed fields. Called once from the app signals module.
+        '''
+        from django.db.models.signals import (
+            post_save, post_delete, m2m_changed
+        )
 
+        dependencies = {}
+        for field in cls.COMPUTED_FIELDS:
+            for dependency in field.depends_on:
+                key = (dependency.model, dependency.m2m)
+                dependencies.setdefault(key, (dependency, []))[1].append(field)
+
+        for dependency, fields in dependencies.values():
+            uid = '{0}.{1}.computed'.format(cls._meta.label, dependency.label)
+
+            if dependency.m2m:
+                def _m2m_changed(sender, instance, action, pk_set=None,
+                                 dependency=dependency, fields=fields,
+                                 **kwargs):
+                    ids = dependency.get_m2m_owner_ids(
+                        cls, instance, action, pk_set)
+                    if ids and action in [
+                            'post_add', 'post_remove', 'post_clear']:
+                        cls.recompute_computed_fields(
+                            ids=ids, fields=fields,
+                        )
+
+                m2m_changed.connect(
+                    _m2m_changed,
+                    sender=getattr(cls, dependency.model).through,
+                    weak=False,
+                    dispatch_uid=uid,
+                )
+                continue
+
+            def _changed(sender, instance, dependency=dependency,
+                         fields=fields, **kwargs):
+                owner_ids = dependency.get_owner_ids(instance)
+                if owner_ids:
+                    cls.recompute_computed_fields(
+                        ids=owner_ids, fields=fields,
+                    )
+
+            sender = dependency.get_sender()
+            for signal in [post_save, post_delete]:
+                signal.connect(
+                    _changed, sender=sender, weak=False, dispatch_uid=uid,
+                )
+
+
+class PropertyCacheKeys(object):
+    '''
+    Declaration of keys on a model property cache which are resolved
+    together by a method and kept until their inputs change.
+
+    :param keys: names of the keys on the property cache.
+    :param resolve: name of the method setting the keys.
+    :param fields: names of model fields the keys are resolved from.
+    :param depends_on: list of ComputedFieldDependency changing the keys.
+    :param refresh: name of a method returning True when the keys are to be
+        resolved once for each instance, for inputs which can change outside
+        this process.
+    '''
+    def __init__(self, keys, resolve, fields=None, depends_on=None,
+                 refresh=None):
+        self.keys = keys
+        self.resolve = resolve
+        self.fields = fields if fields else []
+        self.depends_on = depends_on if depends_on else []
+        self.refresh = refresh
+
+    def __str__(self):
+        return 'PropertyCacheKeys {0} from {1}'.format(
+            ', '.join(self.keys), self.resolve)
+
+
+class PropertyCacheMixin(object):
+    '''
+    Mixin for models keeping resolved properties on a property_cache with
+    the keys declared on PROPERTY_CACHE_KEYS.
+
+    Keys are resolved on save only when missing, when their fields have
+    changed since the instance was loaded or when a dependency has changed.
+    A dependency change removes the keys from stored records and marks them
+    stale for instances already loaded. Stale marks are read once for a
+    loaded instance and again on save.
+    '''
+    PROPERTY_CACHE_KEYS = []
+    PROPERTY_CACHE_STALE_KEY = 'wildlifecompliance.property_cache.{0}.{1}.{2}'
+    PROPERTY_CACHE_STALE_TIMEOUT = 3600
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(PropertyCacheMixin, cls).from_db(
+            db, field_names, values)
+        instance.set_property_cache_loaded(checked=False)
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.property_cache is None:
+            self.property_cache = {}
+        self.resolve_property_cache(
+            self.get_stale_property_cache_keys(refresh=True))
+
+        super(PropertyCacheMixin, self).save(*args, **kwargs)
+        self.set_property_cache_loaded()
+
+    def set_property_cache_loaded(self, checked=True):
+        '''
+        Record when this instance was loaded with the values of the fields
+        the property cache is resolved from.
+
+        :param checked: flag to indicate the property cache is known to be
+            current so stale marks need not be read.
+        '''
+        fields = set([f for p in self.PROPERTY_CACHE_KEYS for f in p.fields])
+        # deferred fields are left out rather than loaded.
+        values = dict([
+            (f, self.__dict__[f]) for f in fields if f in self.__dict__
+        ])
+        self._property_cache_loaded = (time.time(), values)
+        self._property_cache_invalidated = {} if checked else None
+
+    @classmethod
+    def get_property_cache_stale_key(cls, pk, property_cache_keys):
+        return cls.PROPERTY_CACHE_STALE_KEY.format(
+            cls._meta.label, pk, property_cache_keys.resolve)
+
+    def get_stale_property_cache_keys(self, refresh=False):
+        '''
+        Get the declared property cache keys to be resolved for this instance.
+
+        :param refresh: flag to read the stale marks again.
+        '''
+        loaded = getattr(self, '_property_cache_loaded', None)
+        if loaded is None or not self.pk:
+            return list(self.PROPERTY_CACHE_KEYS)
+
+        loaded_at, values = loaded
+        invalidated = self._property_cache_invalidated
+        if refresh or invalidated is None:
+            invalidated = cache.get_many([
+                self.get_property_cache_stale_key(self.pk, p)
+                for p in self.PROPERTY_CACHE_KEYS
+            ])
+            self._property_cache_invalidated = invalidated
+
+        resolved = getattr(self, '_property_cache_resolved', set())
+
+        property_cache = self.property_cache or {}
+        stale = []
+        for p in self.PROPERTY_CACHE_KEYS:
+            missing = [k for k in p.keys if k not in property_cache]
+            changed = [
+                f for f in p.fields
+                if f in values and self.__dict__.get(f) != values[f]
+            ]
+            invalidated_at = invalidated.get(
+                self.get_property_cache_stale_key(self.pk, p))
+            refreshed = not p.refresh or p.resolve in resolved \
+                or not getattr(self, p.refresh)()
+            if missing or changed or not refreshed or (
+                    invalidated_at and invalidated_at >= loaded_at):
+                stale.append(p)
+
+        return stale
+
+    def resolve_property_cache(self, property_cache_keys=None):
+        '''
+        Resolve the declared property cache keys (or all keys) on this
+        instance without saving.
+        '''
+        if property_cache_keys is None:
+            property_cache_keys = self.PROPERTY_CACHE_KEYS
+
+        resolved = getattr(self, '_property_cache_resolved', set())
+        for p in property_cache_keys:
+            getattr(self, p.resolve)()
+            resolved.add(p.resolve)
+        self._property_cache_resolved = resolved
+
+    @classmethod
+    def invalidate_property_cache(cls, ids, property_cache_keys):
+        '''
+        Remove the property cache keys from stored records with the
+        identifiers so they are resolved again on next use.
+        '''
+        from wildlifecompliance.components.main.utils import (
+            remove_json_keys_expression,
+        )
+
+        keys = [k for p in property_cache_keys for k in p.keys]
+        cls.objects.filter(pk__in=ids).update(
+            property_cache=remove_json_keys_expression('property_cache', keys)
+        )
+
+        now = time.time()
+        cache.set_many(dict([
+            (cls.get_property_cache_stale_key(pk, p), now)
+            for pk in ids for p in property_cache_keys
+        ]), cls.PROPERTY_CACHE_STALE_TIMEOUT)
+
+    @classmethod
+    def invalidate_property_cache_dependants(cls, model, ids):
+        '''
+        Invalidate property cache keys depending on a related model for
+        records with the identifiers, after related records are changed
+        without signals (ie. by a queryset update).
+        '''
+        property_cache_keys = [
+            p for p in cls.PROPERTY_CACHE_KEYS
+            if [d for d in p.depends_on if d.label == model._meta.label]
+        ]
+        if property_cache_keys:
+            cls.invalidate_property_cache(ids, property_cache_keys)
+
+    @classmethod
+    def connect_property_cache(cls):
+        '''
+        Connect signals from the declared dependencies to invalidate the
+        property cache keys. Called once from the app signals module.
+        '''
+        from django.db.models.signals import (
+            post_save, post_delete, m2m_changed
+        )
 
-def computed_filter_or_exclude(self, **kwargs):
-    do_filter = kwargs.pop('__filter', True)
-    matched_pk_list = [item.pk for item in self for (field, match) in map(
-        lambda arg: (arg[0].replace('__in', ''),
-                     arg[1] if isinstance(arg[1], (list, QuerySet)) else [arg[
-                         1]]
-                     ), kwargs.items()
-    ) if getattr(item, field) in match]
-    return self.filter(pk__in=matched_pk_list) if do_filter else self.exclude(
-        pk__in=matched_pk_list)
+        dependencies = {}
+        for p in cls.PROPERTY_CACHE_KEYS:
+            for dependency in p.depends_on:
+                key = (dependency.label, dependency.m2m)
+                dependencies.setdefault(key, (dependency, []))[1].append(p)
+
+        for dependency, property_cache_keys in dependencies.values():
+            uid = '{0}.{1}.property_cache'.format(
+                cls._meta.label, dependency.label)
+
+            if dependency.m2m:
+                def _m2m_changed(sender, instance, action, pk_set=None,
+                                 dependency=dependency,
+                                 property_cache_keys=property_cache_keys,
+                                 **kwargs):
+                    ids = dependency.get_m2m_owner_ids(
+                        cls, instance, action, pk_set)
+                    if ids and action in [
+                            'post_add', 'post_remove', 'post_clear']:
+                        cls.invalidate_property_cache(ids, property_cache_keys)
+
+                m2m_changed.connect(
+                    _m2m_changed,
+                    sender=getattr(cls, dependency.model).through,
+                    weak=False,
+                    dispatch_uid=uid,
+                )
+                continue
+
+            def _changed(sender, instance, dependency=dependency,
+                         property_cache_keys=property_cache_keys, **kwargs):
+                owner_ids = dependency.get_owner_ids(instance)
+                if owner_ids:
+                    cls.invalidate_property_cache(
+                        owner_ids, property_cache_keys)
+
+            for signal in [post_save, post_delete]:
+                signal.connect(
+                    _changed,
+                    sender=dependency.get_sender(),
+                    weak=False,
+                    dispatch_uid=uid,
+                )
+
+
+class ReferenceSource(object):
+    '''
+    A model issuing reference numbers which are registered on ReferenceNumber.
+
+    :param model: label of the model ('app_label.ModelName').
+    :param field: name of the field holding the reference number.
+    :param url: format string for the internal url given the record id, or a
+        callable returning the url given the record.
+    :param exclude: filter of records which cannot be resolved.
+    '''
+    def __init__(self, model, field, url, exclude=None):
+        self.model = model
+        self.field = field
+        self.url = url
+        self.exclude = exclude
 
+    def __str__(self):
+        return 'ReferenceSource {0}.{1}'.format(self.model, self.field)
+
+    def get_model(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model)
+
+    def get_url(self, object_id):
+        '''
+        Get the url for a registered record without fetching the record
+        unless required.
+
+        :return: url string or None when the record cannot be resolved.
+        '''
+        if not callable(self.url) and not self.exclude:
+            return self.url.format(id=object_id)
+
+        records = self.get_model().objects.filter(pk=object_id)
+        if self.exclude:
+            records = records.exclude(**self.exclude)
+        record = records.first()
+        if not record:
+            return None
+
+        if callable(self.url):
+            return self.url(record)
+
+        return self.url.format(id=record.id)
+
+
+class ReferenceNumber(models.Model):
+    '''
+    Registry of issued reference numbers to the record they identify so a
+    reference number can be resolved with one indexed lookup.
+
+    Registered on save of the SOURCES models and backfilled with the
+    register_reference_numbers command.
+    '''
+    SOURCES = [
+        ReferenceSource(
+            'wildlifecompliance.Application',
+            'lodgement_number',
+            '/internal/application/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.WildlifeLicence',
+            'licence_number',
+            lambda licence: licence.licence_document._file.url,
+        ),
+        ReferenceSource(
+            'wildlifecompliance.Return',
+            'lodgement_number',
+            '/internal/return/{id}',
+            exclude={'processing_status__in': ['future']},
+        ),
+        ReferenceSource(
+            'wildlifecompliance.OrganisationRequest',
+            'lodgement_number',
+            '/internal/organisations/access/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.CallEmail',
+            'number',
+            '/internal/call_email/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.Offence',
+            'lodgement_number',
+            '/internal/offence/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.LegalCase',
+            'number',
+            '/internal/legal_case/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.Inspection',
+            'number',
+            '/internal/inspection/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.SanctionOutcome',
+            'lodgement_number',
+            '/internal/sanction_outcome/{id}',
+        ),
+        ReferenceSource(
+            'wildlifecompliance.Artifact',
+            'number',
+            '/internal/object/{id}',
+        ),
+    ]
+
+    reference = models.CharField(max_length=64, unique=True)
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType', on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
 
-queryset_methods = {
-    'computed_filter': computed_filter,
-    'computed_exclude': computed_exclude,
-    'computed_filter_or_exclude': computed_filter_or_exclude,
-}
+    class Meta:
+        app_label = 'wildlifecompliance'
+        index_together = ('content_type', 'object_id')
 
+    def __str__(self):
+        return '{0} {1}: {2}'.format(
+            self.content_type, self.object_id, self.reference)
+
+    @classmethod
+    def get_source(cls, model):
+        '''
+        Get the ReferenceSource for a model or its (multi-table) parent.
+        '''
+        for source in cls.SOURCES:
+            if issubclass(model, source.get_model()):
+                return source
+
+        return None
+
+    @classmethod
+    def register(cls, instance, source=None):
+        '''
+        Register the reference number issued to a record, replacing the
+        record previously registered under the number.
+        '''
+        from django.contrib.contenttypes.models import ContentType
+
+        source = source if source else cls.get_source(type(instance))
+        reference = getattr(instance, source.field, None)
+        if not reference:
+            return
+
+        content_type = ContentType.objects.get_for_model(source.get_model())
+        registered = cls.objects.filter(reference=reference).values_list(
+            'content_type_id', 'object_id').first()
+        if registered == (content_type.id, instance.pk):
+            return
+
+        cls.objects.update_or_create(
+            reference=reference,
+            defaults={
+                'content_type': content_type,
+                'object_id': instance.pk,
+            }
+        )
 
-for method_name, method in queryset_methods.items():
-    setattr(QuerySet, method_name, method)
+    @classmethod
+    def register_all(cls, source, chunk_size=1000):
+        '''
+        Bulk register the reference numbers issued by a source model which
+        are not yet registered.
+
+        :return: number of reference numbers registered.
+        '''
+        from django.contrib.contenttypes.models import ContentType
+
+        model = source.get_model()
+        content_type = ContentType.objects.get_for_model(model)
+        issued = model.objects.exclude(
+            **{'{}__isnull'.format(source.field): True}
+        ).exclude(
+            **{source.field: ''}
+        ).order_by('pk').values_list(source.field, 'pk')
+
+        # the latest record issued a reference number is registered.
+        references = dict(issued)
+        registered = set(cls.objects.filter(
+            reference__in=references.keys()
+        ).values_list('reference', flat=True))
+
+        entries = [
+            cls(reference=reference, content_type=content_type, object_id=pk)
+            for reference, pk in references.items()
+            if reference not in registered
+        ]
+        cls.objects.bulk_create(entries, batch_size=chunk_size)
+
+        return len(entries)
+
+    @classmethod
+    def unregister(cls, instance, source=None):
+        from django.contrib.contenttypes.models import ContentType
+
+        source = source if source else cls.get_source(type(instance))
+        content_type = ContentType.objects.get_for_model(source.get_model())
+        cls.objects.filter(
+            content_type=content_type, object_id=instance.pk).delete()
+
+    @classmethod
+    def resolve(cls, reference):
+        '''
+        Resolve a reference number to the internal url of its record.
+
+        :return: url string or None when the reference is not registered.
+        '''
+        from django.contrib.contenttypes.models import ContentType
+
+        registered = cls.objects.filter(reference=reference).values_list(
+            'content_type_id', 'object_id').first()
+        if not registered:
+            return None
+
+        content_type_id, object_id = registered
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        source = cls.get_source(model)
+
+        return source.get_url(object_id) if source else None
+
+    @classmethod
+    def connect_sources(cls):
+        '''
+        Connect signals registering reference numbers on save of the source
+        models (and their subclasses). Called once from the app signals
+        module.
+        '''
+        from django.apps import apps
+        from django.db.models.signals import post_save, post_delete
+
+        for model in apps.get_models():
+            source = cls.get_source(model)
+            if not source:
+                continue
+
+            def _saved(sender, instance, source=source, **kwargs):
+                cls.register(instance, source)
+
+            def _deleted(sender, instance, source=source, **kwargs):
+                cls.unregister(instance, source)
+
+            uid = '{0}.reference_number'.format(model._meta.label)
+            post_save.connect(
+                _saved, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(
+                _deleted, sender=model, weak=False, dispatch_uid=uid)
 
 
 class TemporaryDocumentCollection(models.Model):
@@ -257,6 +932,37 @@ class GlobalSettings(models.Model):
         return "{}, {}".format(self.key, self.value)
 
 
+@python_2_unicode_compatible
+class CronJobRun(models.Model):
+    '''
+    Metrics for a job executed by the cron task runner.
+    '''
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_CHOICES = (
+        (STATUS_SUCCESS, 'Success'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_SKIPPED, 'Skipped'),
+    )
+
+    run_id = models.CharField(max_length=32, db_index=True)
+    job = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    started = models.DateTimeField()
+    duration = models.FloatField(default=0)  # seconds
+    row_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        app_label = 'wildlifecompliance'
+        ordering = ('-started',)
+
+    def __str__(self):
+        return '{} {} ({})'.format(self.job, self.status, self.run_id)
+
+
 class ComplianceManagementEmailUser(EmailUser):
     class Meta:
         app_label = 'wildlifecompliance'
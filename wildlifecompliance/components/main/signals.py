@@ -0,0 +1,44 @@
+# Signals here
+from django.contrib.auth.models import Group
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from ledger.accounts.models import EmailUser
+
+from wildlifecompliance.components.main.models import (
+    ReferenceNumber,
+    ComplianceManagementSystemGroup,
+    ComplianceManagementSystemGroupPermission,
+)
+from wildlifecompliance.components.users.models import (
+    ComplianceManagementUserPreferences,
+)
+from wildlifecompliance.helpers import RoleResolver, UserPreferenceSnapshot
+
+# register issued reference numbers when their records are saved.
+ReferenceNumber.connect_sources()
+
+
+@receiver(m2m_changed, sender=EmailUser.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_roles_on_membership(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        RoleResolver.invalidate()
+
+
+@receiver(post_save, sender=ComplianceManagementSystemGroup)
+@receiver(post_delete, sender=ComplianceManagementSystemGroup)
+@receiver(post_save, sender=ComplianceManagementSystemGroupPermission)
+@receiver(post_delete, sender=ComplianceManagementSystemGroupPermission)
+def invalidate_roles_on_compliance_group(sender, **kwargs):
+    RoleResolver.invalidate()
+
+
+@receiver(post_save, sender=ComplianceManagementUserPreferences)
+def invalidate_preference_snapshot(sender, instance, **kwargs):
+    UserPreferenceSnapshot.invalidate(instance.email_user_id)
+
+
+@receiver(user_logged_in)
+def reconcile_preferences_on_login(sender, request, user, **kwargs):
+    UserPreferenceSnapshot.reconcile(request)
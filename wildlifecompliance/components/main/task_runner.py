@@ -0,0 +1,180 @@
+import logging
+import time
+import traceback
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.db import connections
+from django.utils import timezone
+
+from wildlifecompliance.components.main.models import CronJobRun
+
+logger = logging.getLogger(__name__)
+
+
+class CronJob(object):
+    '''
+    A job for the cron task runner. The function is called with no arguments
+    and returns either a count or a list of the records it updated.
+    '''
+    name = None
+    function = None
+    depends_on = None
+
+    def __init__(self, name, function, depends_on=None):
+        self.name = name
+        self.function = function
+        self.depends_on = depends_on if depends_on else []
+
+    def __str__(self):
+        return self.name
+
+    def get_row_count(self, result):
+        '''
+        Get the number of records updated from the job result.
+        '''
+        if isinstance(result, (list, tuple, set)):
+            return len(result)
+
+        return result if isinstance(result, int) else 0
+
+
+class CronTaskRunner(object):
+    '''
+    Runs cron jobs in a single process as a dependency graph. Jobs with no
+    outstanding dependencies are executed concurrently on a thread pool and
+    jobs depending on a failed or skipped job are skipped.
+
+    Metrics for each job are recorded as CronJobRun records.
+    '''
+    jobs = None
+    max_workers = None
+    run_id = None
+
+    def __init__(self, jobs, max_workers=4):
+        self.jobs = jobs
+        self.max_workers = max_workers
+        self.run_id = uuid.uuid4().hex
+        self.validate()
+
+    def validate(self):
+        '''
+        Check job dependencies exist and do not form a cycle.
+        '''
+        names = [job.name for job in self.jobs]
+        if len(names) != len(set(names)):
+            raise ValueError('Cron job names must be unique.')
+
+        for job in self.jobs:
+            for name in job.depends_on:
+                if name not in names:
+                    raise ValueError('Cron job {} depends on unknown {}.'.format(
+                        job.name, name))
+
+        resolved = set()
+        pending = list(self.jobs)
+        while pending:
+            ready = [j for j in pending if set(j.depends_on) <= resolved]
+            if not ready:
+                raise ValueError('Cron jobs have a circular dependency: {}'.format(
+                    ', '.join(j.name for j in pending)))
+            resolved.update(j.name for j in ready)
+            pending = [j for j in pending if j not in ready]
+
+    def run(self):
+        '''
+        Execute all jobs and return the CronJobRun records in job order.
+        '''
+        logger.info('CronTaskRunner: started run {}.'.format(self.run_id))
+        results = {}
+        pending = list(self.jobs)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for job in list(pending):
+                    status = self.get_dependency_status(job, results)
+                    if status is None:
+                        continue
+
+                    pending.remove(job)
+                    if status == CronJobRun.STATUS_SUCCESS:
+                        running[executor.submit(self.run_job, job)] = job
+                    else:
+                        results[job.name] = self.skip_job(job)
+
+                if not running:
+                    continue
+
+                done, not_done = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    results[job.name] = future.result()
+
+        logger.info('CronTaskRunner: completed run {}.'.format(self.run_id))
+
+        return [results[job.name] for job in self.jobs]
+
+    def get_dependency_status(self, job, results):
+        '''
+        Get the status of the job dependencies, or None while a dependency is
+        still to be executed.
+        '''
+        for name in job.depends_on:
+            if name not in results:
+                return None
+            if results[name].status != CronJobRun.STATUS_SUCCESS:
+                return CronJobRun.STATUS_SKIPPED
+
+        return CronJobRun.STATUS_SUCCESS
+
+    def run_job(self, job):
+        '''
+        Execute a job on a worker thread and record its metrics.
+        '''
+        run = CronJobRun(
+            run_id=self.run_id,
+            job=job.name,
+            started=timezone.now(),
+        )
+        start = time.time()
+        try:
+            logger.info('CronTaskRunner: running {}.'.format(job))
+            result = job.function()
+            run.status = CronJobRun.STATUS_SUCCESS
+            run.row_count = job.get_row_count(result)
+
+        except Exception as e:
+            logger.error('CronTaskRunner: error {0} : {1}\n{2}'.format(
+                job, e, traceback.format_exc()))
+            run.status = CronJobRun.STATUS_FAILED
+            run.error_count = 1
+            run.error = str(e)
+
+        finally:
+            run.duration = time.time() - start
+            run.save()
+            # connections are per thread so close those opened by this job.
+            connections.close_all()
+
+        logger.info('CronTaskRunner: {} {} in {:.2f}s.'.format(
+            job, run.status, run.duration))
+
+        return run
+
+    def skip_job(self, job):
+        '''
+        Record a job not executed because a dependency did not succeed.
+        '''
+        logger.warning('CronTaskRunner: skipped {}.'.format(job))
+        run = CronJobRun.objects.create(
+            run_id=self.run_id,
+            job=job.name,
+            status=CronJobRun.STATUS_SKIPPED,
+            started=timezone.now(),
+            error='Dependency {} did not succeed.'.format(
+                ', '.join(job.depends_on)),
+        )
+
+        return run
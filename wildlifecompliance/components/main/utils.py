@@ -1,7 +1,6 @@
-import ast
-
 import pytz
 import requests
+import time
 import json
 import logging
 from django.conf import settings
@@ -420,12 +419,11 @@ def search_keywords(search_words, search_application, search_licence, search_ret
     :param is_internal: Boolean, if true, pre-load application, licence, return objects to lists
     :return:
     '''
-    from wildlifecompliance.utils import search
     from wildlifecompliance.components.applications.models import Application, ApplicationFormDataRecord
     from wildlifecompliance.components.licences.models import WildlifeLicence
     from wildlifecompliance.components.returns.models import Return
     qs = []
-    application_list = []
+    application_hits = []
     licence_list = []
     return_list = []
     if search_words:
@@ -437,14 +435,9 @@ def search_keywords(search_words, search_application, search_licence, search_ret
             else:
                 search_words_regex = search_words_regex + "|"
 
-        #filter_regex = ".*\".*\":\s\"(\\\\\"|[^\"])*"+search_words_regex+"(\\\\\"|[^\"])*\".*"
         if is_internal:
-            application_list = Application.objects.all().filter(form_data_records__value__iregex=search_words_regex)\
-            .order_by('lodgement_number', '-id')\
-            .distinct('lodgement_number') 
-                #.computed_exclude(processing_status__in=[
-                #    Application.PROCESSING_STATUS_DISCARDED
-                #])\
+            # ranked hits from the form data search index, best first.
+            application_hits = ApplicationFormDataRecord.search(search_words)
             licence_list = WildlifeLicence.objects\
             .filter(licence_number__iregex=search_words_regex)\
             .order_by('licence_number', '-id')\
@@ -454,36 +447,30 @@ def search_keywords(search_words, search_application, search_licence, search_ret
             .order_by('lodgement_number', '-id')\
             .distinct('lodgement_number') 
             
-        if search_application:
-            for app in application_list:
-                if app.data:
-                    try:
-                        app_data = {'data': []}
-                        for record in app.data:
-                            if 'thead' in record.value:
-                                try:
-                                    app_data.get('data').append({'value': ast.literal_eval(record.value).get('tbody')})
-                                except:
-                                    app_data.get('data').append({'value': record.value})
-                            else:
-                                app_data.get('data').append({'value': record.value})
-                        results = search(app_data, search_words)
-                        final_results = {}
-                        if results:
-                            for r in results:
-                                for key, value in r.items():
-                                    final_results.update({'key': key, 'value': value})
-                            res = {
-                                'number': app.lodgement_number,
-                                'record_id': app.id,
-                                'record_type': 'Application',
-                                'applicant': app.applicant,
-                                'text': final_results,
-                                'licence_document': None
-                            }
-                            qs.append(res)
-                    except BaseException:
-                        raise
+        if search_application and application_hits:
+            applications = Application.objects.filter(
+                id__in=[hit['application_id'] for hit in application_hits]
+            ).select_related(
+                'org_applicant__organisation',
+                'proxy_applicant',
+                'submitter',
+            ).in_bulk()
+            for hit in application_hits:
+                app = applications.get(hit['application_id'])
+                if not app:
+                    continue
+                res = {
+                    'number': app.lodgement_number,
+                    'record_id': app.id,
+                    'record_type': 'Application',
+                    'applicant': app.applicant,
+                    'text': {
+                        'key': hit['field_name'],
+                        'value': hit['snippet'],
+                    },
+                    'licence_document': None
+                }
+                qs.append(res)
         if search_licence:
             for lic in licence_list:
                 try:
@@ -538,78 +525,15 @@ def search_keywords(search_words, search_application, search_licence, search_ret
 
 
 def search_reference(reference_number):
-    from wildlifecompliance.components.applications.models import Application
-    from wildlifecompliance.components.organisations.models import OrganisationRequest
-    from wildlifecompliance.components.licences.models import WildlifeLicence
-    from wildlifecompliance.components.returns.models import Return
-    from wildlifecompliance.components.call_email.models import CallEmail
-    from wildlifecompliance.components.offence.models import Offence
-    from wildlifecompliance.components.legal_case.models import LegalCase
-    from wildlifecompliance.components.inspection.models import Inspection
-    from wildlifecompliance.components.sanction_outcome.models import SanctionOutcome
-    from wildlifecompliance.components.artifact.models import Artifact
-    application_list = Application.objects.all()
-    #this makes the ref search go from under a second to up to 2 minutes - it is better to allow discarded applications to be searched
-    #.computed_exclude(processing_status__in=[Application.PROCESSING_STATUS_DISCARDED])
-    licence_list = WildlifeLicence.objects.all().order_by('licence_number').distinct('licence_number')
-    returns_list = Return.objects.all().exclude(processing_status__in=[Return.RETURN_PROCESSING_STATUS_FUTURE])
-    org_access_request_list = OrganisationRequest.objects.all()
-    url_string = {}
-
-    # Application
-    result = application_list.filter(lodgement_number=reference_number)
-    if result:
-        url_string = {'url_string': '/internal/application/' + str(result[0].id)}
-        return url_string
-    # Licence
-    result = licence_list.filter(licence_number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': result[0].licence_document._file.url}
-        return url_string
-    # Returns
-    result = returns_list.filter(lodgement_number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/return/' + str(result[0].id)}
-        return url_string
-    #import ipdb; ipdb.set_trace()
-    # Org access reqeust
-    result = org_access_request_list.filter(lodgement_number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/organisations/access/' + str(result[0].id)}
-        return url_string
-    # CallEmail
-    result = CallEmail.objects.filter(number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/call_email/' + str(result[0].id)}
-        return url_string
-    # Offence
-    result = Offence.objects.filter(lodgement_number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/offence/' + str(result[0].id)}
-        return url_string
-    # Legal Case
-    result = LegalCase.objects.filter(number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/legal_case/' + str(result[0].id)}
-        return url_string
-    # Inspection
-    result = Inspection.objects.filter(number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/inspection/' + str(result[0].id)}
-        return url_string
-    # Sanction Outcome
-    result = SanctionOutcome.objects.filter(lodgement_number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/sanction_outcome/' + str(result[0].id)}
-        return url_string
-    # Offence
-    result = Artifact.objects.filter(number=reference_number)
-    if result and not url_string:
-        url_string = {'url_string': '/internal/object/' + str(result[0].id)}
-        return url_string
-
-    if url_string:
-        return url_string
+    '''
+    Resolve a reference number issued to any record to its internal url
+    through the ReferenceNumber registry.
+    '''
+    from wildlifecompliance.components.main.models import ReferenceNumber
+
+    url = ReferenceNumber.resolve(reference_number)
+    if url:
+        return {'url_string': url}
     else:
         #raise ValidationError('Record with provided reference number does not exist')
         return {'error': 'Record with provided reference number does not exist'}
@@ -670,23 +594,96 @@ def get_region_district(wkb_geometry):
     except:
         return ''
 
+class GISAreaIndex(object):
+    '''
+    An in-memory index of GIS area polygons to find the area containing a
+    point without a polygon query.
+
+    Areas are loaded lazily once per process as prepared geometries with
+    their bounding box so only candidate areas are tested for containment.
+    '''
+    _indexes = {}
+
+    def __init__(self, model, name_field):
+        self.model = model
+        self.name_field = name_field
+        self.areas = None
+
+    @classmethod
+    def get_index(cls, model, name_field):
+        key = (model._meta.label, name_field)
+        if key not in cls._indexes:
+            cls._indexes[key] = cls(model, name_field)
+
+        return cls._indexes[key]
+
+    @classmethod
+    def clear(cls):
+        '''
+        Discard loaded areas so they are reloaded on next use.
+        '''
+        cls._indexes = {}
+
+    def load(self):
+        areas = []
+        for geometry, name in self.model.objects.exclude(
+                wkb_geometry__isnull=True).values_list(
+                    'wkb_geometry', self.name_field):
+            areas.append((geometry.extent, geometry.prepared, name))
+        self.areas = areas
+
+    def find(self, point):
+        '''
+        Get the name of the first area containing the point.
+
+        :return: area name or '' when no area contains the point.
+        '''
+        if point is None:
+            return ''
+
+        if self.areas is None:
+            self.load()
+
+        if point.srid and point.srid != 4326:
+            point = point.transform(4326, clone=True)
+
+        x, y = point.x, point.y
+        for (xmin, ymin, xmax, ymax), prepared, name in self.areas:
+            if xmin <= x <= xmax and ymin <= y <= ymax \
+                    and prepared.contains(point):
+                return name or ''
+
+        return ''
+
+
+def get_cache_version(key):
+    '''
+    Get a version number kept in the shared cache. A missing version starts
+    from the current time so versions are not reused when the cache clears.
+    '''
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        cache.set(key, version, None)
+
+    return version
+
+
+def increment_cache_version(key):
+    cache.set(key, get_cache_version(key) + 1, None)
+
+
 def get_region_gis(wkb_geometry):
     try:
-        regions = RegionGIS.objects.filter(wkb_geometry__contains=wkb_geometry)
-        if regions:
-            region_name = regions.first().region_name
-            return region_name
-        return ''
+        return GISAreaIndex.get_index(
+            RegionGIS, 'region_name').find(wkb_geometry)
     except:
         return ''
 
 def get_district_gis(wkb_geometry):
     try:
-        districts = DistrictGIS.objects.filter(wkb_geometry__contains=wkb_geometry)
-        if districts:
-            district_name = districts.first().district_name
-            return district_name
-        return ''
+        return GISAreaIndex.get_index(
+            DistrictGIS, 'district_name').find(wkb_geometry)
     except:
         return ''
 
@@ -711,6 +708,82 @@ def get_last_name(obj):
 def get_full_name(obj):
     return get_first_name(obj)+" "+get_last_name(obj)
 
+def get_full_name_expression(user):
+    '''
+    Database expression of get_full_name for a related user.
+
+    :param user: lookup path of the related EmailUser (eg. 'assigned_to').
+    :return: CharField expression of the legal (or preferred) first and last
+    name separated by a space.
+    '''
+    from django.db.models import Case, When, F, Value, CharField
+    from django.db.models.functions import Coalesce, Concat
+
+    def name(legal, preferred):
+        return Case(
+            When(**{
+                '{0}__{1}__gt'.format(user, legal): '',
+                'then': F('{0}__{1}'.format(user, legal)),
+            }),
+            default=Coalesce(
+                F('{0}__{1}'.format(user, preferred)), Value('')
+            ),
+            output_field=CharField(),
+        )
+
+    return Concat(
+        name('legal_first_name', 'first_name'),
+        Value(' '),
+        name('legal_last_name', 'last_name'),
+        output_field=CharField(),
+    )
+
+def set_json_key_expression(field, key, value):
+    '''
+    Database expression setting a key on a JSONField so the key can be set
+    for many records with a single update.
+
+    :param field: name of the JSONField (eg. 'property_cache').
+    :param key: the key to set.
+    :param value: a json serializable value for the key.
+    :return: JSONField expression of the field with the key set.
+    '''
+    from django.db.models import F, Func, Value
+    from django.contrib.postgres.fields import JSONField
+
+    return Func(
+        Func(F(field), Value('{}'), function='COALESCE'),
+        Value('{{{0}}}'.format(key)),
+        Value(json.dumps(value)),
+        function='jsonb_set',
+        output_field=JSONField(),
+    )
+
+def remove_json_keys_expression(field, keys):
+    '''
+    Database expression removing keys from a JSONField so the keys can be
+    removed for many records with a single update.
+
+    :param field: name of the JSONField (eg. 'property_cache').
+    :param keys: list of keys to remove.
+    :return: JSONField expression of the field without the keys.
+    '''
+    from django.db.models import F, Func, Value, TextField
+    from django.db.models.functions import Cast
+    from django.contrib.postgres.fields import JSONField
+
+    expression = Func(F(field), Value('{}'), function='COALESCE')
+    for key in keys:
+        expression = Func(
+            expression,
+            Cast(Value(key), TextField()),
+            template='(%(expressions)s)',
+            arg_joiner=' - ',
+            output_field=JSONField(),
+        )
+
+    return expression
+
 def get_dob(obj):
 
     if hasattr(obj,"legal_dob") and obj.legal_dob:
@@ -296,7 +296,7 @@ class ReturnViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
                     status=status.HTTP_404_NOT_FOUND
                 )
             data = ReturnData(instance)
-            table = data.build_table(spreadsheet.rows_list)
+            table = data.build_table(spreadsheet.get_table_rows())
             logger.debug('ReturnViewSet.upload_details() - end')
 
             return Response(table)
@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 from concurrency.exceptions import RecordModifiedError
 from concurrency.fields import IntegerVersionField
 from django.db import models, transaction
+from django.db.models import Case, When, Value
 from django.db.utils import IntegrityError
 from django.contrib.postgres.fields.jsonb import JSONField
 from django.utils import timezone
@@ -643,46 +644,88 @@ class Return(models.Model):
                 name=table_name, ret=self)
             return_table.save()
 
-            #get all rows from db
-            existing_rows = return_table.returnrow_set.all()
-
-            #get rows from request
-            return_rows = [
-                ReturnRow(
-                    return_table=return_table,
-                    data=row) for row in table_rows]
-
-            #identify new rows from data
-            new_indexes = []
-            new_dict = {}
-            for i in table_rows:
-                if 'rowId' in i and 'date' in i:
-                    new_indexes.append("{}__{}".format(i['rowId'],i['date']))
-                    new_dict["{}__{}".format(i['rowId'],i['date'])] = i
-
-            #identify existing rows (via date and row id)
-            existing_indexes = []
+            # get existing rows keyed on row id and date. Rows without a key
+            # or sharing a key are always recreated.
             existing_dict = {}
-            for i in existing_rows:
-                if i.data and 'rowId' in i.data and 'date' in i.data:
-                    existing_indexes.append("{}__{}".format(i.data['rowId'],i.data['date']))
-                    existing_dict["{}__{}".format(i.data['rowId'],i.data['date'])] = i.data
+            recreate_keys = set()
+            recreate_ids = []
+            for row_id, data in return_table.returnrow_set.values_list(
+                    'id', 'data').order_by('id'):
+                key = ReturnRow.get_key(data)
+                if key is None or key in recreate_keys:
+                    recreate_ids.append(row_id)
+                elif key in existing_dict:
+                    recreate_keys.add(key)
+                    recreate_ids.append(row_id)
+                    recreate_ids.append(existing_dict.pop(key)[0])
+                else:
+                    existing_dict[key] = (row_id, data)
+
+            # get rows from request keyed on row id and date.
+            new_dict = {}
+            for row in table_rows:
+                key = ReturnRow.get_key(row)
+                if key is not None:
+                    new_dict.setdefault(key, row)
 
             #raise error if an existing row is missing
-            for i in existing_indexes:
-                if not i in new_indexes:
-                    raise serializers.ValidationError("Return Table missing previously existing rows.")
+            if not recreate_keys.union(existing_dict).issubset(new_dict):
+                raise serializers.ValidationError("Return Table missing previously existing rows.")
+
+            # existing rows are kept in place while the request follows the
+            # stored order. From the first new, repeated or reordered row on
+            # all rows are recreated in the order of the request.
+            kept = {}
+            new_rows = []
+            last_id = 0
+            for row in table_rows:
+                key = ReturnRow.get_key(row)
+                if not new_rows and key in existing_dict \
+                        and key not in kept \
+                        and existing_dict[key][0] > last_id:
+                    last_id = existing_dict[key][0]
+                    kept[key] = row
+                else:
+                    new_rows.append(row)
+
+            changed = {}
+            for key, (row_id, data) in existing_dict.items():
+                if new_dict[key] != data:
+                    changed[row_id] = new_dict[key]
 
             #raise error if an existing row is set to change and the user is not internal
-            if not is_internal(request):
-                for i in new_indexes:
-                    if i in existing_dict:
-                        if new_dict[i] != existing_dict[i]:
-                            raise serializers.ValidationError("User not authorised to edit existing return rows.")
+            if changed and not is_internal(request):
+                raise serializers.ValidationError("User not authorised to edit existing return rows.")
 
-            # delete any existing rows as they will all be recreated
-            existing_rows.delete()
-            ReturnRow.objects.bulk_create(return_rows)
+            # only write rows which are new, moved or have changed.
+            recreate_ids += [
+                row_id for key, (row_id, data) in existing_dict.items()
+                if key not in kept
+            ]
+            if recreate_ids:
+                ReturnRow.objects.filter(id__in=recreate_ids).delete()
+
+            recreated = set(recreate_ids)
+            changed_ids = sorted([
+                row_id for row_id in changed if row_id not in recreated
+            ])
+            size = ReturnRow.UPDATE_CHUNK_SIZE
+            for chunk in [changed_ids[i:i + size] for i in range(
+                    0, len(changed_ids), size)]:
+                ReturnRow.objects.filter(id__in=chunk).update(
+                    data=Case(
+                        *[When(id=row_id, then=Value(
+                            changed[row_id], output_field=JSONField()
+                        )) for row_id in chunk],
+                        output_field=JSONField()
+                    )
+                )
+
+            ReturnRow.objects.bulk_create([
+                ReturnRow(
+                    return_table=return_table,
+                    data=row) for row in new_rows
+            ])
 
             # log transaction
             self.log_user_action(
@@ -856,7 +899,7 @@ class ReturnTable(RevisionedMixin):
         '''
         Set all rows associated with this Return Table with a bulk create.
 
-        :param return_rows is a list of rows for bulk creation.
+        :param return_rows is a list of rows (or row data) for bulk creation.
         '''
         from wildlifecompliance.components.returns.utils import (
             BulkCreateManager,
@@ -869,7 +912,8 @@ class ReturnTable(RevisionedMixin):
 
                 return_row = ReturnRow(
                     return_table=self,
-                    data=record.data
+                    data=record.data if isinstance(
+                        record, ReturnRow) else record
                 )
                 bulk_mgr.add(return_row)
 
@@ -887,6 +931,8 @@ class ReturnTable(RevisionedMixin):
 
 
 class ReturnRow(RevisionedMixin):
+    UPDATE_CHUNK_SIZE = 500
+
     return_table = models.ForeignKey(ReturnTable)
 
     data = JSONField(blank=True, null=True)
@@ -897,6 +943,18 @@ class ReturnRow(RevisionedMixin):
     def __str__(self):
         return str('ReturnRow {0}'.format(self.id))
 
+    @staticmethod
+    def get_key(data):
+        '''
+        Get the key identifying row data by its row id and date.
+
+        :return: rowId__date string or None for data without a key.
+        '''
+        if data and 'rowId' in data and 'date' in data:
+            return '{}__{}'.format(data['rowId'], data['date'])
+
+        return None
+
 
 class ReturnUserAction(UserAction):
     ACTION_CREATE = "Created {} for Condition: {} (Activity: {})"
@@ -912,7 +970,7 @@ class ReturnUserAction(UserAction):
     ACTION_DECLINE_REQUEST = "Decline request"
     ACTION_ID_REQUEST_AMENDMENTS = "Request amendments"
     ACTION_REMINDER_SENT = "Reminder sent for return {}"
-    ACTION_STATUS_CHANGE = "Change status to Due for return {}"
+    ACTION_STATUS_CHANGE = "Change status to {} for return {}"
 
     class Meta:
         app_label = 'wildlifecompliance'
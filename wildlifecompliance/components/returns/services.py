@@ -2,6 +2,8 @@ import abc
 import ast
 import logging
 import datetime
+import os
+import reversion
 
 from datetime import date, timedelta
 
@@ -20,7 +22,9 @@ from wildlifecompliance.components.main.utils import checkout, singleton
 from wildlifecompliance.components.main.utils import flush_checkout_session
 
 from wildlifecompliance.components.returns.payments import ReturnFeePolicy
-from wildlifecompliance.components.returns.utils_schema import Schema
+from wildlifecompliance.components.returns.utils_schema import (
+    get_return_type_schema,
+)
 from wildlifecompliance.components.returns.utils import get_session_return
 from wildlifecompliance.components.returns.utils import bind_return_to_invoice
 from wildlifecompliance.components.returns.utils import ReturnSpeciesUtility
@@ -134,11 +138,12 @@ class ReturnService(object):
         return successful
 
     @staticmethod
-    def etl_return_sheet(real_time=False, return_ids=None) -> bool:
+    def etl_return_sheet(real_time=False, return_ids=None, resume=False) -> bool:
         '''
         A service call to cleanse Return running sheets.
 
         :param: return_ids is a List of identifiers.
+        :param: resume is flag to continue from the last checkpoint.
         '''
         logger.debug('ReturnService.etl_return_sheet() - start')
         logger_title = '{0}'.format(
@@ -146,7 +151,9 @@ class ReturnService(object):
         )
         successful = False
         try:
-            etl = ReturnETL(CleanseReturnSheet(real_time, return_ids))
+            etl = ReturnETL(
+                CleanseReturnSheet(real_time, return_ids, resume)
+            )
             etl.process()
             successful = True
 
@@ -334,12 +341,15 @@ class ReturnService(object):
         Vertification of return due date seven days before it is due and
         updating the processing status.
 
-        :return a count of total returns due.
+        Each status transition is applied as a single set-based update on the
+        matching Returns rather than saving each Return.
+
+        :return a list of lodgement numbers for the returns now due.
         '''
         DUE_DAYS = 7
-        verified = []
-        today_plus_7 = date.today() + timedelta(days=DUE_DAYS)
+        EXPIRED_GRACE_DAYS = 14
         today = date.today()
+        today_plus_7 = today + timedelta(days=DUE_DAYS)
 
         all_returns = Return.objects.filter(
             processing_status__in=[
@@ -350,6 +360,9 @@ class ReturnService(object):
             ]
         )
 
+        if not for_all:
+            all_returns = all_returns.filter(id=id)
+
         due_returns = all_returns.filter(
             due_date__range=[today, today_plus_7],
             processing_status__in=[
@@ -357,24 +370,13 @@ class ReturnService(object):
                 Return.RETURN_PROCESSING_STATUS_FUTURE
             ]
         )
-        status = Return.RETURN_PROCESSING_STATUS_DUE
-        for a_return in due_returns:
-            if not for_all and not a_return.id == id:
-                continue
-            # set future species list for return before setting status.
-            utils = ReturnSpeciesUtility(a_return)
-            licence_activity_id = a_return.condition.licence_activity_id
-            selected_activity = [
-                a for a in a_return.application.activities
-                if a.licence_activity_id == licence_activity_id
-            ][0]
-            raw_specie_names = utils.get_raw_species_list_for(
-                selected_activity
-            )
-            utils.set_species_list_future(raw_specie_names)
-            # update status for the return.
-            a_return.set_processing_status(status)
-            verified.append(a_return)
+        # set future species list for returns before setting status.
+        transition = ReturnStatusTransition(
+            due_returns, Return.RETURN_PROCESSING_STATUS_DUE
+        )
+        with transaction.atomic():
+            transition.prepare_species()
+            verified = transition.execute()
 
         overdue_returns = all_returns.filter(
             due_date__lt=today,
@@ -386,14 +388,19 @@ class ReturnService(object):
         ).exclude(
             return_type__data_format=ReturnType.FORMAT_SHEET
         )
-        status = Return.RETURN_PROCESSING_STATUS_OVERDUE
-        for a_return in overdue_returns:
-            if not for_all and not a_return.id == id:
-                continue
-            a_return.set_processing_status(status)
+        transition = ReturnStatusTransition(
+            overdue_returns, Return.RETURN_PROCESSING_STATUS_OVERDUE
+        )
+        with transaction.atomic():
+            transition.execute()
 
+        # Expired Running Sheets have a 14 day grace period before the
+        # status changes to Expired. Allows for final updates when not
+        # renewing.
+        # NOTE: At renewal the stock totals are aggregated for the newly
+        # generated return. The old one is then discarded.
         expired_returns = all_returns.filter(
-            due_date__lt=today,
+            due_date__lte=today - timedelta(days=EXPIRED_GRACE_DAYS),
             processing_status__in=[
                 Return.RETURN_PROCESSING_STATUS_DRAFT,
                 Return.RETURN_PROCESSING_STATUS_FUTURE,
@@ -402,24 +409,11 @@ class ReturnService(object):
             ],
             return_type__data_format=ReturnType.FORMAT_SHEET
         )
-        status = Return.RETURN_PROCESSING_STATUS_EXPIRED
-        for a_return in expired_returns:
-            if not for_all and not a_return.id == id:
-                continue
-            # Expired Running Sheets have a 14 day grace period before the
-            # status changes to Expired. Allows for final updates when not
-            # renewing.
-            # NOTE: At renewal the stock totals are aggregated for the newly
-            # generated return. The old one is then discarded.
-            expired_date = a_return.due_date + timedelta(days=14)
-            expired_plus_14 = [
-                a_return.due_date + datetime.timedelta(n)
-                for n in range(int((expired_date - a_return.due_date).days))
-            ]
-            if today in expired_plus_14:
-                continue
-
-            a_return.set_processing_status(status)
+        transition = ReturnStatusTransition(
+            expired_returns, Return.RETURN_PROCESSING_STATUS_EXPIRED
+        )
+        with transaction.atomic():
+            transition.execute()
 
         return verified
 
@@ -668,13 +662,13 @@ class ReturnGenerator(ReturnFactory):
             first_return.save()
             returns_utils = ReturnSpeciesUtility(first_return)
 
-            # raw_specie_names is a list of names defined manually by the
+            # specie_names is a list of names defined manually by the
             # licensing officer at the time of propose/issuance.
-            raw_specie_names = returns_utils.get_raw_species_list_for(
+            specie_names = returns_utils.get_species_list_for(
                 selected_activity
             )
             if not already_generated:
-                returns_utils.set_species_list(raw_specie_names)
+                returns_utils.set_species_list(specie_names)
 
             # When first return generated is for a renewed application, discard
             # previous returns which are draft, due or overdue.
@@ -910,6 +904,152 @@ class ReturnGenerator(ReturnFactory):
         return the_return
 
 
+class ReturnStatusTransition(object):
+    '''
+    A set-based transition of the processing status for a queryset of Returns.
+
+    Returns are updated in chunks with a single UPDATE statement per chunk and
+    the status change is logged for each chunk with a bulk insert and a
+    single revision holding a version of each Return.
+    '''
+    CHUNK_SIZE = 1000
+
+    returns = None                      # queryset of Returns to transition.
+    status = None                       # processing status to transition to.
+
+    def __init__(self, returns, status):
+        self.returns = returns
+        self.status = status
+        self.excluded_ids = set()
+
+    def _chunks(self, items):
+        for idx in range(0, len(items), self.CHUNK_SIZE):
+            yield items[idx:idx + self.CHUNK_SIZE]
+
+    def _get_system_user(self):
+        '''
+        Get the user recorded against status changes made by the system.
+        '''
+        from django.conf import settings
+        from ledger.accounts.models import EmailUser
+
+        return EmailUser.objects.filter(email=settings.SYSTEM_EMAIL).first()
+
+    def prepare_species(self):
+        '''
+        Set the species list for each Future Return in one batched pass before
+        the transition is applied.
+
+        Species are read from the list stored on the selected purpose.
+        Returns which cannot be prepared are excluded from the transition.
+        '''
+        from wildlifecompliance.components.applications.models import (
+            ApplicationSelectedActivity,
+        )
+        from wildlifecompliance.components.returns.utils import (
+            BulkCreateManager,
+        )
+        DISCARDED = ApplicationSelectedActivity.PROCESSING_STATUS_DISCARDED
+        future_ids = list(self.returns.filter(
+            processing_status=Return.RETURN_PROCESSING_STATUS_FUTURE
+        ).values_list('id', flat=True))
+
+        bulk_mgr = BulkCreateManager(chunk_size=self.CHUNK_SIZE)
+
+        for chunk in self._chunks(future_ids):
+            future_returns = Return.objects.filter(
+                id__in=chunk
+            ).select_related(
+                'condition',
+                'return_type',
+                'application',
+            ).prefetch_related(
+                'return_type__regulated_species',
+                'application__selected_activities__proposed_purposes',
+            )
+
+            for a_return in future_returns:
+                utils = ReturnSpeciesUtility(a_return)
+                try:
+                    if a_return.return_type.with_application_species:
+                        activity_id = a_return.condition.licence_activity_id
+                        selected_activity = [
+                            a for a in
+                            a_return.application.selected_activities.all()
+                            if a.licence_activity_id == activity_id
+                            and not a.processing_status == DISCARDED
+                        ][0]
+                        utils.set_application_species_list(
+                            utils.get_species_list_for(selected_activity)
+                        )
+
+                    for specie_name in utils.get_species_list():
+                        bulk_mgr.add(ReturnTable(
+                            name=utils.get_id_from_species_name(specie_name),
+                            ret_id=a_return.id,
+                        ))
+
+                except Exception as e:
+                    logger.error('{0} ReturnID: {1} - {2}'.format(
+                        'ReturnStatusTransition.prepare_species()',
+                        a_return.id,
+                        e
+                    ))
+                    self.excluded_ids.add(a_return.id)
+
+        bulk_mgr.done()
+
+    def execute(self):
+        '''
+        Apply the processing status to the Returns and log the change.
+
+        :return a list of lodgement numbers for the transitioned Returns.
+        '''
+        returns = self.returns.exclude(id__in=self.excluded_ids)
+        transitioned = list(returns.values_list('id', 'lodgement_number'))
+        status = dict(Return.PROCESSING_STATUS_CHOICES).get(self.status)
+        system_user = self._get_system_user()
+
+        for chunk in self._chunks(transitioned):
+            chunk_ids = [r[0] for r in chunk]
+            with transaction.atomic(), reversion.create_revision():
+                Return.objects.filter(
+                    id__in=chunk_ids
+                ).update(processing_status=self.status)
+
+                for a_return in Return.objects.filter(
+                    id__in=chunk_ids
+                ).select_related(
+                    'application',
+                    'submitter',
+                    'assigned_to',
+                    'condition',
+                    'licence',
+                    'return_type',
+                ):
+                    reversion.add_to_revision(a_return)
+                reversion.set_comment(
+                    'Processing status changed to {0}'.format(status))
+
+                if system_user:
+                    reversion.set_user(system_user)
+                    ReturnUserAction.objects.bulk_create([
+                        ReturnUserAction(
+                            return_obj_id=return_id,
+                            who=system_user,
+                            what=ReturnUserAction.ACTION_STATUS_CHANGE.format(
+                                status, lodgement_number
+                            )
+                        ) for return_id, lodgement_number in chunk
+                    ])
+
+        logger.info('{0} {1} {2}'.format(
+            'ReturnStatusTransition.execute() Total', status, len(transitioned)
+        ))
+
+        return [r[1] for r in transitioned]
+
+
 class ReturnETL(object):
     '''
     A context maintaining a reference for a ReturnETL strategy.
@@ -947,103 +1087,251 @@ class CleanseReturnSheet(ReturnETLStrategy):
     '''
     A real-time ReturnETLStrategy to remove dirty Return running sheets.
 
-    NOTE: Output is not logged but printed. Apply pipe tee statement to log.
+    Returns are streamed in chunks by identifier with duplicate species tables
+    deleted and Date of Activity defaulted with a statement per chunk. The
+    last completed chunk is checkpointed with the returns requested so an
+    interrupted run can resume for the same returns.
     '''
+    CHECKPOINT = 'logs/etl_return_sheet.checkpoint'    # from BASE_DIR.
+    CHUNK_SIZE = 500
     return_ids = None                   # list of specific returns.
 
-    def __init__(self, real_time, returns=None):
+    def __init__(self, real_time, returns=None, resume=False):
         self.return_ids = returns
         self.real_time = real_time
+        self.resume = resume
+
+    def get_checkpoint_path(self):
+        from django.conf import settings
+
+        return os.path.join(settings.BASE_DIR, self.CHECKPOINT)
+
+    def get_checkpoint_scope(self):
+        '''
+        Get the returns requested for a run as stored on the checkpoint.
+        '''
+        if not self.return_ids:
+            return None
+
+        return sorted(set(int(i) for i in self.return_ids))
+
+    def get_checkpoint(self):
+        '''
+        Get the identifier of the last Return cleansed by an interrupted run.
+        An interrupted run for other returns cannot be resumed.
+        '''
+        import json
+
+        path = self.get_checkpoint_path()
+        if not self.resume or not os.path.exists(path):
+            return 0
+
+        with open(path) as checkpoint:
+            content = checkpoint.read().strip()
+
+        if not content:
+            return 0
+
+        checkpoint = json.loads(content)
+        if checkpoint.get('returns') != self.get_checkpoint_scope():
+            raise ReturnServiceException(
+                'Cannot resume cleansing for returns {0} from a run for '
+                'returns {1}.'.format(
+                    self.get_checkpoint_scope(), checkpoint.get('returns')))
+
+        return checkpoint['return_id']
+
+    def set_checkpoint(self, return_id=None):
+        '''
+        Record the identifier of the last Return cleansed with the returns
+        requested or clear it when the run has completed.
+        '''
+        import json
+
+        if not self.real_time:
+            return
+
+        path = self.get_checkpoint_path()
+        if return_id is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        with open(path, 'w') as checkpoint:
+            checkpoint.write(json.dumps({
+                'return_id': return_id,
+                'returns': self.get_checkpoint_scope(),
+            }))
+
+    def get_species_names(self):
+        '''
+        Get the table names of regulated species for each Return Type.
+        '''
+        from wildlifecompliance.components.returns.models import (
+            ReturnTypeRegulatedSpecies,
+        )
+        utils = ReturnSpeciesUtility(None)
+        species = ReturnTypeRegulatedSpecies.objects.filter(
+            return_type__data_format=ReturnType.FORMAT_SHEET
+        ).values_list('return_type_id', 'species_name')
+
+        names = {}
+        for return_type_id, species_name in species:
+            names.setdefault(return_type_id, set()).add(
+                utils.get_id_from_species_name(species_name)
+            )
+
+        return names
+
+    def delete_duplicates(self, return_ids, species_names):
+        '''
+        Remove any duplicate species tables existing on the Returns.
+
+        :return: list of identifiers for the first species table kept.
+        '''
+        tables = ReturnTable.objects.filter(
+            ret_id__in=return_ids,
+            name__in=set().union(*species_names.values()),
+        ).values_list(
+            'id', 'ret_id', 'ret__return_type_id', 'name'
+        ).order_by('ret_id', 'name', 'id')
+
+        kept = {}
+        duplicates = []
+        for table_id, ret_id, return_type_id, name in tables:
+            if name not in species_names.get(return_type_id, []):
+                continue
+
+            if (ret_id, name) not in kept:
+                kept[(ret_id, name)] = table_id
+                continue
+
+            logger.info('{0} ReturnID: {1} {2} ReturnTableID: {3}'.format(
+                self.logger_title,
+                ret_id,
+                'Deleted duplicate species table.',
+                table_id,
+            ))
+            duplicates.append(table_id)
+
+        if duplicates and self.real_time:
+            ReturnRow.objects.filter(return_table_id__in=duplicates).delete()
+            ReturnTable.objects.filter(id__in=duplicates).delete()
+
+        self.duplicate_cnt += len(duplicates)
+
+        return list(kept.values())
+
+    def add_date_of_activity(self, table_ids):
+        '''
+        Default the Date of Activity to the Date of Entry on rows without one.
+        '''
+        from django.contrib.postgres.fields.jsonb import JSONField
+        from django.db.models import Case, When, Value, Q
+
+        rows = ReturnRow.objects.filter(
+            return_table_id__in=table_ids,
+        ).filter(
+            Q(data__doa='') | ~Q(data__has_key='doa')
+        ).values_list('id', 'return_table__ret_id', 'data')
+
+        updated_ids = []
+        updates = []
+        for row_id, ret_id, data in rows.iterator():
+            data['doa'] = datetime.datetime.fromtimestamp(
+                data['date'] / 1000).strftime('%d/%m/%Y')
+            logger.info('{0} ReturnID: {1} {2} ReturnRowID: {3}'.format(
+                self.logger_title,
+                ret_id,
+                'Added Date of Activity.',
+                row_id,
+            ))
+            updated_ids.append(row_id)
+            updates.append(When(
+                id=row_id, then=Value(data, output_field=JSONField())
+            ))
+
+        if updates and self.real_time:
+            ReturnRow.objects.filter(
+                id__in=updated_ids
+            ).update(data=Case(*updates, output_field=JSONField()))
+
+        self.doa_cnt += len(updates)
 
     def do_algorithm(self):
         '''
         Process each Return running sheet ensuring data integrity.
         '''
-        import datetime
-        log = '{0} {1} {2}'.format(
-            datetime.datetime.now(), self.logger_title, 'Commencing cleansing.'
-        )
-        print(log)
+        import time
+
+        logger.info('{0} {1}'.format(self.logger_title, 'Commencing cleansing.'))
+
+        self.duplicate_cnt = 0
+        self.doa_cnt = 0
 
         returns = Return.objects.filter(
-            return_type__data_format=ReturnType.FORMAT_SHEET
-        )
+            return_type__data_format=ReturnType.FORMAT_SHEET,
+            id__gt=self.get_checkpoint(),
+        ).order_by('id')
 
         if self.return_ids:         # filter returns for specific ids.
-            returns = [r for r in returns if r.id in self.return_ids]
+            returns = returns.filter(id__in=self.return_ids)
 
-        duplicate_cnt = 0
-        doa_cnt = 0
+        species_names = self.get_species_names()
+        return_ids = returns.values_list('id', flat=True).iterator()
 
-        for r in returns:
-            utils = ReturnSpeciesUtility(r)
-            for specie in r.return_type.regulated_species.all():
-                name = utils.get_id_from_species_name(specie.species_name)
-                try:
-                    tables = [t for t in r.returntable_set.filter(name=name)]
+        started = time.time()
+        processed = 0
+        chunk = []
+        for return_id in return_ids:
+            chunk.append(return_id)
+            if len(chunk) < self.CHUNK_SIZE:
+                continue
 
-                except AttributeError:
-                    continue
+            processed += self.process_chunk(chunk, species_names)
+            self.log_progress(processed, started)
+            chunk = []
 
-                first = tables[0]
-
-                '''
-                1. Remove any duplicate species existing in tables.
-                '''
-                for idx, t in enumerate(tables, start=0):
-                    if idx == 0:
-                        continue
-                    log = '{0} ReturnID: {1} {2} ReturnTableID: {3}'.format(
-                        self.logger_title,
-                        t.ret_id,
-                        'Deleted duplicate species table.',
-                        t.id,
-                    )
-                    duplicate_cnt += 1
-                    if self.real_time:
-                        print(log)
-                        t.delete()
-
-                '''
-                2. Default the Date of Activity to the Date of Entry.
-                '''
-                for r in first.returnrow_set.all():
-                    updated = False
-                    doa = datetime.datetime.fromtimestamp(
-                        r.data['date'] / 1000).strftime('%d/%m/%Y')
-                    try:
-                        if r.data['doa'] == '':
-                            r.data['doa'] = doa
-                            updated = True
-
-                    except KeyError:
-                        r.data['doa'] = doa
-                        updated = True
-
-                    if updated:
-                        log = '{0} ReturnID: {1} {2} ReturnRowID: {3}'.format(
-                            self.logger_title,
-                            first.ret_id,
-                            'Added Date of Activity.',
-                            r.id,
-                        )
-                        doa_cnt += 1
-                        if self.real_time:
-                            print(log)
-                            r.save()
+        if chunk:
+            processed += self.process_chunk(chunk, species_names)
+            self.log_progress(processed, started)
 
-        log = '{0} {1} {2}'.format(
-            datetime.datetime.now(), self.logger_title, 'Completed cleansing.'
-        )
-        print(log)
-        log = '{0} {1} {2}'.format(
-            self.logger_title, 'Total Deleted', duplicate_cnt
-        )
-        print(log)
-        log = '{0} {1} {2}'.format(
-            self.logger_title, 'Total DOA added', doa_cnt
-        )
-        print(log)
+        self.set_checkpoint(None)
+
+        logger.info('{0} {1}'.format(self.logger_title, 'Completed cleansing.'))
+        logger.info('{0} {1} {2}'.format(
+            self.logger_title, 'Total Deleted', self.duplicate_cnt
+        ))
+        logger.info('{0} {1} {2}'.format(
+            self.logger_title, 'Total DOA added', self.doa_cnt
+        ))
+
+    def process_chunk(self, return_ids, species_names):
+        '''
+        Cleanse a chunk of Returns in a single transaction and checkpoint the
+        last Return.
+
+        :return: number of Returns processed.
+        '''
+        if species_names:
+            with transaction.atomic():
+                table_ids = self.delete_duplicates(return_ids, species_names)
+                self.add_date_of_activity(table_ids)
+
+        self.set_checkpoint(return_ids[-1])
+
+        return len(return_ids)
+
+    def log_progress(self, processed, started):
+        import time
+
+        elapsed = time.time() - started
+        logger.info('{0} Processed {1} returns in {2:.1f}s ({3:.1f}/s).'.format(
+            self.logger_title,
+            processed,
+            elapsed,
+            processed / elapsed if elapsed else processed,
+        ))
 
 
 class ReturnCommand(object):
@@ -1152,7 +1440,8 @@ class ReturnData(object):
         tables = []
         for resource in self._return.return_type.resources:
             resource_name = resource.get('name')
-            schema = Schema(resource.get('schema'))
+            schema = get_return_type_schema(
+                self._return.return_type, resource.get('name'))
             headers = []
             for f in schema.fields:
                 header = {
@@ -1185,7 +1474,7 @@ class ReturnData(object):
                 if not rows:
                     raise ReturnTable.DoesNotExist()
 
-                validated_rows = schema.rows_validator(rows)
+                validated_rows = schema.validate_rows(rows)
                 table['data'] = validated_rows
             except ReturnTable.DoesNotExist:
                 result = {}
@@ -1438,7 +1727,8 @@ class ReturnData(object):
 
         for resource in self._return.return_type.resources:
             resource_name = resource.get('name')
-            schema = Schema(resource.get('schema'))
+            schema = get_return_type_schema(
+                self._return.return_type, resource.get('name'))
             table = {
                 'name': resource_name,
                 'label': resource.get('title', resource.get('name')),
@@ -1447,7 +1737,7 @@ class ReturnData(object):
                 'data': None
             }
             try:
-                validated_rows = schema.rows_validator(rows)
+                validated_rows = schema.validate_rows(rows)
                 table['data'] = validated_rows
             except AttributeError:
                 result = {}
@@ -1473,8 +1763,8 @@ class ReturnData(object):
         table_rows = self._get_table_rows(tables_info, post_data)
         if len(table_rows) == 0:
             return False
-        schema = Schema(
-            self._return.return_type.get_schema_by_name(tables_info))
+        schema = get_return_type_schema(
+            self._return.return_type, tables_info)
         if not schema.is_all_valid(table_rows):
             return False
         return True
@@ -1840,7 +2130,8 @@ class ReturnQuestion(object):
         tables = []
         for resource in self._return.return_type.resources:
             resource_name = ReturnType.FORMAT_QUESTION
-            schema = Schema(resource.get('schema'))
+            schema = get_return_type_schema(
+                self._return.return_type, resource.get('name'))
             headers = []
             for f in schema.fields:
                 header = {
@@ -2329,7 +2620,8 @@ class ReturnSheet(object):
         self._species = _species_id
         for resource in self._return.return_type.resources:
             _resource_name = _species_id
-            _schema = Schema(resource.get('schema'))
+            _schema = get_return_type_schema(
+                self._return.return_type, resource.get('name'))
             try:
                 _r_table = self._return.returntable_set.get(
                     name=_resource_name)
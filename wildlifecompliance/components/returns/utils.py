@@ -9,7 +9,9 @@ from wildlifecompliance.components.returns.models import (
     ReturnTable,
     ReturnRow,
 )
-from wildlifecompliance.components.returns.utils_schema import Schema
+from wildlifecompliance.components.returns.utils_schema import (
+    get_return_type_schema,
+)
 from wildlifecompliance.utils import excel
 from ledger.checkout.utils import (
     create_basket_session,
@@ -209,7 +211,7 @@ def _is_post_data_valid(ret, tables_info, post_data):
     print(table_rows)
     if len(table_rows) == 0:
         return False
-    schema = Schema(ret.return_type.get_schema_by_name(tables_info))
+    schema = get_return_type_schema(ret.return_type, tables_info)
     print("===========Schema Info========")
     print(schema.is_all_valid(table_rows))
     if not schema.is_all_valid(table_rows):
@@ -485,6 +487,33 @@ class ReturnSpeciesUtility(ReturnUtility):
 
         return raw_species_list
 
+    def get_species_list_for(self, selected_activity):
+        '''
+        Get list of species names associated with this Return from the
+        species list stored on the selected purpose.
+        '''
+        species_list = None
+        try:
+
+            condition = self._return.condition
+            selected_purpose = [
+                p for p in selected_activity.proposed_purposes.all()
+                if p.purpose_id == condition.licence_purpose_id
+            ][0]
+            species_list = selected_purpose.get_species_list()
+
+        except IndexError:
+            logger.warn('{0} ReturnID: {1}'.format(
+                'No Species list available.', self._return.id
+            ))
+        except BaseException as e:
+            logger.error('{0} ReturnID: {1} - {2}'.format(
+                'ReturnSpeciesUtility.get_species_list_for()',
+                self._return.id, e
+            ))
+
+        return species_list if species_list is not None else []
+
     def get_form_species_list(self):
         '''
         Get list of species common names from the application form.
@@ -597,12 +626,13 @@ class SpreadSheet(object):
     """
     An utility object for Excel manipulation.
     """
+    CHUNK_SIZE = 1000
 
     def __init__(self, _return, _filename):
         self.ret = _return
         self.filename = _filename
-        self.errors = []
-        self.rows_list = []
+        self.errors = {}
+        self.row_count = 0
 
     def factory(self):
         """
@@ -612,36 +642,84 @@ class SpreadSheet(object):
 
         return ReturnDataSheet(self.ret, self.filename)
 
-    def get_table_rows(self):
+    def iter_table_rows(self):
         """
-        Gets the row of data.
-        :return: list format {'col_header':[row1_val,, row2_val,...],...}
+        Streams the rows of data from a read-only workbook.
+        :return: iterator of {'col_header': row_val,...} for each row.
         """
         from datetime import datetime
 
-        wb = excel.load_workbook(self.filename)
-        sheet_name = excel.get_sheet_titles(wb)[0]
-        ws = wb[sheet_name]
-        table_data = excel.TableData(ws, 1, 1)
-        row_list = table_data._parse_rows()
-        num_rows = row_list.__len__()
-        for row_num in range(num_rows):
-            row_data = {}
-            for key, value in table_data.by_columns():
-                if type(value[row_num]) is datetime:
-                    row_data[key.lower()] = value[row_num].strftime("%d/%m/%Y")
-                    continue
-                row_data[key.lower()] = value[row_num] \
-                    if value[row_num] is not None else ''
-
+        wb = excel.load_workbook(self.filename, read_only=True)
+        try:
+            ws = wb.worksheets[0]
             # create deficiency key as part of row data
             table_name = self.ret.return_type.resources[0]['name']
             table_deficiency = table_name + '-deficiency-field'
-            row_data[table_deficiency] = None
 
-            self.rows_list.append(row_data)
+            for row in excel.iter_table_rows(ws, 1, 1):
+                row_data = {}
+                for key, value in row.items():
+                    if type(value) is datetime:
+                        row_data[key.lower()] = value.strftime("%d/%m/%Y")
+                        continue
+                    row_data[key.lower()] = value if value is not None else ''
 
-        return self.rows_list
+                row_data[table_deficiency] = None
+
+                yield row_data
+
+        finally:
+            # release the workbook archive held open by read-only mode.
+            if hasattr(wb, 'close'):
+                wb.close()
+            elif getattr(wb, '_archive', None):
+                wb._archive.close()
+
+    def get_table_rows(self):
+        """
+        Gets the row of data.
+        :return: list format [{'col_header': row1_val,...}, ...]
+        """
+        return list(self.iter_table_rows())
+
+    def validate_table_rows(self):
+        """
+        Validates each row against schema as it is streamed, keeping only the
+        errors for rows which are not valid.
+        :return: Boolean
+        """
+        self.errors = {}
+        self.row_count = 0
+        for row in self.iter_table_rows():
+            errors = self.schema.get_error_fields(row)
+            if errors:
+                self.errors[self.row_count] = errors
+            self.row_count += 1
+
+        if self.row_count == 0:
+            return False
+
+        # NOTE: as before only the second row is checked for errors.
+        return self.row_count > 1 and 1 not in self.errors
+
+    def save_table_rows(self, table_name):
+        """
+        Replaces the rows of the named Return Table with the rows of data,
+        streamed again from the workbook and saved in chunks.
+        """
+        return_table = ReturnTable.objects.get_or_create(
+            name=table_name, ret=self.ret)[0]
+        # delete any existing rows as they will all be recreated
+        return_table.returnrow_set.all().delete()
+        chunk = []
+        for row in self.iter_table_rows():
+            chunk.append(row)
+            if len(chunk) == self.CHUNK_SIZE:
+                return_table.set_rows(chunk)
+                chunk = []
+
+        if chunk:
+            return_table.set_rows(chunk)
 
     def create_return_data(self):
         """
@@ -674,38 +752,23 @@ class Regulation15Sheet(SpreadSheet):
 
     def __init__(self, _ret, _filename):
         super(Regulation15Sheet, self).__init__(_ret, _filename)
-        self.schema = Schema(
-            self.ret.return_type.get_schema_by_name(
-                self.REGULATION_15))
+        self.schema = get_return_type_schema(
+            self.ret.return_type, self.REGULATION_15)
 
     def is_valid(self):
         """
         Validates against schema.
         :return: Boolean
         """
-        table_rows = self.get_table_rows()
-        if len(table_rows) == 0:
-            return False
-        for row in table_rows:
-            self.errors.append(self.schema.get_error_fields(row))
-
-        return self.errors[1].__len__() == 0
+        return self.validate_table_rows()
 
     def create_return_data(self):
         """
         Method to persist Return record.
         :return:
         """
-        if self.rows_list:
-            return_table = ReturnTable.objects.get_or_create(
-                name=self.REGULATION_15, ret=self.ret)[0]
-            # delete any existing rows as they will all be recreated
-            return_table.returnrow_set.all().delete()
-            return_rows = [
-                ReturnRow(
-                    return_table=return_table,
-                    data=row) for row in self.rows_list]
-            ReturnRow.objects.bulk_create(return_rows)
+        if self.row_count:
+            self.save_table_rows(self.REGULATION_15)
 
         return True
 
@@ -718,38 +781,23 @@ class ReturnDataSheet(SpreadSheet):
 
     def __init__(self, _ret, _filename):
         super(ReturnDataSheet, self).__init__(_ret, _filename)
-        self.schema = Schema(
-            self.ret.return_type.get_schema_by_name(
-               self.ret.return_type.resources[0]['name']))
+        self.schema = get_return_type_schema(
+            self.ret.return_type, self.ret.return_type.resources[0]['name'])
 
     def is_valid(self):
         '''
         Validates against schema.
         :return: Boolean
         '''
-        table_rows = self.get_table_rows()
-        if len(table_rows) == 0:
-            return False
-        for row in table_rows:
-            self.errors.append(self.schema.get_error_fields(row))
-
-        return self.errors[1].__len__() == 0
+        return self.validate_table_rows()
 
     def create_return_data(self):
         '''
         Method to persist Return record.
         :return:
         '''
-        if self.rows_list:
-            return_table = ReturnTable.objects.get_or_create(
-                name=self.RETURN_DATA, ret=self.ret)[0]
-            # delete any existing rows as they will all be recreated
-            return_table.returnrow_set.all().delete()
-            return_rows = [
-                ReturnRow(
-                    return_table=return_table,
-                    data=row) for row in self.rows_list]
-            ReturnRow.objects.bulk_create(return_rows)
+        if self.row_count:
+            self.save_table_rows(self.RETURN_DATA)
 
         return True
 
@@ -162,6 +162,20 @@ class SchemaField:
             self.data.get('type'))
         self.type = type_class(self.data)
         self.constraints = SchemaConstraints(self.data.get('constraints', {}))
+        # compiled for validation.
+        self.is_integer = isinstance(self.type, types.IntegerType)
+        self.enum_set = None
+        self.enum_error = None
+        if self.constraints.enum:
+            self.enum_error = "The value must be one the following: {}".format(
+                [str(v) for v in self.constraints.enum])
+            # a string in the enum is valid when there are no other checks.
+            if isinstance(self.type, types.StringType) and set(
+                    self.constraints.data) <= set(['enum', 'required']):
+                self.enum_set = set(
+                    v for v in self.constraints.enum
+                    if isinstance(v, six.string_types)
+                )
 
     # implement some dict like methods
     def __getitem__(self, item):
@@ -224,9 +238,16 @@ class SchemaField:
         :return: None if value is valid or an error message string
         """
         error = None
+        if self.enum_set:
+            try:
+                if value in self.enum_set:
+                    return error
+            except TypeError:
+                # unhashable values (ie. lists from json) are not in the enum.
+                return self.enum_error
         # override the integer validation. The default message is a bit cryptic if there's an error casting a string
         # like '1.2' into an int.
-        if isinstance(self.type, types.IntegerType):
+        if self.is_integer:
             if not is_blank_value(value):
                 not_integer = False
                 try:
@@ -246,10 +267,8 @@ class SchemaField:
             error = "{}".format(e)
             # Override the default enum exception message to include all
             # possible values
-            if error.find('enum array') and self.constraints.enum:
-                values = [str(v) for v in self.constraints.enum]
-                error = "The value must be one the following: {}".format(
-                    values)
+            if error.find('enum array') and self.enum_error:
+                error = self.enum_error
         return error
 
     def __str__(self):
@@ -299,6 +318,19 @@ class Schema:
         self.species_fields = self.find_species_fields(self)
         #for f in self.fields:
         #    print(f.name)
+        # compiled field lookups (first field wins for a name).
+        self.fields_by_name = {}
+        self.fields_by_lower_name = {}
+        for f in self.fields:
+            self.fields_by_name.setdefault(f.name, f)
+            self.fields_by_lower_name.setdefault(f.name.lower(), f)
+        self.lat_long_fields = None
+        if self.is_lat_long_easting_northing_schema():
+            self.lat_long_fields = dict([
+                (name, self.get_field_by_mame(name).name) for name in [
+                    'latitude', 'longitude', 'easting', 'northing', 'zone',
+                ]
+            ])
 
     # implement some dict like methods
     def __getitem__(self, item):
@@ -329,12 +361,8 @@ class Schema:
 
     def get_field_by_mame(self, name, icase=True):
         if icase and name:
-            name = name.lower()
-        for f in self.fields:
-            field_name = f.name.lower() if icase else f.name
-            if field_name == name:
-                return f
-        return None
+            return self.fields_by_lower_name.get(name.lower())
+        return self.fields_by_name.get(name)
 
     def field_validation_error(self, field_name, value):
         field = self.get_field_by_mame(field_name)
@@ -377,22 +405,18 @@ class Schema:
         {field_name: { 'value': value, 'error': None|msg}}
         :return:
         """
-        if not self.is_lat_long_easting_northing_schema():
+        if not self.lat_long_fields:
             return field_validation
         lat_validation = field_validation.get(
-            self.get_field_by_mame(
-                'latitude', icase=True).name, {})
+            self.lat_long_fields['latitude'], {})
         north_validation = field_validation.get(
-            self.get_field_by_mame(
-                'northing', icase=True).name, {})
+            self.lat_long_fields['northing'], {})
         long_validation = field_validation.get(
-            self.get_field_by_mame(
-                'longitude', icase=True).name, {})
+            self.lat_long_fields['longitude'], {})
         east_validation = field_validation.get(
-            self.get_field_by_mame(
-                'easting', icase=True).name, {})
+            self.lat_long_fields['easting'], {})
         zone_validation = field_validation.get(
-            self.get_field_by_mame('zone', icase=True).name, {})
+            self.lat_long_fields['zone'], {})
         if lat_validation.get('value') and long_validation.get('value'):
             if not north_validation.get('value'):
                 north_validation['error'] = None
@@ -435,7 +459,7 @@ class Schema:
                     'error': error
                 }
         # Special case for lat/long easting/northing
-        if self.is_lat_long_easting_northing_schema():
+        if self.lat_long_fields:
             result = self.post_validate_lat_long_easting_northing(result)
         return result
 
@@ -444,6 +468,14 @@ class Schema:
         for row in rows:
             yield self.validate_row(row)
 
+    def validate_rows(self, rows):
+        """
+        Validate a batch of rows in one pass.
+        :param rows: list of key value dicts or tuples
+        :return: list of validated rows (see validate_row())
+        """
+        return [self.validate_row(row) for row in rows]
+
     def set_field_for(self, rows):
         """
         Apply fields which exist on the schema but not on the row. Fields will
@@ -496,6 +528,43 @@ class Schema:
         return True
 
 
+_compiled_schemas = {}
+
+
+def get_return_type_schema(return_type, name):
+    """
+    Get the Schema for a resource on the return type compiled once for the
+    process and keyed by return type id, version and resource name. The
+    schema descriptor is fingerprinted once for each return type instance so
+    an edited descriptor recompiles.
+    :param return_type: the ReturnType.
+    :param name: the name of the resource on the return type.
+    :return: Schema
+    """
+    import hashlib
+
+    fingerprints = getattr(return_type, '_schema_fingerprints', None)
+    if fingerprints is None:
+        fingerprints = {}
+        return_type._schema_fingerprints = fingerprints
+
+    fingerprint = fingerprints.get(name)
+    if fingerprint is None:
+        fingerprint = hashlib.md5(json.dumps(
+            return_type.get_schema_by_name(name), sort_keys=True
+        ).encode('utf-8')).hexdigest()
+        fingerprints[name] = fingerprint
+
+    key = (return_type.id, return_type.version, name)
+    compiled = _compiled_schemas.get(key)
+    if compiled is None or compiled[0] != fingerprint:
+        compiled = (
+            fingerprint, Schema(return_type.get_schema_by_name(name)))
+        _compiled_schemas[key] = compiled
+
+    return compiled[1]
+
+
 def create_return_template_workbook(return_type):
     wb = Workbook(write_only=True)
     for resource in return_type.resources:
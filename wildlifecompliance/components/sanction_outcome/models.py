@@ -247,9 +247,13 @@ class SanctionOutcome(models.Model):
                 (Q(name=self.allocated_group.name) & Q(region=self.allocated_group.region) & Q(district=None))).values_list('id',flat=True))
         return list(set(groups))
 
-    def get_content_for_uin(self):
+    def get_content_for_uin(self, uin=None):
+        '''
+        Fixed width UIN record for the sanction outcome. A body can be given
+        to be reused when writing a batch of records.
+        '''
         offender = self.get_offender()[0]
-        uin = UnpaidInfringementFileBody()
+        uin = uin if uin else UnpaidInfringementFileBody()
         uin.offenders_surname.set(get_last_name(offender))
         uin.offenders_other_names.set(get_first_name(offender))
         uin.offenders_date_of_birth.set(get_dob(offender))
@@ -481,11 +485,17 @@ class SanctionOutcome(models.Model):
 
     @property
     def dotag_offence_code(self):
-        qs_aco = AllegedCommittedOffence.objects.filter(Q(sanction_outcome=self) & Q(included=True))
-        if qs_aco.count() != 1:  # Only infringement notice can have penalty. Infringement notice can have only one alleged offence.
+        # included offences are prefetched when exporting a batch.
+        if hasattr(self, 'included_alleged_committed_offences'):
+            acos = self.included_alleged_committed_offences
+        else:
+            acos = list(AllegedCommittedOffence.objects.filter(
+                Q(sanction_outcome=self) & Q(included=True)
+            ).select_related('alleged_offence__section_regulation'))
+        if len(acos) != 1:  # Only infringement notice can have penalty. Infringement notice can have only one alleged offence.
             raise ValidationError('There are multiple alleged committed offences in this sanction outcome.')
         else:
-            return qs_aco.first().dotag_offence_code
+            return acos[0].dotag_offence_code
 
     @property
     def offence_occurrence_date(self):
@@ -1,26 +1,15 @@
 from django.conf import settings
-from wildlifecompliance.helpers import (is_wildlife_compliance_officer,
-is_compliance_management_user,prefer_compliance_management, is_internal_url)
-from wildlifecompliance.components.users.models import (ComplianceManagementUserPreferences)
+from wildlifecompliance.helpers import get_preference_snapshot, is_internal_url
 
 def authorised_index(request):
 
-    if is_wildlife_compliance_officer(request):
-        if not is_compliance_management_user(request) and prefer_compliance_management(request):
-            #if the user is NOT a compliance management user but IS a wildlife compliance officer, change their preference
-            preferences = ComplianceManagementUserPreferences.objects.get(email_user_id=request.user.id)
-            preferences.prefer_compliance_management = False
-            preferences.save()
-        return {"authorised_index":"app"}
-    elif is_compliance_management_user(request):
-        if not prefer_compliance_management(request):
-            #if the user IS a compliance management user but NOT a wildlife compliance officer, change their preference
-            preferences = ComplianceManagementUserPreferences.objects.get(email_user_id=request.user.id)
-            preferences.prefer_compliance_management = True
-            preferences.save()
+    if request.user.is_authenticated():
+        snapshot = get_preference_snapshot(request)
+        if snapshot['wildlife_compliance_officer'] or \
+                snapshot['compliance_management_user']:
+            return {"authorised_index":"app"}
 
-        return {"authorised_index":"app"}
-    elif not is_internal_url(request):
+    if not is_internal_url(request):
         return {"authorised_index":"app"}
     else:
-        return ""
\ No newline at end of file
+        return ""
@@ -2,17 +2,22 @@ from __future__ import unicode_literals
 
 import logging
 
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
 from rest_framework import serializers
 from ledger.accounts.models import EmailUser
 from wildlifecompliance import settings
 from wildlifecompliance.components.applications.models import ActivityPermissionGroup
+from wildlifecompliance.components.main.utils import (
+        get_cache_version,
+        increment_cache_version,
+        )
 from wildlifecompliance.components.users.models import (
         #CompliancePermissionGroup, 
         ComplianceManagementUserPreferences,
         )
 from confy import env
-from django.db.models import Q
+from django.db.models import Value, CharField
 
 DEBUG = env('DEBUG', False)
 BASIC_AUTH = env('BASIC_AUTH', False)
@@ -20,6 +25,249 @@ BASIC_AUTH = env('BASIC_AUTH', False)
 logger = logging.getLogger(__name__)
 # logger = logging
 
+LICENCE_OFFICER_PERMISSIONS = [
+    'organisation_access_request',
+    'licensing_officer',
+    'issuing_officer',
+    'assessor',
+    'return_curator',
+    'payment_officer',
+]
+
+
+class RoleResolver(object):
+    '''
+    The auth groups, compliance management system groups and licensing
+    permissions of a user loaded with a single query. Resolved roles are
+    memoized on the request and, when ROLE_CACHE_TTL is set, in the shared
+    cache until any group membership changes.
+    '''
+    REQUEST_ATTR = '_wildlifecompliance_roles'
+    CACHE_KEY = 'wildlifecompliance.roles.{0}.{1}'
+    VERSION_CACHE_KEY = 'wildlifecompliance.roles.version'
+
+    KIND_GROUP = 'group'
+    KIND_COMPLIANCE_GROUP = 'compliance_group'
+    KIND_LICENSING_PERMISSION = 'licensing_permission'
+
+    def __init__(self, user_id=None, groups=(), compliance_groups=(),
+                 licensing_permissions=()):
+        self.user_id = user_id
+        self.groups = frozenset(groups)
+        self.compliance_groups = frozenset(compliance_groups)
+        self.licensing_permissions = frozenset(licensing_permissions)
+
+    @classmethod
+    def for_request(cls, request):
+        '''
+        Get the roles for the request user, resolved once per request.
+        '''
+        # memoize on the django request shared by a rest framework request.
+        http_request = getattr(request, '_request', request)
+        user = request.user
+        roles = getattr(http_request, cls.REQUEST_ATTR, None)
+        if roles is None or roles.user_id != user.id:
+            roles = cls.for_user(user)
+            setattr(http_request, cls.REQUEST_ATTR, roles)
+
+        return roles
+
+    @classmethod
+    def for_user(cls, user):
+        '''
+        Get the roles for the user from the shared cache or the database.
+        '''
+        if not user.is_authenticated():
+            return cls()
+
+        timeout = int(settings.ROLE_CACHE_TTL)
+        if not timeout:
+            return cls.load(user)
+
+        key = cls.CACHE_KEY.format(cls.get_version(), user.id)
+        cached = cache.get(key)
+        if cached is not None:
+            return cls(user.id, **cached)
+
+        roles = cls.load(user)
+        cache.set(key, {
+            'groups': list(roles.groups),
+            'compliance_groups': list(roles.compliance_groups),
+            'licensing_permissions': list(roles.licensing_permissions),
+        }, timeout)
+
+        return roles
+
+    @classmethod
+    def load(cls, user):
+        '''
+        Load the roles for the user with a single query.
+        '''
+        from wildlifecompliance.components.main.models import (
+            ComplianceManagementSystemGroup,
+        )
+
+        def kind(name):
+            return Value(name, output_field=CharField())
+
+        groups = Group.objects.filter(
+            user=user,
+        ).annotate(
+            kind=kind(cls.KIND_GROUP),
+        ).values_list('name', 'kind')
+
+        compliance_groups = ComplianceManagementSystemGroup.objects.filter(
+            compliancemanagementsystemgrouppermission__emailuser=user,
+        ).annotate(
+            kind=kind(cls.KIND_COMPLIANCE_GROUP),
+        ).values_list('name', 'kind')
+
+        licensing_permissions = Permission.objects.filter(
+            group__user=user,
+            group__activitypermissiongroup__isnull=False,
+            codename__in=LICENCE_OFFICER_PERMISSIONS,
+        ).annotate(
+            kind=kind(cls.KIND_LICENSING_PERMISSION),
+        ).values_list('codename', 'kind')
+
+        resolved = {
+            cls.KIND_GROUP: [],
+            cls.KIND_COMPLIANCE_GROUP: [],
+            cls.KIND_LICENSING_PERMISSION: [],
+        }
+        for name, name_kind in groups.union(
+                compliance_groups, licensing_permissions):
+            resolved[name_kind].append(name)
+
+        return cls(
+            user.id,
+            groups=resolved[cls.KIND_GROUP],
+            compliance_groups=resolved[cls.KIND_COMPLIANCE_GROUP],
+            licensing_permissions=resolved[cls.KIND_LICENSING_PERMISSION],
+        )
+
+    @classmethod
+    def get_version(cls):
+        return get_cache_version(cls.VERSION_CACHE_KEY)
+
+    @classmethod
+    def invalidate(cls):
+        '''
+        Invalidate the resolved roles of all users when group membership or
+        group permissions change.
+        '''
+        increment_cache_version(cls.VERSION_CACHE_KEY)
+
+    def in_group(self, *names):
+        return not self.groups.isdisjoint(names)
+
+    def in_compliance_group(self, *names):
+        return not self.compliance_groups.isdisjoint(names)
+
+    def is_licence_officer(self):
+        return bool(self.licensing_permissions)
+
+
+def get_roles(request):
+    '''
+    Get the resolved roles for the request user.
+    '''
+    return RoleResolver.for_request(request)
+
+
+class UserPreferenceSnapshot(object):
+    '''
+    The compliance management preference and roles of a user kept in the
+    session. Preferences are reconciled with the user roles when a snapshot
+    is taken, on login and on the first request after the user preferences or
+    any group membership change, so page views only read the session.
+    '''
+    SESSION_KEY = 'wildlifecompliance_preferences'
+    VERSION_CACHE_KEY = 'wildlifecompliance.preferences.version.{0}'
+
+    @classmethod
+    def for_request(cls, request):
+        '''
+        Get the snapshot for the request user, reconciled when out of date.
+        '''
+        session = getattr(request, 'session', None)
+        snapshot = session.get(cls.SESSION_KEY) if session is not None \
+            else None
+        if snapshot is None \
+                or snapshot['user_id'] != request.user.id \
+                or snapshot['version'] != cls.get_version(request.user.id):
+            snapshot = cls.reconcile(request)
+
+        return snapshot
+
+    @classmethod
+    def reconcile(cls, request):
+        '''
+        Update the compliance management preference of the request user for
+        their roles and take a new snapshot.
+        '''
+        user = request.user
+        preference, created = \
+            ComplianceManagementUserPreferences.objects.get_or_create(
+                email_user=user)
+        prefer = preference.prefer_compliance_management
+        compliance_user = is_compliance_management_user(request)
+        officer = is_wildlife_compliance_officer(request)
+
+        # CallEmail RO group users prefer compliance management and users
+        # without a compliance management read only role revert to WL.
+        if is_compliance_management_callemail_readonly_user(request):
+            prefer = True
+        elif not is_compliance_management_readonly_user(request):
+            prefer = False
+
+        # WL officers who are not compliance management users prefer WL and
+        # compliance management users who are not WL officers prefer CM.
+        if officer:
+            if not compliance_user:
+                prefer = False
+        elif compliance_user:
+            prefer = True
+
+        if prefer != preference.prefer_compliance_management:
+            preference.prefer_compliance_management = prefer
+            preference.save()
+
+        snapshot = {
+            'user_id': user.id,
+            'version': cls.get_version(user.id),
+            'prefer_compliance_management': prefer,
+            'compliance_management_user': compliance_user,
+            'wildlife_compliance_officer': officer,
+        }
+        session = getattr(request, 'session', None)
+        if session is not None:
+            session[cls.SESSION_KEY] = snapshot
+
+        return snapshot
+
+    @classmethod
+    def get_version(cls, user_id):
+        return [
+            RoleResolver.get_version(),
+            get_cache_version(cls.VERSION_CACHE_KEY.format(user_id)),
+        ]
+
+    @classmethod
+    def invalidate(cls, user_id):
+        '''
+        Invalidate the snapshot of a user when their preferences change.
+        '''
+        increment_cache_version(cls.VERSION_CACHE_KEY.format(user_id))
+
+
+def get_preference_snapshot(request):
+    '''
+    Get the compliance management preference snapshot for the request user.
+    '''
+    return UserPreferenceSnapshot.for_request(request)
+
+
 def is_new_to_wildlifelicensing(request=None):
     '''
     Verify request user holds minimum details to use Wildlife Licensing.
@@ -31,7 +279,7 @@ def is_new_to_wildlifelicensing(request=None):
     has_user_details = True if request.user.first_name \
         and request.user.last_name \
         and request.user.dob \
-        and request.user.residential_address \
+        and request.user.residential_address_id \
         and (request.user.phone_number or request.user.mobile_number) \
         and (request.user.identification2 or prefer_compliance_management(request)) else False 
 
@@ -102,7 +350,7 @@ def is_wildlifecompliance_payment_officer(request):
     is_payment_officer = request.user.is_authenticated() and \
         in_dbca_domain(request) and \
         (
-            request.user.groups.filter(name__in=[PAYMENTS_GROUP_NAME]).exists()
+            get_roles(request).in_group(PAYMENTS_GROUP_NAME)
         )
 
     return is_payment_officer
@@ -156,15 +404,8 @@ def is_internal(request):
         return is_departmentUser(request)
 
 def is_officer(request):
-    licence_officer_groups = [group.name for group in ActivityPermissionGroup.objects.filter(
-            permissions__codename__in=['organisation_access_request',
-                                       'licensing_officer',
-                                       'issuing_officer',
-                                       'assessor',
-                                       'return_curator',
-                                       'payment_officer'])]
-    return request.user.is_authenticated() and (belongs_to_list(
-        request.user, licence_officer_groups) or request.user.is_superuser)
+    return request.user.is_authenticated() and (
+        get_roles(request).is_licence_officer() or request.user.is_superuser)
 
 def is_external_url(request):
     external = False
@@ -182,12 +423,8 @@ def prefer_compliance_management(request):
     ret_value = False
 
     if request.user.is_authenticated():
-        preference = ComplianceManagementUserPreferences.objects.get(email_user=request.user)
-        #if preference.prefer_compliance_management and (
-        #        is_compliance_management_readonly_user(request) or is_compliance_management_callemail_readonly_user(request)
-        #        ):
-        #if preference.prefer_compliance_management or is_compliance_management_callemail_readonly_user(request):
-        if preference.prefer_compliance_management:
+        snapshot = get_preference_snapshot(request)
+        if snapshot['prefer_compliance_management']:
             ret_value = True
 
     return ret_value
@@ -197,7 +434,7 @@ def is_wildlife_compliance_officer(request):
                request.user.is_superuser
 
     if request.user.is_authenticated() and (
-            Group.objects.get(name=settings.GROUP_WILDLIFE_COMPLIANCE_OFFICERS).user_set.filter(id=request.user.id)
+            get_roles(request).in_group(settings.GROUP_WILDLIFE_COMPLIANCE_OFFICERS)
         ):
         wildlife_compliance_user = True
 
@@ -208,7 +445,7 @@ def is_wildlife_compliance_payment_officer(request):
                request.user.is_superuser
 
     if request.user.is_authenticated() and (
-            Group.objects.get(name=settings.GROUP_WILDLIFE_COMPLIANCE_PAYMENT_OFFICERS).user_set.filter(id=request.user.id)
+            get_roles(request).in_group(settings.GROUP_WILDLIFE_COMPLIANCE_PAYMENT_OFFICERS)
         ):
         wildlife_compliance_user = True
 
@@ -243,41 +480,41 @@ def is_compliance_internal_user(request):
     return compliance_user
 
 def is_compliance_management_readonly_user(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_COMPLIANCE_MANAGEMENT_READ_ONLY).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_COMPLIANCE_MANAGEMENT_READ_ONLY)
 
 def is_compliance_management_callemail_readonly_user(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_COMPLIANCE_MANAGEMENT_CALL_EMAIL_READ_ONLY).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_COMPLIANCE_MANAGEMENT_CALL_EMAIL_READ_ONLY)
 
 def is_compliance_management_approved_external_user(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_COMPLIANCE_MANAGEMENT_APPROVED_EXTERNAL_USER).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_COMPLIANCE_MANAGEMENT_APPROVED_EXTERNAL_USER)
 
 def is_compliance_management_volunteer(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_VOLUNTEER).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_VOLUNTEER)
 
 def is_compliance_management_officer(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_OFFICER).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_OFFICER)
 
 def is_compliance_management_inspection_officer(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_INSPECTION_OFFICER).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_INSPECTION_OFFICER)
 
 def is_compliance_management_prosecution_officer(request):
     return request.user.is_authenticated() and \
-    request.user.compliancemanagementsystemgrouppermission_set \
-        .filter(Q(group__name=settings.GROUP_PROSECUTION_COORDINATOR) |
-                Q(group__name=settings.GROUP_PROSECUTION_MANAGER) |
-                Q(group__name=settings.GROUP_PROSECUTION_COUNCIL)).exists()
+    get_roles(request).in_compliance_group(
+        settings.GROUP_PROSECUTION_COORDINATOR,
+        settings.GROUP_PROSECUTION_MANAGER,
+        settings.GROUP_PROSECUTION_COUNCIL)
 
 def is_compliance_management_manager(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_MANAGER).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_MANAGER)
 
 def is_compliance_management_infringement_notice_coordinator(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_INFRINGEMENT_NOTICE_COORDINATOR).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_INFRINGEMENT_NOTICE_COORDINATOR)
 
 def is_cm_compliance_admin(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_COMPLIANCE_ADMIN).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_COMPLIANCE_ADMIN)
 
 def is_cm_licensing_admin(request):
-    return request.user.is_authenticated() and request.user.compliancemanagementsystemgrouppermission_set.filter(group__name=settings.GROUP_LICENSING_ADMIN).exists()
+    return request.user.is_authenticated() and get_roles(request).in_compliance_group(settings.GROUP_LICENSING_ADMIN)
 
 def is_able_to_view_sanction_outcome_pdf(request):
     return request.user.is_authenticated() if (
@@ -289,12 +526,7 @@ def is_able_to_view_sanction_outcome_pdf(request):
 
 def get_all_officers():
     licence_officer_groups = ActivityPermissionGroup.objects.filter(
-            permissions__codename__in=['organisation_access_request',
-                                       'licensing_officer',
-                                       'issuing_officer',
-                                       'assessor',
-                                       'return_curator',
-                                       'payment_officer'])
+            permissions__codename__in=LICENCE_OFFICER_PERMISSIONS)
     return EmailUser.objects.filter(
         groups__name__in=licence_officer_groups)
 
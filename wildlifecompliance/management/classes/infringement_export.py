@@ -0,0 +1,127 @@
+import io
+import logging
+
+from django.db.models import Prefetch
+
+from wildlifecompliance.components.sanction_outcome.models import (
+    AllegedCommittedOffence,
+)
+from wildlifecompliance.management.classes.unpaid_infringement_file import (
+    UnpaidInfringementFileBody,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InfringementExport(object):
+    '''
+    Writes a record for each item of a queryset to a file buffer. Items are
+    fetched in chunks with all related records needed for the records
+    prefetched for each chunk, rather than queried for each record.
+    '''
+    CHUNK_SIZE = 1000
+
+    def __init__(self, queryset):
+        self.model = queryset.model
+        self.ids = list(
+            queryset.order_by('id').values_list('id', flat=True).distinct())
+        self.count = 0
+        self.errors = []
+
+    def get_queryset(self, ids):
+        return self.model.objects.filter(id__in=ids).order_by('id')
+
+    def iter_items(self):
+        for start in range(0, len(self.ids), self.CHUNK_SIZE):
+            chunk = self.ids[start:start + self.CHUNK_SIZE]
+            for item in self.get_queryset(chunk):
+                yield item
+
+    def get_record(self, item):
+        raise NotImplementedError('Subclass must implement get_record.')
+
+    def write(self, stream=None):
+        '''
+        Write the record for each item to the stream and return the stream.
+        Items failing to produce a record are logged and left out.
+        '''
+        stream = stream if stream else io.StringIO()
+        for item in self.iter_items():
+            try:
+                stream.write(self.get_record(item))
+                self.count += 1
+                self.written(item)
+            except Exception as e:
+                logger.error('{0}: error exporting {1} {2}: {3}'.format(
+                    self.__class__.__name__, self.model.__name__, item.id, e))
+                self.errors.append(item.id)
+
+        return stream
+
+    def written(self, item):
+        '''
+        Hook for an item whose record has been written.
+        '''
+        pass
+
+
+class UnpaidInfringementExport(InfringementExport):
+    '''
+    UIN body records for infringement notice sanction outcomes.
+    '''
+    def __init__(self, queryset):
+        super(UnpaidInfringementExport, self).__init__(queryset)
+        self.body = UnpaidInfringementFileBody()
+        self.penalty_amount_total = 0
+
+    def get_queryset(self, ids):
+        return super(UnpaidInfringementExport, self).get_queryset(
+            ids
+        ).select_related(
+            'driver__residential_address__country',
+            'registration_holder__residential_address__country',
+            'offender__person__residential_address__country',
+            'offence__location',
+        ).prefetch_related(
+            Prefetch(
+                'allegedcommittedoffence_set',
+                queryset=AllegedCommittedOffence.objects.filter(
+                    included=True,
+                ).select_related('alleged_offence__section_regulation'),
+                to_attr='included_alleged_committed_offences',
+            )
+        )
+
+    def get_record(self, sanction_outcome):
+        return sanction_outcome.get_content_for_uin(self.body)
+
+    def written(self, sanction_outcome):
+        self.penalty_amount_total += sanction_outcome.penalty_amount_2nd
+
+
+class DotRequestExport(InfringementExport):
+    '''
+    Department of Transport request records for the alleged committed
+    offences of parking infringement notices.
+    '''
+    def __init__(self, queryset):
+        super(DotRequestExport, self).__init__(queryset)
+        self.sanction_outcomes = []
+        self.sanction_outcome_ids = set()
+
+    def get_queryset(self, ids):
+        return super(DotRequestExport, self).get_queryset(
+            ids
+        ).select_related('sanction_outcome__offence')
+
+    def get_record(self, aco):
+        return '{0},{1},{2}\r\n'.format(
+            aco.sanction_outcome.registration_number,
+            str(1).zfill(2),
+            aco.sanction_outcome.offence_occurrence_date.strftime('%d%m%Y'),
+        )
+
+    def written(self, aco):
+        if aco.sanction_outcome_id not in self.sanction_outcome_ids:
+            self.sanction_outcome_ids.add(aco.sanction_outcome_id)
+            self.sanction_outcomes.append(aco.sanction_outcome)
@@ -3,47 +3,89 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
 from django.core.mail import send_mail
 from django.conf import settings
-from pathlib import Path
-import subprocess
+from django.template.loader import render_to_string
 import logging
 
+from wildlifecompliance.components.main.task_runner import (
+    CronJob,
+    CronTaskRunner,
+)
+from wildlifecompliance.components.returns.services import ReturnService
+from wildlifecompliance.components.licences.services import LicenceService
+from wildlifecompliance.components.applications.services import (
+    ApplicationService,
+)
+
 logger = logging.getLogger(__name__)
 
-LOGFILE = 'logs/cron_tasks.log'
 
 class Command(BaseCommand):
     help = 'Run the Wildlife Compliance Cron tasks'
 
-    def handle(self, *args, **options):
-        stdout_redirect = ' | tee -a {}'.format(LOGFILE)
-        subprocess.call('cat /dev/null > {}'.format(LOGFILE), shell=True)  # empty the log file
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.CRON_TASKS_MAX_WORKERS,
+            help='Number of jobs to run concurrently.',
+        )
 
-        logger.info('Running command {}'.format(__name__))
+    def get_jobs(self):
+        '''
+        Jobs to run with their dependencies. Licence renewals are verified on
+        the purposes remaining after expired licences are verified.
+        '''
+        return [
+            CronJob('verify_due_returns', ReturnService.verify_due_returns),
+            CronJob(
+                'verify_expired_licences',
+                LicenceService.verify_expired_licences,
+            ),
+            CronJob(
+                'verify_licence_renewals',
+                LicenceService.verify_licence_renewals,
+                depends_on=['verify_expired_licences'],
+            ),
+            CronJob(
+                'verify_species',
+                ApplicationService.verify_licence_species,
+            ),
+            CronJob(
+                'evict_species_cache',
+                ApplicationService.evict_species_cache,
+            ),
+            # CronJob('send_unpaid_infringements_file', ...),
+            # CronJob('extend_due_date_from_1st_to_2nd', ...),
+            # CronJob('send_rego_to_dot', ...),
+            # CronJob('close_document_and_physical_artifacts', ...),
+            # CronJob('notification_close_to_due_remediation_action', ...),
+            # CronJob('notification_overdue_remediation_action', ...),
+        ]
 
-        subprocess.call('python manage_wc.py verify_due_returns' + stdout_redirect, shell=True)
-        subprocess.call('python manage_wc.py verify_expired_licences' + stdout_redirect, shell=True)
-        subprocess.call('python manage_wc.py verify_licence_renewals' + stdout_redirect, shell=True)
-        subprocess.call('python manage_wc.py verify_species' + stdout_redirect, shell=True)
+    def handle(self, *args, **options):
+        logger.info('Running command {}'.format(__name__))
 
-        # subprocess.call('python manage_wc.py send_unpaid_infringements_file', shell=True)
-        # subprocess.call('python manage_wc.py extend_due_date_from_1st_to_2nd', shell=True)
-        # subprocess.call('python manage_wc.py send_rego_to_dot', shell=True)
-        # subprocess.call('python manage_wc.py close_document_and_physical_artifacts', shell=True)
-        # subprocess.call('python manage_wc.py notification_close_to_due_remediation_action', shell=True)
-        # subprocess.call('python manage_wc.py notification_overdue_remediation_action', shell=True)
+        runner = CronTaskRunner(self.get_jobs(), options['workers'])
+        runs = runner.run()
 
         logger.info('Command {} completed'.format(__name__))
-        self.send_email()
+        self.send_email(runner.run_id, runs)
 
-    def send_email(self):
+    def send_email(self, run_id, runs):
         '''
-        Reads stdout_redirect (LOGFILE) and emails to notification list.
+        Emails a summary of the job metrics to notification list.
         '''
-        log_txt = Path(LOGFILE).read_text()
+        context = {
+            'run_id': run_id,
+            'runs': runs,
+            'error_count': sum(run.error_count for run in runs),
+        }
+        html_txt = render_to_string(
+            'wildlifecompliance/emails/send_cron_tasks_summary.html', context)
         subject = '{0} - Cronjob'.format(settings.SYSTEM_NAME)
         body = ''
         to = settings.NOTIFICATION_EMAIL if isinstance(settings.NOTIFICATION_EMAIL, list) else [settings.NOTIFICATION_EMAIL]
-        send_mail(subject, body, settings.EMAIL_FROM, to, fail_silently=False, html_message=log_txt)
+        send_mail(subject, body, settings.EMAIL_FROM, to, fail_silently=False, html_message=html_txt)
 
 
 def get_infringement_notice_coordinators():
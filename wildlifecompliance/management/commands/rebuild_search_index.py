@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.applications.models import (
+    Application,
+    ApplicationFormDataRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the keyword search index on application form data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--application',
+            type=int,
+            default=None,
+            help='Only rebuild the index for this application ID.',
+        )
+
+    def handle(self, *args, **options):
+        application_id = options['application']
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            if application_id:
+                indexed = ApplicationFormDataRecord.update_search_index(
+                    application_id=application_id)
+
+            else:
+                indexed = 0
+                ids = Application.objects.values_list(
+                    'id', flat=True).order_by('id')
+                for app_id in ids.iterator():
+                    indexed += ApplicationFormDataRecord.update_search_index(
+                        application_id=app_id)
+
+            logger.info('Indexed {} form data records.'.format(indexed))
+            logger.info('Command {} finished'.format(__name__))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
@@ -0,0 +1,46 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.main.models import ComputedFieldsMixin
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Backfill or verify stored computed fields on all models.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            default=False,
+            help='Report out of date values without storing them.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            for model in apps.get_models():
+                if not issubclass(model, ComputedFieldsMixin):
+                    continue
+
+                changed = model.recompute_computed_fields(verify=verify)
+                for pk, name, stored, computed in changed:
+                    logger.info('{0} ID: {1} {2} {3} -> {4}'.format(
+                        model._meta.label, pk, name, stored, computed))
+
+                logger.info('{0} {1} {2} out of date values.'.format(
+                    model._meta.label,
+                    'Found' if verify else 'Updated',
+                    len(changed),
+                ))
+
+            logger.info('Command {} finished'.format(__name__))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
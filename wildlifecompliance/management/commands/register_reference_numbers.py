@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.main.models import ReferenceNumber
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Backfill the registry of issued reference numbers.'
+
+    def handle(self, *args, **options):
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            for source in ReferenceNumber.SOURCES:
+                count = ReferenceNumber.register_all(source)
+                logger.info('{0} registered {1} reference numbers.'.format(
+                    source.model, count))
+
+            logger.info('Command {} finished'.format(__name__))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
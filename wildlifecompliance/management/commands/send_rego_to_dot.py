@@ -20,6 +20,7 @@ from wildlifecompliance.components.sanction_outcome_due.models import SanctionOu
 from wildlifecompliance.components.sanction_outcome_due.serializers import SaveSanctionOutcomeDueDateSerializer
 from wildlifecompliance.components.wc_payments.models import InfringementPenalty, InfringementPenaltyInvoice
 from wildlifecompliance.helpers import DEBUG
+from wildlifecompliance.management.classes.infringement_export import DotRequestExport
 from wildlifecompliance.management.commands.cron_tasks import get_infringement_notice_coordinators
 from wildlifecompliance.settings import DOT_EMAIL_ADDRESS, SO_TYPE_INFRINGEMENT_NOTICE
 
@@ -52,24 +53,18 @@ class Command(BaseCommand):
                 count = acos.count()
                 logger.info('{} parking infringement notice(s) found to process.'.format(str(count)))
 
-                for aco in acos:
-                    print(aco.sanction_outcome.id)
-
                 if count:
                     file_for_dot = DotRequestFile()
                     file_for_dot.save()  # Create the object to save manytomany fields
 
-                    index = 1
-                    for aco in acos:
-                        try:
-                            file_for_dot.contents += aco.sanction_outcome.registration_number + ',' + str(index).zfill(2) + ',' + aco.sanction_outcome.offence_occurrence_date.strftime("%d%m%Y") + '\r\n'
-                            file_for_dot.sanction_outcomes.add(aco.sanction_outcome)
-                        except Exception as e:
-                            logger.error('Error command {}'.format(__name__))
+                    dot_export = DotRequestExport(acos)
+                    file_for_dot.contents = dot_export.write().getvalue()
 
-                    if not file_for_dot.sanction_outcomes.count():
+                    if not dot_export.sanction_outcomes:
                         return
 
+                    file_for_dot.sanction_outcomes.add(*dot_export.sanction_outcomes)
+
                     file_for_dot.filename = 'DPaw-' + datetime.date.today().strftime("%d%b%Y") + '-Request.txt'
                     file_for_dot.save()
 
@@ -1,4 +1,5 @@
 import datetime
+import io
 from django.db import transaction
 from django.core.management.base import BaseCommand
 from django.db.models import Q, Max
@@ -18,6 +19,7 @@ from wildlifecompliance.components.wc_payments.models import InfringementPenalty
 from wildlifecompliance.helpers import DEBUG
 from wildlifecompliance.management.classes.unpaid_infringement_file import UnpaidInfringementFileHeader, \
     UnpaidInfringementFileTrailer
+from wildlifecompliance.management.classes.infringement_export import UnpaidInfringementExport
 from wildlifecompliance.management.commands.cron_tasks import get_infringement_notice_coordinators
 from wildlifecompliance.settings import SO_TYPE_INFRINGEMENT_NOTICE
 
@@ -70,19 +72,15 @@ class Command(BaseCommand):
                     content_header = uin_header.get_content()
 
                     # Construct body
-                    content_body = ''
-                    penalty_amount_total = 0
-                    for so in sanction_outcomes:
-                        try:
-                            content_body += so.get_content_for_uin()
-                            penalty_amount_total += so.penalty_amount_2nd
-                        except Exception as e:
-                            logger.error('Error command {} for the sanction outcome: {}'.format(__name__, str(so.id)))
+                    uin_export = UnpaidInfringementExport(sanction_outcomes)
+                    uin_contents = io.StringIO()
+                    uin_contents.write(content_header)
+                    uin_export.write(uin_contents)
 
                     # Construct trailer
                     uin_trailer = UnpaidInfringementFileTrailer()
-                    uin_trailer.number_of_records.set(sanction_outcomes.count())
-                    uin_trailer.total_penalty_amount.set(penalty_amount_total)
+                    uin_trailer.number_of_records.set(uin_export.count)
+                    uin_trailer.total_penalty_amount.set(uin_export.penalty_amount_total)
                     uin_trailer.first_additional_cost_code.set('')
                     uin_trailer.first_additional_cost_total.set('')
                     uin_trailer.second_additional_cost_code.set('')
@@ -90,7 +88,8 @@ class Command(BaseCommand):
                     content_trailer = uin_trailer.get_content()
 
                     # Construct file contents
-                    contents_to_attach = content_header + content_body + content_trailer
+                    uin_contents.write(content_trailer)
+                    contents_to_attach = uin_contents.getvalue()
 
                     # Save contents in the DB, too
                     uin_file.contents = contents_to_attach
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.call_email.models import Location
+from wildlifecompliance.components.main.models import Region, District
+from wildlifecompliance.components.main.utils import (
+    GISAreaIndex,
+    get_region_gis,
+    get_district_gis,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Backfill the region and district of compliance locations.'
+
+    def handle(self, *args, **options):
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            # reload GIS areas in case they have been changed.
+            GISAreaIndex.clear()
+            regions = dict(
+                (r.cddp_name.lower(), r.id) for r in Region.objects.all())
+            districts = dict(
+                (d.cddp_name.lower(), d.id) for d in District.objects.all())
+
+            # group locations by resolved region and district to update
+            # each group with a single statement.
+            groups = {}
+            locations = Location.objects.values_list(
+                'id', 'wkb_geometry').order_by('id')
+            for location_id, geometry in locations.iterator():
+                region_id = None
+                district_id = None
+                if geometry:
+                    region_id = regions.get(
+                        get_region_gis(geometry).strip().lower())
+                    district_id = districts.get(
+                        get_district_gis(geometry).strip().lower())
+                groups.setdefault(
+                    (region_id, district_id), []).append(location_id)
+
+            updated = 0
+            for (region_id, district_id), ids in groups.items():
+                updated += Location.objects.filter(id__in=ids).update(
+                    region_id=region_id,
+                    district_id=district_id,
+                )
+
+            logger.info('Updated {} locations.'.format(updated))
+            logger.info('Command {} finished'.format(__name__))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
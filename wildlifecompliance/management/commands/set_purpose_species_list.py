@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.applications.models import (
+    ApplicationSelectedActivityPurpose,
+)
+from wildlifecompliance.components.licences.pdf import SpeciesHtmlParser
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Backfill the species list parsed from purpose species html.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-parse purposes with a species list already set.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            purposes = ApplicationSelectedActivityPurpose.objects.all()
+            if not options['all']:
+                purposes = purposes.filter(species_list__isnull=True)
+
+            # group purposes by species html so each distinct html is parsed
+            # once and each group updated with a single statement.
+            groups = {}
+            for purpose in purposes.only('id', 'purpose_species_json').iterator():
+                details = purpose.get_species_details()
+                groups.setdefault(details, []).append(purpose.id)
+
+            parsed = SpeciesHtmlParser.parse_many(list(groups.keys()))
+
+            updated = 0
+            for details, ids in groups.items():
+                updated += ApplicationSelectedActivityPurpose.objects.filter(
+                    id__in=ids
+                ).update(species_list=parsed[details])
+
+            logger.info('Updated {0} purposes from {1} species lists.'.format(
+                updated, len(groups)))
+            logger.info('Command {} finished'.format(__name__))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+import logging
+
+from wildlifecompliance.components.applications.services import (
+    ApplicationService,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Warm the local cache of species lookups from the TSC server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            default=False,
+            help='Remove all cached species lookups before warming.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            logger.info('Running command {}'.format(__name__))
+
+            warmed = ApplicationService.warm_species_cache(
+                clear=options['clear']
+            )
+
+            logger.info('Command {0} finished. Warmed {1} species.'.format(
+                __name__, warmed))
+
+        except Exception as e:
+            logger.error('Error command {0} : {1}'.format(
+                __name__, e))
@@ -9,16 +9,7 @@ from wildlifecompliance.management.securebase_manager import (
     SecureBaseUtils,
     SecureAuthorisationEnforcer,
 )
-from wildlifecompliance.components.users.models import ComplianceManagementUserPreferences
-#from wildlifecompliance.components.main.models import VolunteerGroup, ComplianceManagementCallEmailReadOnlyGroup
-from wildlifecompliance.components.main.models import ComplianceManagementSystemGroup
-from wildlifecompliance.helpers import (
-        is_compliance_management_callemail_readonly_user,
-        is_compliance_management_readonly_user,
-        is_compliance_management_approved_external_user,
-        is_compliance_management_volunteer,
-        is_compliance_management_user,
-        )
+from wildlifecompliance.helpers import get_preference_snapshot
 
 logger = logging.getLogger(__name__)
 # logger = logging
@@ -31,25 +22,12 @@ class FirstTimeNagScreenMiddleware(object):
     def process_request(self, request):
         if 'static' in request.path:
             return
-        if request.method == 'GET' and request.user.is_authenticated(
-        ) and 'api' not in request.path and 'admin' not in request.path:
-            # add CM Approved External users to CallEmail RO and volunteer groups
-            #if is_compliance_management_approved_external_user(request):
-            #    if not is_compliance_management_callemail_readonly_user(request):
-            #        ComplianceManagementSystemGroup.objects.get(name=settings.GROUP_COMPLIANCE_MANAGEMENT_CALL_EMAIL_READ_ONLY).add_member(request.user)
-            #    if not is_compliance_management_volunteer(request):
-            #        ComplianceManagementSystemGroup.objects.get(name=settings.GROUP_VOLUNTEER).add_member(request.user)
-            # Ensure CallEmail RO group users have prefer_compliance_management=True
-            preference, created = ComplianceManagementUserPreferences.objects.get_or_create(email_user=request.user)
-            if is_compliance_management_callemail_readonly_user(request) and not preference.prefer_compliance_management:
-                preference.prefer_compliance_management = True
-                preference.save()
-            # If no CM read only role, revert to WL
-            if not is_compliance_management_callemail_readonly_user(request) and not is_compliance_management_readonly_user(request):
-                preference.prefer_compliance_management = False
-                preference.save()
+        # preferences are reconciled on login and group changes so decide
+        # from the session snapshot without querying on each page view.
+        compliance_user = request.user.is_authenticated() and \
+            get_preference_snapshot(request)['compliance_management_user']
 
-        if not is_compliance_management_user(request) and SecureBaseUtils.is_wildlifelicensing_request(request):
+        if not compliance_user and SecureBaseUtils.is_wildlifelicensing_request(request):
         #if SecureBaseUtils.is_wildlifelicensing_request(request):
             # Apply WildifeLicensing first-time checks.
             first_time_nag = SecureAuthorisationEnforcer(request)
@@ -73,7 +51,7 @@ class FirstTimeDefaultNag(object):
             if (not request.user.first_name) or \
                     (not request.user.last_name) or \
                     (not request.user.dob and not request.user.legal_dob) or \
-                    (not request.user.residential_address) or \
+                    (not request.user.residential_address_id) or \
                     (not (
                         request.user.phone_number or request.user.mobile_number
                     )):
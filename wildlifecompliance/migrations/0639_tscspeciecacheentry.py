@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 09:12
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0638_returnreporthash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TSCSpecieCacheEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=512, unique=True)),
+                ('data', django.contrib.postgres.fields.jsonb.JSONField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('last_accessed', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'TSC species cache entry',
+                'verbose_name_plural': 'TSC species cache entries',
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 10:15
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0639_tscspeciecacheentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='customer_status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('awaiting_payment', 'Awaiting Payment'), ('under_review', 'Under Review'), ('amendment_required', 'Draft'), ('accepted', 'Approved'), ('partially_approved', 'Partially Approved'), ('declined', 'Declined')], db_index=True, default='draft', max_length=40, verbose_name='Customer Status'),
+        ),
+    ]
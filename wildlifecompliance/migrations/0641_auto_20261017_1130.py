@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 11:30
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def get_processing_status(statuses, amendment_requested):
+    # mirrors Application.processing_status at the time of this migration.
+    if statuses.count('draft') == len(statuses):
+        return 'draft'
+    if statuses.count('awaiting_licence_fee_payment') == len(statuses):
+        return 'awaiting_payment'
+    elif statuses.count('discarded') == len(statuses):
+        return 'discarded'
+    elif amendment_requested:
+        return 'awaiting_applicant_response'
+    elif statuses.count('accepted') == len(statuses):
+        return 'approved'
+    elif 0 < statuses.count('accepted') < len(statuses):
+        return 'partially_approved'
+    elif statuses.count('declined') == len(statuses):
+        return 'declined'
+    else:
+        return 'under_review'
+
+
+def backfill_computed_fields(apps, schema_editor):
+    '''
+    Compute the processing status and licence category for existing
+    applications, reading related rows for a chunk of applications at once.
+    '''
+    Application = apps.get_model('wildlifecompliance', 'Application')
+    ApplicationSelectedActivity = apps.get_model(
+        'wildlifecompliance', 'ApplicationSelectedActivity')
+    AmendmentRequest = apps.get_model(
+        'wildlifecompliance', 'AmendmentRequest')
+    ApplicationLicencePurpose = Application.licence_purposes.through
+
+    ids = list(Application.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+
+        statuses = dict((application_id, []) for application_id in chunk)
+        active = dict((application_id, set()) for application_id in chunk)
+        for application_id, status, activity_id in \
+                ApplicationSelectedActivity.objects.filter(
+                    application_id__in=chunk,
+                ).values_list(
+                    'application_id', 'processing_status',
+                    'licence_activity_id'):
+            statuses[application_id].append(status)
+            if status != 'discarded':
+                active[application_id].add(activity_id)
+
+        requested = set()
+        for application_id, activity_id in AmendmentRequest.objects.filter(
+                application_id__in=chunk,
+                status='requested',
+        ).values_list('application_id', 'licence_activity_id'):
+            if activity_id in active[application_id]:
+                requested.add(application_id)
+
+        categories = {}
+        for application_id, category_id in \
+                ApplicationLicencePurpose.objects.filter(
+                    application_id__in=chunk,
+                ).order_by('licencepurpose_id').values_list(
+                    'application_id', 'licencepurpose__licence_category_id'):
+            categories.setdefault(application_id, category_id)
+
+        updates = {}
+        for application_id in chunk:
+            status = get_processing_status(
+                statuses[application_id], application_id in requested)
+            key = (status, categories.get(application_id))
+            updates.setdefault(key, []).append(application_id)
+
+        for (status, category_id), application_ids in updates.items():
+            Application.objects.filter(id__in=application_ids).update(
+                computed_processing_status=status,
+                computed_licence_category_id=category_id,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0640_auto_20261017_1015'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='computed_licence_category_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='computed_processing_status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('awaiting_applicant_response', 'Draft'), ('approved', 'Approved'), ('partially_approved', 'Partially Approved'), ('declined', 'Declined'), ('discarded', 'Discarded'), ('under_review', 'Under Review'), ('awaiting_payment', 'Awaiting Payment')], db_index=True, default='draft', max_length=30, verbose_name='Processing Status'),
+        ),
+        migrations.RunPython(
+            backfill_computed_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 12:45
+from __future__ import unicode_literals
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0641_auto_20261017_1130'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationformdatarecord',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='applicationformdatarecord',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='wildlifecom_search__6bb315_gin'),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE wildlifecompliance_applicationformdatarecord SET search_vector = to_tsvector('simple'::regconfig, COALESCE(value #>> '{}', ''))",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
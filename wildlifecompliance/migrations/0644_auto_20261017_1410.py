@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 14:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0643_referencenumber'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='callemail',
+            name='lodged_on',
+            field=models.DateField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='callemail',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('open', 'Open'), ('open_followup', 'Open (follow-up)'), ('open_inspection', 'Open (Inspection)'), ('open_case', 'Open (Case)'), ('closed', 'Closed'), ('pending_closure', 'Pending Closure')], db_index=True, default='draft', max_length=40),
+        ),
+    ]
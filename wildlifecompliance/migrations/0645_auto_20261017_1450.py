@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 14:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0644_auto_20261017_1410'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='district',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='location_district', to='wildlifecompliance.District'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='region',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='location_region', to='wildlifecompliance.Region'),
+        ),
+    ]
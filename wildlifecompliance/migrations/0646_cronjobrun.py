@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 15:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0645_auto_20261017_1450'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CronJobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(db_index=True, max_length=32)),
+                ('job', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed'), ('skipped', 'Skipped')], max_length=10)),
+                ('started', models.DateTimeField()),
+                ('duration', models.FloatField(default=0)),
+                ('row_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ('-started',),
+            },
+        ),
+    ]
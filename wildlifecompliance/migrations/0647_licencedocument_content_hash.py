@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-17 15:55
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wildlifecompliance', '0646_cronjobrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='licencedocument',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -5,6 +5,7 @@ ISSUE: 1029
 CMD: python scripts/add_return_doa.py | tee -a logs/rfc_0658_20210519T1000.log
 
 Update Return Running Sheet entries to set Date of Activity to date added.
+Add --resume to continue an interrupted run from its last checkpoint.
 '''
 import os
 import sys
@@ -19,7 +20,7 @@ from wildlifecompliance.components.returns.services import ReturnService
 
 try:
 
-    ReturnService.etl_return_sheet(True)
+    ReturnService.etl_return_sheet(True, resume='--resume' in sys.argv)
 
 except Exception as e:
     print(e)
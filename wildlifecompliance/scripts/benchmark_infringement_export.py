@@ -0,0 +1,121 @@
+'''
+CONSOLE COMMAND: Benchmark Unpaid Infringement File Export
+CMD: python scripts/benchmark_infringement_export.py <sanction_outcome_id> [rows] [legacy_rows]
+
+Copies an infringement notice sanction outcome (with its included alleged
+committed offence) to make rows (default 50000) infringements, then writes
+the UIN body for them through the batched export and prints the elapsed
+time, query count and peak memory. The previous per record concatenation is
+timed on a smaller set (default 2000 rows) for comparison.
+
+NOTE: All changes are rolled back on completion.
+'''
+import os
+import sys
+import time
+import resource
+import django
+
+proj_path = '/app'
+sys.path.append(proj_path)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wildlifecompliance.settings")
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from wildlifecompliance.components.sanction_outcome.models import (
+    SanctionOutcome,
+    AllegedCommittedOffence,
+)
+from wildlifecompliance.management.classes.infringement_export import (
+    UnpaidInfringementExport,
+)
+
+SANCTION_OUTCOME_ID = int(sys.argv[1])
+ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+LEGACY_ROWS = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+BATCH_SIZE = 1000
+
+
+class Rollback(Exception):
+    pass
+
+
+def copy_sanction_outcomes(template, count):
+    '''
+    Create count copies of the template sanction outcome and its included
+    alleged committed offence.
+    '''
+    aco = AllegedCommittedOffence.objects.filter(
+        sanction_outcome=template, included=True).first()
+    values = dict(
+        (field.attname, getattr(template, field.attname))
+        for field in SanctionOutcome._meta.concrete_fields
+        if not field.primary_key
+    )
+    values['infringement_penalty_id'] = None
+    ids = []
+    for start in range(0, count, BATCH_SIZE):
+        copies = []
+        for i in range(start, min(start + BATCH_SIZE, count)):
+            values['lodgement_number'] = 'BM{0:07d}'.format(i)
+            copies.append(SanctionOutcome(**values))
+        created = SanctionOutcome.objects.bulk_create(copies)
+        ids += [c.id for c in created]
+        AllegedCommittedOffence.objects.bulk_create([
+            AllegedCommittedOffence(
+                alleged_offence_id=aco.alleged_offence_id,
+                sanction_outcome_id=c.id,
+                included=True,
+            ) for c in created
+        ])
+
+    return SanctionOutcome.objects.filter(id__in=ids)
+
+
+def legacy_export(sanction_outcomes):
+    '''
+    The previous export: a string concatenated for each sanction outcome.
+    '''
+    content_body = ''
+    for so in sanction_outcomes:
+        content_body += so.get_content_for_uin()
+
+    return content_body
+
+
+def batched_export(sanction_outcomes):
+    return UnpaidInfringementExport(sanction_outcomes).write().getvalue()
+
+
+def timed(title, func, *args):
+    started = time.time()
+    with CaptureQueriesContext(connection) as queries:
+        result = func(*args)
+    print('{0}: {1:.3f}s {2} queries peak memory {3}MB'.format(
+        title,
+        time.time() - started,
+        len(queries),
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    ))
+
+    return result
+
+
+template = SanctionOutcome.objects.get(id=SANCTION_OUTCOME_ID)
+try:
+    with transaction.atomic():
+        sanction_outcomes = copy_sanction_outcomes(template, ROWS)
+        legacy = sanction_outcomes.order_by('id')[:LEGACY_ROWS]
+
+        timed('Legacy export {} rows'.format(LEGACY_ROWS), legacy_export, legacy)
+        timed('Batched export {} rows'.format(LEGACY_ROWS), batched_export,
+              SanctionOutcome.objects.filter(
+                  id__in=list(legacy.values_list('id', flat=True))))
+        timed('Batched export {} rows'.format(ROWS), batched_export,
+              sanction_outcomes)
+
+        raise Rollback()
+
+except Rollback:
+    print('Benchmark changes rolled back.')
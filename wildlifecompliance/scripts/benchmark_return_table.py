@@ -0,0 +1,103 @@
+'''
+CONSOLE COMMAND: Benchmark Return Table Save
+CMD: python scripts/benchmark_return_table.py <return_id> [rows]
+
+Saves a running sheet table of rows (default 10000) on the Return, then
+appends a single entry, first rewriting every row (previous behaviour) and
+then with the incremental Return.save_return_table, and prints the elapsed
+time and number of queries for each.
+
+NOTE: All changes are rolled back on completion.
+'''
+import os
+import sys
+import time
+import django
+
+proj_path = '/app'
+sys.path.append(proj_path)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wildlifecompliance.settings")
+django.setup()
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from ledger.accounts.models import EmailUser
+from wildlifecompliance.components.returns.models import (
+    Return,
+    ReturnTable,
+    ReturnRow,
+)
+
+RETURN_ID = int(sys.argv[1])
+ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+TABLE_NAME = 'benchmark_return_table'
+
+
+class BenchmarkRequest(object):
+    user = None
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_rows(count):
+    return [{
+        'rowId': str(i),
+        'date': 1577836800000 + i * 60000,
+        'activity': 'stock',
+        'qty': i % 50,
+        'total': i,
+        'comment': 'Benchmark entry {}'.format(i),
+        'doa': '01/01/2020',
+    } for i in range(count)]
+
+
+def rewrite_return_table(a_return, table_rows):
+    '''
+    The previous save: delete and recreate every row of the table.
+    '''
+    return_table, created = ReturnTable.objects.get_or_create(
+        name=TABLE_NAME, ret=a_return)
+    return_table.save()
+    return_table.returnrow_set.all().delete()
+    ReturnRow.objects.bulk_create([
+        ReturnRow(return_table=return_table, data=row) for row in table_rows
+    ])
+
+
+def timed(title, func, *args):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.time()
+        func(*args)
+        elapsed = time.time() - started
+    print('{0}: {1:.3f}s {2} queries'.format(
+        title, elapsed, len(queries.captured_queries)))
+
+
+a_return = Return.objects.get(id=RETURN_ID)
+request = BenchmarkRequest()
+request.user = EmailUser.objects.get(email=settings.SYSTEM_EMAIL)
+rows = get_rows(ROWS)
+appended = get_rows(ROWS + 1)
+
+try:
+    with transaction.atomic():
+        timed('Initial save {} rows'.format(ROWS),
+              a_return.save_return_table, TABLE_NAME, rows, request)
+
+        timed('Append 1 row (rewrite all rows)',
+              rewrite_return_table, a_return, appended)
+        rewrite_return_table(a_return, rows)
+
+        timed('Append 1 row (incremental)',
+              a_return.save_return_table, TABLE_NAME, appended, request)
+
+        timed('Unchanged save (incremental)',
+              a_return.save_return_table, TABLE_NAME, appended, request)
+
+        raise Rollback()
+
+except Rollback:
+    print('Benchmark changes rolled back.')
@@ -0,0 +1,107 @@
+'''
+CONSOLE COMMAND: Benchmark Return Spreadsheet Upload
+CMD: python scripts/benchmark_return_upload.py <return_id> [rows] [legacy_rows]
+
+Writes a spreadsheet of rows (default 100000) for the Return's data schema,
+then streams, validates and saves it through the Return's SpreadSheet and
+prints the elapsed time and peak memory for each stage. The previous
+TableData parse is timed on a smaller sheet (default 2000 rows) for
+comparison.
+
+NOTE: All changes are rolled back on completion.
+'''
+import os
+import sys
+import time
+import resource
+import tempfile
+import django
+
+proj_path = '/app'
+sys.path.append(proj_path)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wildlifecompliance.settings")
+django.setup()
+
+from openpyxl import Workbook
+from django.db import transaction
+from wildlifecompliance.utils import excel
+from wildlifecompliance.components.returns.models import Return
+from wildlifecompliance.components.returns.utils import SpreadSheet
+from wildlifecompliance.components.returns.utils_schema import Schema
+
+RETURN_ID = int(sys.argv[1])
+ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+LEGACY_ROWS = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+
+class Rollback(Exception):
+    pass
+
+
+def write_sheet(a_return, count):
+    '''
+    Write a sheet of count rows with a value for each schema field.
+    '''
+    schema = Schema(a_return.return_type.get_schema_by_name(
+        a_return.return_type.resources[0]['name']))
+    headers = schema.headers
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(headers)
+    for i in range(count):
+        ws.append([str(i % 100) for header in headers])
+    handle, filename = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    wb.save(filename)
+
+    return filename
+
+
+def legacy_parse(filename):
+    '''
+    The previous parse: a loaded workbook with columns rebuilt for each row.
+    '''
+    wb = excel.load_workbook(filename)
+    ws = wb[excel.get_sheet_titles(wb)[0]]
+    table_data = excel.TableData(ws, 1, 1)
+    rows = []
+    for row_num in range(len(table_data.rows)):
+        rows.append(dict(
+            (key, value[row_num]) for key, value in table_data.by_columns()
+        ))
+
+    return rows
+
+
+def timed(title, func, *args):
+    started = time.time()
+    result = func(*args)
+    print('{0}: {1:.3f}s peak memory {2}MB'.format(
+        title,
+        time.time() - started,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    ))
+
+    return result
+
+
+a_return = Return.objects.get(id=RETURN_ID)
+
+legacy_file = write_sheet(a_return, LEGACY_ROWS)
+timed('Legacy parse {} rows'.format(LEGACY_ROWS), legacy_parse, legacy_file)
+os.remove(legacy_file)
+
+filename = write_sheet(a_return, ROWS)
+spreadsheet = SpreadSheet(a_return, filename).factory()
+try:
+    with transaction.atomic():
+        timed('Stream and validate {} rows'.format(ROWS), spreadsheet.is_valid)
+        timed('Save {} rows'.format(ROWS), spreadsheet.create_return_data)
+
+        raise Rollback()
+
+except Rollback:
+    print('Benchmark changes rolled back.')
+
+finally:
+    os.remove(filename)
@@ -0,0 +1,105 @@
+'''
+CONSOLE COMMAND: Benchmark TSC Cross-Reference Walk
+CMD: python scripts/benchmark_tsc_xref.py [species] [depth] [latency_ms]
+
+Walks the cross-reference tree for a level of species against a local fake
+TSC server, first with a single worker (serial) and then with the configured
+TSC_MAX_WORKERS, and prints the elapsed time for each.
+
+NOTE: Cached XREF lookups are removed before each run. Do not run against a
+production database.
+'''
+import os
+import sys
+import json
+import time
+import threading
+import django
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+
+proj_path = '/app'
+sys.path.append(proj_path)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wildlifecompliance.settings")
+django.setup()
+
+from wildlifecompliance import settings
+from wildlifecompliance.components.licences.models import TSCSpecieCacheEntry
+from wildlifecompliance.components.applications.services import (
+    TSCSpecieCache,
+    TSCSpecieXReferenceCall,
+)
+
+SPECIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+DEPTH = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+LATENCY = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+SUCCESSOR_OFFSET = 100000
+
+
+class FakeTSCHandler(BaseHTTPRequestHandler):
+    '''
+    Answers cross-reference requests with a chain of successors DEPTH long.
+    '''
+    def do_GET(self):
+        time.sleep(LATENCY)
+        query = parse_qs(urlparse(self.path).query)
+        name_id = int(
+            query.get('predecessor__name_id', query.get('xref_id', [0]))[0]
+        )
+        results = []
+        if name_id // SUCCESSOR_OFFSET < DEPTH:
+            results.append({
+                'xref_id': name_id,
+                'authorised_on': None,
+                'successor': {'name_id': name_id + SUCCESSOR_OFFSET},
+            })
+        body = json.dumps({'count': len(results), 'results': results})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTSCServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def run(workers):
+    TSCSpecieCacheEntry.objects.filter(cache_key__startswith='XREF:').delete()
+    settings.TSC_MAX_WORKERS = workers
+    settings.TSC_RATE_LIMIT = 0
+    TSCSpecieCache._session = None
+    TSCSpecieCache._limiter = None
+
+    call = TSCSpecieXReferenceCall()
+    call._XREF = '{0}/api/1/crossreference/?format=json'.format(url)
+    level_species = [{'name_id': i} for i in range(1, SPECIES + 1)]
+
+    start = time.time()
+    walked = call.get_level_species(0, level_species)
+    return time.time() - start, len(walked)
+
+
+server = FakeTSCServer(('127.0.0.1', 0), FakeTSCHandler)
+url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+try:
+    workers = int(settings.TSC_MAX_WORKERS)
+    serial, walked = run(1)
+    print('serial      : {0:.2f}s {1} successors'.format(serial, walked))
+    pooled, walked = run(workers)
+    print('{0} workers   : {1:.2f}s {2} successors'.format(
+        workers, pooled, walked))
+    print('speedup     : {0:.1f}x'.format(serial / pooled if pooled else 0))
+
+except Exception as e:
+    print(e)
+
+finally:
+    server.shutdown()
@@ -316,7 +316,19 @@ AUTH_GROUP_REGION_DISTRICT_LOCK_ENABLED = env('AUTH_GROUP_REGION_DISTRICT_LOCK_E
 # Details for Threathened Species and Communities server.
 TSC_URL = env('TSC_URL', 'https://tsc.dbca.wa.gov.au')
 TSC_AUTH = env('TSC_AUTH', 'NO_AUTH')
+TSC_CACHE_TTL = env('TSC_CACHE_TTL', 604800)  # seconds
+TSC_CACHE_MISS_TTL = env('TSC_CACHE_MISS_TTL', 86400)  # seconds
+TSC_CACHE_MAX_ENTRIES = env('TSC_CACHE_MAX_ENTRIES', 50000)
+TSC_CACHE_TOUCH_INTERVAL = env('TSC_CACHE_TOUCH_INTERVAL', 3600)  # seconds
+TSC_MAX_WORKERS = env('TSC_MAX_WORKERS', 8)
+TSC_MAX_RETRIES = env('TSC_MAX_RETRIES', 3)
+TSC_RATE_LIMIT = env('TSC_RATE_LIMIT', 20)  # requests per second per host
+HERBIE_URL = env('HERBIE_URL', 'https://kmi.dpaw.wa.gov.au/geoserver/ows?service=wfs&version=1.1.0')
 CRON_RUN_AT_TIMES = env('CRON_RUN_AT_TIMES', '02:05')
+CRON_TASKS_MAX_WORKERS = env('CRON_TASKS_MAX_WORKERS', 4)
+LICENCE_DOC_MAX_WORKERS = env('LICENCE_DOC_MAX_WORKERS', 4)
+ROLE_CACHE_TTL = env('ROLE_CACHE_TTL', 0)  # seconds, 0 to disable
+APPLICATION_SCHEMA_CACHE_TTL = env('APPLICATION_SCHEMA_CACHE_TTL', 86400)
 
 if env('CONSOLE_EMAIL_BACKEND', False):
    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -0,0 +1,48 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_datatables.renderers import DatatablesRenderer
+
+from wildlifecompliance.components.applications.api import (
+        ApplicationFilterBackend,
+        AssessmentPaginatedViewSet,
+        )
+from wildlifecompliance.components.applications.models import Assessment
+
+
+class AssessmentFilterTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def get_page_query_count(self, params):
+        request = Request(self.factory.get(
+            '/api/assessment_paginated/datatable_list/', params
+        ))
+        request.accepted_renderer = DatatablesRenderer()
+        view = AssessmentPaginatedViewSet()
+        view.request = request
+
+        with CaptureQueriesContext(connection) as context:
+            queryset = ApplicationFilterBackend().filter_queryset(
+                request, Assessment.objects.all(), view
+            )
+            list(queryset[:10])
+
+        return len(context.captured_queries)
+
+    def test_search_and_category_query_count_is_constant(self):
+        print("test_search_and_category_query_count_is_constant")
+        params = {
+            'search[value]': 'assess',
+            'category_name': 'fauna',
+        }
+        mixer.cycle(2).blend(Assessment)
+        small_table_count = self.get_page_query_count(params)
+
+        mixer.cycle(20).blend(Assessment)
+        large_table_count = self.get_page_query_count(params)
+
+        self.assertEqual(small_table_count, large_table_count)
@@ -0,0 +1,50 @@
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from wildlifecompliance.helpers import (
+        is_compliance_internal_user,
+        is_compliance_management_callemail_readonly_user,
+        is_compliance_management_user,
+        is_compliance_management_volunteer,
+        is_officer,
+        is_wildlife_compliance_officer,
+        )
+from wildlifecompliance.tests.test_setup import APITestSetup
+
+
+class RoleResolverTests(APITestSetup):
+
+    def get_request(self, user):
+        request = Request(APIRequestFactory().get('/api/my_user_details/'))
+        request.user = user
+        return request
+
+    def check_roles(self, request):
+        return [
+            is_compliance_management_user(request),
+            is_compliance_internal_user(request),
+            is_compliance_management_volunteer(request),
+            is_compliance_management_callemail_readonly_user(request),
+            is_officer(request),
+            is_wildlife_compliance_officer(request),
+        ]
+
+    def test_roles_resolved_once_per_request(self):
+        # load the user permissions cached on the user instance.
+        self.check_roles(self.get_request(self.volunteer1))
+
+        request = self.get_request(self.volunteer1)
+        with self.assertNumQueries(1):
+            roles = self.check_roles(request)
+            for i in range(5):
+                self.check_roles(request)
+                self.check_roles(request._request)
+
+        self.assertEqual(roles, [True, False, True, False, False, False])
+
+    def test_roles_follow_group_membership(self):
+        self.callemailreadonlygroup.add_member(self.volunteer1)
+        request = self.get_request(self.volunteer1)
+
+        self.assertTrue(
+            is_compliance_management_callemail_readonly_user(request))
@@ -378,6 +378,36 @@ class TableData:
         return self.worksheet.rows[row_index][start:end]
 
 
+def iter_table_rows(worksheet, top_left_row=1, top_left_column=1):
+    """
+    Stream a table from a (read-only) worksheet in a single pass.
+    The first row represent the column_headers and parsing stops at the first
+    empty header cell and at the first blank row, as for TableData.
+    :return: iterator of OrderedDict {col_header: value} for each row.
+    """
+    headers = []
+    rows = worksheet.iter_rows(min_row=top_left_row)
+    for row_cells in rows:
+        for cell in row_cells[top_left_column - 1:]:
+            if is_cell_blank(cell):
+                break
+            headers.append(strip(cell.value))
+        break
+
+    end_column = top_left_column - 1 + len(headers)
+    for row_cells in rows:
+        values = [
+            strip(cell.value)
+            for cell in row_cells[top_left_column - 1:end_column]
+        ]
+        if len([v for v in values if not is_blank_value(v)]) == 0:
+            break
+        # short rows are padded as the read-only worksheet omits trailing
+        # empty cells.
+        values += [None] * (len(headers) - len(values))
+        yield OrderedDict(zip(headers, values))
+
+
 class ExcelFileResponse(HttpResponse):
     def __init__(self, content, file_name=None):
         content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'